@@ -1,16 +1,24 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator, Optional, Tuple
 from abc import ABC, abstractmethod
 import logging
 
+from app.rag.executor import run_blocking
 from app.rag.medical_rag import get_medical_rag
 from app.llm.gemini import get_gemini_llm
 from app.agents.tools.web_search import MedicalWebSearchTool
+from app.utils.tracing import span, traced
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class BaseAgent(ABC):
+    
+    # Retrieval settings used by prepare(); subclasses override as needed
+    n_results: int = 5
+    filter_type: Optional[str] = None
+    prompt_template: str = ""
+    
     def __init__(self, name: str, role: str):
         
         self.name = name
@@ -23,27 +31,133 @@ class BaseAgent(ABC):
     
     
     @abstractmethod
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def record_output(
+        self,
+        state: Dict[str, Any],
+        query: str,
+        rag_results: List[Dict],
+        output: str
+    ) -> Dict[str, Any]:
         pass
     
     
+    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        query = state['query'] if isinstance(state, dict) else state.query
+        if isinstance(state, dict):
+            query_embedding = state.get('query_embedding')
+            retrieved = state.get('retrieved_knowledge')
+        else:
+            query_embedding = state.query_embedding
+            retrieved = state.retrieved_knowledge
+        
+        logger.info(f"[{self.name}] Processing query: {query}")
+        
+        rag_results, prompt = self.prepare(query, query_embedding, retrieved)
+        
+        output = self.generate_response(prompt)
+        
+        return self.record_output(state, query, rag_results, output)
+    
+    
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        query = state['query'] if isinstance(state, dict) else state.query
+        if isinstance(state, dict):
+            query_embedding = state.get('query_embedding')
+            retrieved = state.get('retrieved_knowledge')
+        else:
+            query_embedding = state.query_embedding
+            retrieved = state.retrieved_knowledge
+        
+        logger.info(f"[{self.name}] Processing query: {query}")
+        
+        rag_results, prompt = await self.aprepare(query, query_embedding, retrieved)
+        
+        output = await self.agenerate_response(prompt)
+        
+        return self.record_output(state, query, rag_results, output)
+    
+    
+    @traced("agent.retrieve_knowledge")
     def retrieve_knowledge(
         self,
         query: str,
         n_results: int = 5,
-        filter_type: str = None
+        filter_type: str = None,
+        mode: str = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict]:
         return self.rag.search(
             query=query,
             n_results=n_results,
-            filter_type=filter_type
+            filter_type=filter_type,
+            mode=mode,
+            query_embedding=query_embedding
         )
     
     
+    def select_knowledge(self, retrieved: List[Dict]) -> List[Dict]:
+        if self.filter_type:
+            retrieved = [r for r in retrieved if r['metadata'].get('type') == self.filter_type]
+        
+        return retrieved[:self.n_results]
+    
+    
+    def prepare(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None,
+        retrieved: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict], str]:
+        
+        rag_results = self.select_knowledge(retrieved) if retrieved is not None else None
+        
+        # A filtered agent can find too few of its type in the shared pool; search its slice directly
+        if rag_results is None or (self.filter_type and len(rag_results) < self.n_results):
+            rag_results = self.retrieve_knowledge(
+                query=query,
+                n_results=self.n_results,
+                filter_type=self.filter_type,
+                query_embedding=query_embedding
+            )
+        
+        with span("agent.format_prompt"):
+            context = self.format_context(rag_results)
+            
+            prompt = self.prompt_template.format(
+                context=context,
+                query=query
+            )
+        
+        return rag_results, prompt
+    
+    
+    async def aprepare(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]] = None,
+        retrieved: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict], str]:
+        
+        # Encode through the batcher on the loop; only the store lookup and prompt go to the executor
+        if query_embedding is None and retrieved is None:
+            query_embedding = (await self.rag.aencode_query(query)).tolist()
+        
+        return await run_blocking(self.prepare, query, query_embedding, retrieved)
+    
+    
     def generate_response(self, prompt: str) -> str:
         return self.llm.generate(prompt)
     
     
+    async def agenerate_response(self, prompt: str) -> str:
+        return await self.llm.agenerate(prompt)
+    
+    
+    async def astream_response(self, prompt: str) -> AsyncIterator[str]:
+        async for token in self.llm.astream(prompt):
+            yield token
+    
+    
     def format_context(self, rag_results: List[Dict]) -> str:
         if not rag_results:
             return "No relevant information found."
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
 
 from app.agents.base_agent import BaseAgent
@@ -7,6 +7,10 @@ logger = logging.getLogger(__name__)
 
 
 class DiseaseExpertAgent(BaseAgent):
+    
+    n_results = 3
+    filter_type = "disease"
+    
     def __init__(self):
         super().__init__(
             name="DiseaseExpert",
@@ -59,29 +63,13 @@ Provide detailed information:
 Be thorough, educational, and reassuring. Use simple language."""
     
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        if isinstance(state, dict):
-            query = state['query']
-        else:
-            query = state.query
-        
-        logger.info(f"[{self.name}] Processing query: {query}")
-        
-        rag_results = self.retrieve_knowledge(
-            query=query,
-            n_results=3,
-            filter_type="disease"
-        )
-        
-        context = self.format_context(rag_results)
-        
-        prompt = self.prompt_template.format(
-            context=context,
-            query=query
-        )
-        
-        disease_info = self.generate_response(prompt)
-        
+    def record_output(
+        self,
+        state: Dict[str, Any],
+        query: str,
+        rag_results: List[Dict],
+        disease_info: str
+    ) -> Dict[str, Any]:
         if isinstance(state, dict):
             state['rag_results'] = rag_results
             state['agent_outputs']['disease_info'] = disease_info
@@ -93,4 +81,4 @@ Be thorough, educational, and reassuring. Use simple language."""
         
         logger.info(f"[{self.name}] Disease info complete (length: {len(disease_info)})")
         
-        return state
\ No newline at end of file
+        return state
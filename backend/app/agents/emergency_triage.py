@@ -1,26 +1,25 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import logging
 
 from app.agents.base_agent import BaseAgent
+from app.utils.emergency_protocols import get_emergency_protocols
+from app.utils.keyword_router import get_keyword_router
 
 logger = logging.getLogger(__name__)
 
 
 class EmergencyTriageAgent(BaseAgent):
+    
+    n_results = 3
+    
     def __init__(self):
         super().__init__(
             name="EmergencyTriage",
             role="Identifies medical emergencies and provides urgent guidance"
         )
         
-        self.emergency_keywords = [
-            'chest pain', 'difficulty breathing', 'can\'t breathe',
-            'severe bleeding', 'unconscious', 'seizure',
-            'severe headache', 'sudden weakness', 'stroke',
-            'heart attack', 'allergic reaction', 'anaphylaxis',
-            'severe burn', 'poisoning', 'overdose',
-            'suicidal', 'severe injury', 'broken bone'
-        ]
+        self.keyword_router = get_keyword_router()
+        self.emergency_protocols = get_emergency_protocols()
         
         self.prompt_template = """You are an emergency medical triage specialist. Assess the urgency of this situation.
 
@@ -61,45 +60,38 @@ If this is an emergency, use clear, bold language. Be direct and action-oriented
     
     
     def detect_emergency(self, query: str) -> bool:
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in self.emergency_keywords)
+        return self.keyword_router.matches(query, "emergency")
     
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        if isinstance(state, dict):
-            query = state['query']
-        else:
-            query = state.query
-        
-        logger.info(f"[{self.name}] Processing query: {query}")
-        
+    def fast_response(self, query: str) -> Optional[str]:
+        return self.emergency_protocols.respond(query)
+    
+    
+    def record_output(
+        self,
+        state: Dict[str, Any],
+        query: str,
+        rag_results: List[Dict],
+        triage_assessment: str
+    ) -> Dict[str, Any]:
         is_potential_emergency = self.detect_emergency(query)
-        
-        rag_results = self.retrieve_knowledge(
-            query=query,
-            n_results=3
-        )
-        
-        context = self.format_context(rag_results)
-        
-        prompt = self.prompt_template.format(
-            context=context,
-            query=query
-        )
-        
-        triage_assessment = self.generate_response(prompt)
+        fast_response = self.fast_response(query)
         
         if isinstance(state, dict):
             state['rag_results'] = rag_results
             state['agent_outputs']['emergency_triage'] = triage_assessment
             state['metadata']['is_potential_emergency'] = is_potential_emergency
             state['metadata']['emergency_keywords_detected'] = is_potential_emergency
+            state['metadata']['emergency_fast_response'] = fast_response
+            state['metadata']['emergency_llm_response'] = triage_assessment
         else:
             state.rag_results = rag_results
             state.agent_outputs['emergency_triage'] = triage_assessment
             state.metadata['is_potential_emergency'] = is_potential_emergency
             state.metadata['emergency_keywords_detected'] = is_potential_emergency
+            state.metadata['emergency_fast_response'] = fast_response
+            state.metadata['emergency_llm_response'] = triage_assessment
         
         logger.info(f"[{self.name}] Triage complete. Emergency detected: {is_potential_emergency}")
         
-        return state
\ No newline at end of file
+        return state
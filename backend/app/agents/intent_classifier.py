@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.rag.embeddings import EmbeddingModel, get_embedding_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXAMPLES_PATH = Path(__file__).parent / "intent_examples.json"
+
+
+class IntentPrediction(NamedTuple):
+    label: str
+    confidence: float
+    margin: float
+
+
+class IntentClassifier:
+    """Nearest-centroid intent classifier over labeled example queries.
+
+    Example queries are embedded once at construction and averaged per label
+    into a small normalized centroid matrix. Classifying a query is a single
+    matrix-vector product against the embedding already computed for retrieval.
+    """
+    
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        examples: Dict[str, List[str]],
+        min_similarity: float = 0.35,
+        min_margin: float = 0.03
+    ):
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.labels = [label for label, texts in examples.items() if texts]
+        
+        if len(self.labels) < 2:
+            raise ValueError("Intent classifier needs example queries for at least two labels")
+        
+        centroids = []
+        for label in self.labels:
+            embeddings = np.asarray(embedding_model.encode_batch(examples[label]), dtype=np.float32)
+            centroid = embeddings.mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+        
+        self.centroids = np.vstack(centroids)
+        
+        logger.info(
+            f"Intent classifier ready: {len(self.labels)} labels, "
+            f"{sum(len(examples[label]) for label in self.labels)} examples"
+        )
+    
+    @classmethod
+    def from_file(cls, embedding_model: EmbeddingModel, path: str, **kwargs) -> "IntentClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(embedding_model, json.load(f), **kwargs)
+    
+    def scores(self, query_embedding) -> Dict[str, float]:
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarities = self.centroids @ (query / (np.linalg.norm(query) or 1.0))
+        return dict(zip(self.labels, similarities.tolist()))
+    
+    def predict(self, query_embedding) -> IntentPrediction:
+        ranked = sorted(self.scores(query_embedding).items(), key=lambda item: item[1], reverse=True)
+        (label, best), (_, runner_up) = ranked[0], ranked[1]
+        return IntentPrediction(label, best, best - runner_up)
+    
+    def classify(self, query_embedding) -> Optional[IntentPrediction]:
+        prediction = self.predict(query_embedding)
+        
+        # Weak or ambiguous matches are left to the keyword router
+        if prediction.confidence < self.min_similarity or prediction.margin < self.min_margin:
+            return None
+        
+        return prediction
+
+
+_intent_classifier = None
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    
+    global _intent_classifier
+    
+    if os.getenv("ROUTING_MODE", "keyword").lower() != "embedding":
+        return None
+    
+    if _intent_classifier is None:
+        path = os.getenv("INTENT_EXAMPLES_PATH") or str(DEFAULT_EXAMPLES_PATH)
+        logger.info(f"Loading intent examples from {path}")
+        _intent_classifier = IntentClassifier.from_file(
+            get_embedding_model(),
+            path,
+            min_similarity=float(os.getenv("INTENT_MIN_SIMILARITY", "0.35")),
+            min_margin=float(os.getenv("INTENT_MIN_MARGIN", "0.03"))
+        )
+    
+    return _intent_classifier
@@ -8,6 +8,12 @@ class AgentState(BaseModel):
     
     query_type: Optional[str] = Field(None, description="Detected query type")
     
+    query_embedding: Optional[List[float]] = Field(None, description="Query embedding shared by routing and retrieval")
+    
+    retrieved_knowledge: Optional[List[Dict[str, Any]]] = Field(None, description="Shared retrieval pool that agents slice from")
+    
+    routes: List[str] = Field(default_factory=list, description="Agent routes in priority order, selected once per query")
+    
     rag_results: List[Dict[str, Any]] = Field(default_factory=list, description="RAG retrieval results")
     
     agent_outputs: Dict[str, Any] = Field(default_factory=dict, description="Outputs from each agent")
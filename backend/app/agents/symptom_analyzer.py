@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
 
 from app.agents.base_agent import BaseAgent
@@ -48,28 +48,13 @@ Provide a structured analysis:
 Be empathetic, clear, and thorough. Focus on safety."""
     
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        if isinstance(state, dict):
-            query = state['query']
-        else:
-            query = state.query
-        
-        logger.info(f"[{self.name}] Processing query: {query}")
-        
-        rag_results = self.retrieve_knowledge(
-            query=query,
-            n_results=5
-        )
-        
-        context = self.format_context(rag_results)
-        
-        prompt = self.prompt_template.format(
-            context=context,
-            query=query
-        )
-        
-        analysis = self.generate_response(prompt)
-        
+    def record_output(
+        self,
+        state: Dict[str, Any],
+        query: str,
+        rag_results: List[Dict],
+        analysis: str
+    ) -> Dict[str, Any]:
         if isinstance(state, dict):
             state['rag_results'] = rag_results
             state['agent_outputs']['symptom_analysis'] = analysis
@@ -81,4 +66,4 @@ Be empathetic, clear, and thorough. Focus on safety."""
         
         logger.info(f"[{self.name}] Analysis complete (length: {len(analysis)})")
         
-        return state
\ No newline at end of file
+        return state
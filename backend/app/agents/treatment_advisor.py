@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
 
 from app.agents.base_agent import BaseAgent
@@ -57,28 +57,13 @@ Provide actionable treatment advice:
 Be practical, safe, and clear. Always prioritize safety and professional medical care when needed."""
     
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        if isinstance(state, dict):
-            query = state['query']
-        else:
-            query = state.query
-        
-        logger.info(f"[{self.name}] Processing query: {query}")
-        
-        rag_results = self.retrieve_knowledge(
-            query=query,
-            n_results=5
-        )
-        
-        context = self.format_context(rag_results)
-        
-        prompt = self.prompt_template.format(
-            context=context,
-            query=query
-        )
-        
-        treatment_advice = self.generate_response(prompt)
-        
+    def record_output(
+        self,
+        state: Dict[str, Any],
+        query: str,
+        rag_results: List[Dict],
+        treatment_advice: str
+    ) -> Dict[str, Any]:
         if isinstance(state, dict):
             state['rag_results'] = rag_results
             state['agent_outputs']['treatment_advice'] = treatment_advice
@@ -90,4 +75,4 @@ Be practical, safe, and clear. Always prioritize safety and professional medical
         
         logger.info(f"[{self.name}] Treatment advice complete (length: {len(treatment_advice)})")
         
-        return state
\ No newline at end of file
+        return state
@@ -1,16 +1,45 @@
-from typing import Dict, Any, Literal
+from typing import Dict, Any, List, Literal, Optional
+import asyncio
+import contextvars
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
+from app.agents.base_agent import BaseAgent
 from app.agents.state import AgentState
 from app.agents.symptom_analyzer import SymptomAnalyzerAgent
 from app.agents.disease_expert import DiseaseExpertAgent
 from app.agents.treatment_advisor import TreatmentAdvisorAgent
 from app.agents.emergency_triage import EmergencyTriageAgent
+from app.agents.intent_classifier import get_intent_classifier
+from app.rag.executor import run_blocking
+from app.rag.medical_rag import get_medical_rag
+from app.utils.keyword_router import get_keyword_router
+from app.utils.resilience import BulkheadFullError
+from app.utils.tracing import start_trace, traced
 
 logger = logging.getLogger(__name__)
 
 
+# Keyword category -> agent route, in routing priority order
+CATEGORY_ROUTES = [
+    ("emergency", "emergency_triage"),
+    ("disease", "disease_expert"),
+    ("treatment", "treatment_advisor")
+]
+
+# Where each agent records its answer, and its heading when several are merged
+AGENT_OUTPUTS = {
+    "emergency_triage": ("emergency_triage", "Emergency Assessment"),
+    "disease_expert": ("disease_info", "About the Condition"),
+    "treatment_advisor": ("treatment_advice", "Treatment Options"),
+    "symptom_analyzer": ("symptom_analysis", "Symptom Analysis")
+}
+
+
 class MedicalWorkflow:
     def __init__(self):
         logger.info("Initializing Medical Workflow")
@@ -20,48 +49,147 @@ class MedicalWorkflow:
         self.treatment_advisor = TreatmentAdvisorAgent()
         self.emergency_triage = EmergencyTriageAgent()
         
+        self.rag = get_medical_rag()
+        self.keyword_router = get_keyword_router()
+        self.intent_classifier = get_intent_classifier()
+        
+        # Large enough that every agent's slice (and filter) fits in one shared search
+        self.retrieval_pool_size = int(os.getenv("RETRIEVAL_POOL_SIZE", "20"))
+        
+        # Fan-out runs every matching agent concurrently instead of only the top route
+        self.fanout_enabled = os.getenv("AGENT_FANOUT_ENABLED", "false").lower() == "true"
+        self.fanout_max_agents = int(os.getenv("AGENT_FANOUT_MAX_AGENTS", "3"))
+        self.agent_deadline = float(os.getenv("AGENT_DEADLINE_SECONDS", "30"))
+        # Shared by every sync request, and a branch past its deadline keeps its thread,
+        # so size for concurrent fanned-out requests rather than one request's agents
+        fanout_concurrency = int(os.getenv("AGENT_FANOUT_CONCURRENCY", "8"))
+        self.fanout_executor = ThreadPoolExecutor(
+            max_workers=fanout_concurrency * self.fanout_max_agents,
+            thread_name_prefix="agent-fanout"
+        )
+        
+        self.agents = {
+            "symptom_analyzer": self.symptom_analyzer,
+            "disease_expert": self.disease_expert,
+            "treatment_advisor": self.treatment_advisor,
+            "emergency_triage": self.emergency_triage
+        }
+        
         self.graph = self._build_graph()
         
         logger.info("Medical Workflow initialized successfully")
     
     
-    def _route_query(self, state: Dict[str, Any]) -> Literal["symptom_analyzer", "disease_expert", "treatment_advisor", "emergency_triage"]:
+    def _select_routes(self, state: Dict[str, Any]) -> List[str]:
         if isinstance(state, AgentState):
-            query = state.query.lower()
+            query = state.query
+            query_embedding = state.query_embedding
         else:
-            query = state.get('query', '').lower()
+            query = state.get('query', '')
+            query_embedding = state.get('query_embedding')
         
-        emergency_keywords = [
-            'chest pain', 'difficulty breathing', "can't breathe",
-            'severe bleeding', 'unconscious', 'seizure',
-            'severe headache', 'sudden weakness', 'stroke',
-            'heart attack', 'severe', 'emergency'
-        ]
+        # One automaton pass finds every category; priority orders the routes
+        categories = self.keyword_router.categories(query)
+        routes = [route for category, route in CATEGORY_ROUTES if category in categories]
         
-        if any(keyword in query for keyword in emergency_keywords):
-            logger.info("Routing to EmergencyTriage (emergency detected)")
-            return "emergency_triage"
+        if self.intent_classifier is not None and query_embedding is not None:
+            prediction = self.intent_classifier.classify(query_embedding)
+            if prediction is not None and prediction.label not in routes:
+                logger.info(f"Intent classifier picked {prediction.label} (confidence {prediction.confidence:.2f})")
+                # Explicit emergency keywords always stay ahead of the classifier
+                position = 1 if routes and routes[0] == "emergency_triage" else 0
+                routes.insert(position, prediction.label)
         
-        disease_keywords = [
-            'what is', 'tell me about', 'explain', 'information about',
-            'what are the symptoms of', 'causes of', 'how does'
-        ]
+        return routes or ["symptom_analyzer"]
+    
+    
+    def _routes(self, state: Dict[str, Any]) -> List[str]:
+        routes = state.routes if isinstance(state, AgentState) else state.get('routes')
+        # States that skipped the route node (direct callers) still get an answer
+        return routes or self._select_routes(state)
+    
+    
+    def _route_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        # Keywords and the classifier run once here; the edge and fan-out read the result
+        return {"routes": self._select_routes(state)}
+    
+    
+    def _route_query(self, state: Dict[str, Any]) -> Literal["symptom_analyzer", "disease_expert", "treatment_advisor", "emergency_triage", "fan_out"]:
+        routes = self._routes(state)
         
-        if any(keyword in query for keyword in disease_keywords):
-            logger.info("Routing to DiseaseExpert (disease info query)")
-            return "disease_expert"
+        if self.fanout_enabled and len(routes) > 1:
+            logger.info(f"Fanning out to {routes[:self.fanout_max_agents]}")
+            return "fan_out"
         
-        treatment_keywords = [
-            'how to treat', 'treatment for', 'what should i do',
-            'how to cure', 'remedy', 'medication', 'medicine'
-        ]
+        logger.info(f"Routing to {routes[0]}")
+        return routes[0]
+    
+    def select_agent(self, query: str, query_embedding: Optional[List[float]] = None) -> BaseAgent:
+        # Streaming answers come from a single agent, so fan-out is not applied here
+        return self.agents[self._select_routes({"query": query, "query_embedding": query_embedding})[0]]
+    
+    
+    def encode_query(self, query: str) -> Optional[List[float]]:
+        
+        # Only embedding routing needs the vector before retrieval; keyword mode leaves it to the agent
+        if self.intent_classifier is None:
+            return None
+        
+        try:
+            return self.rag.encode_query(query).tolist()
+        except Exception as e:
+            logger.error(f"Query embedding for routing failed: {e}")
+            return None
+    
+    
+    async def aencode_query(self, query: str) -> Optional[List[float]]:
+        
+        if self.intent_classifier is None:
+            return None
+        
+        try:
+            return (await self.rag.aencode_query(query)).tolist()
+        except Exception as e:
+            logger.error(f"Query embedding for routing failed: {e}")
+            return None
+    
+    
+    def _retrieve_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        query = state.query if isinstance(state, AgentState) else state['query']
+        
+        try:
+            query_embedding = self.rag.encode_query(query)
+        except Exception as e:
+            # Agents fall back to their own searches when the pool is missing
+            logger.error(f"Shared retrieval failed: {e}")
+            return {"retrieved_knowledge": None}
         
-        if any(keyword in query for keyword in treatment_keywords):
-            logger.info("Routing to TreatmentAdvisor (treatment query)")
-            return "treatment_advisor"
+        return self._search_pool(query, query_embedding)
+    
+    
+    async def _aretrieve_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        query = state.query if isinstance(state, AgentState) else state['query']
+        
+        try:
+            query_embedding = await self.rag.aencode_query(query)
+        except Exception as e:
+            logger.error(f"Shared retrieval failed: {e}")
+            return {"retrieved_knowledge": None}
         
-        logger.info("Routing to SymptomAnalyzer (symptom description)")
-        return "symptom_analyzer"
+        return await run_blocking(self._search_pool, query, query_embedding)
+    
+    
+    def _search_pool(self, query: str, query_embedding) -> Dict[str, Any]:
+        retrieved = self.rag.search(
+            query=query,
+            n_results=self.retrieval_pool_size,
+            query_embedding=query_embedding
+        )
+        
+        logger.info(f"Shared retrieval fetched {len(retrieved)} documents")
+        
+        return {"query_embedding": query_embedding.tolist(), "retrieved_knowledge": retrieved}
+    
     
     def _symptom_analyzer_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
         return self.symptom_analyzer.process(state)
@@ -79,23 +207,149 @@ class MedicalWorkflow:
         return self.emergency_triage.process(state)
     
     
+    def _branch_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        state = state.dict() if isinstance(state, AgentState) else dict(state)
+        
+        # Agents write into agent_outputs/metadata; give each branch its own
+        state['agent_outputs'] = {}
+        state['metadata'] = {}
+        state['rag_results'] = []
+        
+        return state
+    
+    
+    def _merge_branches(self, state: Dict[str, Any], routes: List[str], branches: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(state, AgentState):
+            agent_outputs = dict(state.agent_outputs)
+            metadata = dict(state.metadata)
+        else:
+            agent_outputs = dict(state.get('agent_outputs', {}))
+            metadata = dict(state.get('metadata', {}))
+        
+        # Nothing ran at all; surface the overload so callers answer 503, not an empty 200
+        if all(branches[route][2] == "overloaded" for route in routes):
+            raise BulkheadFullError(f"LLM overloaded for every agent in {routes}")
+        
+        rag_results = []
+        seen = set()
+        latencies = {}
+        errors = {}
+        
+        for route in routes:
+            branch, latency, error = branches[route]
+            latencies[route] = round(latency * 1000, 1)
+            
+            if error is not None:
+                errors[route] = error
+                continue
+            
+            agent_outputs.update(branch['agent_outputs'])
+            metadata.update(branch['metadata'])
+            
+            for result in branch['rag_results']:
+                key = (result['metadata'].get('type'), result['metadata'].get('id'), result['text'])
+                if key not in seen:
+                    seen.add(key)
+                    rag_results.append(result)
+        
+        metadata['agents'] = routes
+        metadata['agent_latency_ms'] = latencies
+        metadata['agent_errors'] = errors
+        
+        return {"agent_outputs": agent_outputs, "metadata": metadata, "rag_results": rag_results}
+    
+    
+    def _fan_out_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        routes = self._routes(state)[:self.fanout_max_agents]
+        
+        def run(route):
+            started = time.perf_counter()
+            result = self.agents[route].process(self._branch_state(state))
+            return result, time.perf_counter() - started, None
+        
+        started = time.perf_counter()
+        # Each branch gets a copy of the context so its spans land in this run's trace
+        futures = {
+            route: self.fanout_executor.submit(contextvars.copy_context().run, run, route)
+            for route in routes
+        }
+        
+        branches = {}
+        for route, future in futures.items():
+            # One shared deadline: total wait is bounded by the slowest agent, not the sum
+            remaining = max(0.0, started + self.agent_deadline - time.perf_counter())
+            try:
+                branches[route] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                logger.warning(f"Agent {route} missed its {self.agent_deadline}s deadline")
+                # Only helps a branch still queued behind other requests; a running one keeps its thread
+                future.cancel()
+                branches[route] = (None, time.perf_counter() - started, "timeout")
+            except BulkheadFullError as e:
+                logger.warning(f"Agent {route} rejected, LLM overloaded: {e}")
+                branches[route] = (None, time.perf_counter() - started, "overloaded")
+            except Exception as e:
+                logger.error(f"Agent {route} failed: {e}")
+                branches[route] = (None, time.perf_counter() - started, "error")
+        
+        return self._merge_branches(state, routes, branches)
+    
+    
+    async def _afan_out_node(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        routes = self._routes(state)[:self.fanout_max_agents]
+        
+        async def run(route):
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = await asyncio.wait_for(
+                    self.agents[route].aprocess(self._branch_state(state)),
+                    timeout=self.agent_deadline
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"Agent {route} missed its {self.agent_deadline}s deadline")
+                error = "timeout"
+            except BulkheadFullError as e:
+                logger.warning(f"Agent {route} rejected, LLM overloaded: {e}")
+                error = "overloaded"
+            except Exception as e:
+                logger.error(f"Agent {route} failed: {e}")
+                error = "error"
+            return result, time.perf_counter() - started, error
+        
+        results = await asyncio.gather(*(run(route) for route in routes))
+        
+        return self._merge_branches(state, routes, dict(zip(routes, results)))
+    
+    
     def _format_response(self, state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("Formatting final response")
         
         # Handle both AgentState and dict
         if isinstance(state, dict):
             agent_outputs = state.get('agent_outputs', {})
+            fast_response = state.get('metadata', {}).get('emergency_fast_response')
         else:
             agent_outputs = state.agent_outputs
+            fast_response = state.metadata.get('emergency_fast_response')
         
-        # Get the response from whichever agent processed it
-        response = (
-            agent_outputs.get('symptom_analysis') or
-            agent_outputs.get('disease_info') or
-            agent_outputs.get('treatment_advice') or
-            agent_outputs.get('emergency_triage') or
-            'No response generated'
-        )
+        # Priority order, so an emergency assessment always comes first
+        sections = [
+            (title, agent_outputs[key])
+            for key, title in AGENT_OUTPUTS.values()
+            if agent_outputs.get(key)
+        ]
+        
+        if len(sections) > 1:
+            response = "\n\n".join(f"## {title}\n\n{output}" for title, output in sections)
+        elif sections:
+            response = sections[0][1]
+        else:
+            response = 'No response generated'
+        
+        # Protocol guidance leads, so it survives even when the detailed triage failed
+        if fast_response:
+            response = f"{fast_response}\n\n{response}"
         
         # Update state
         if isinstance(state, dict):
@@ -108,22 +362,40 @@ class MedicalWorkflow:
         return state
     
     
+    @staticmethod
+    def _traced_node(name: str, func, afunc=None) -> RunnableLambda:
+        span_name = f"node.{name}"
+        return RunnableLambda(
+            traced(span_name)(func),
+            afunc=traced(span_name)(afunc) if afunc is not None else None
+        )
+    
+    
     def _build_graph(self) -> StateGraph:
         workflow = StateGraph(AgentState)
         
-        workflow.add_node("symptom_analyzer", self._symptom_analyzer_node)
-        workflow.add_node("disease_expert", self._disease_expert_node)
-        workflow.add_node("treatment_advisor", self._treatment_advisor_node)
-        workflow.add_node("emergency_triage", self._emergency_triage_node)
-        workflow.add_node("format_response", self._format_response)
+        # graph.invoke runs the sync node, graph.ainvoke the agent's aprocess
+        workflow.add_node("symptom_analyzer", self._traced_node("symptom_analyzer", self._symptom_analyzer_node, self.symptom_analyzer.aprocess))
+        workflow.add_node("disease_expert", self._traced_node("disease_expert", self._disease_expert_node, self.disease_expert.aprocess))
+        workflow.add_node("treatment_advisor", self._traced_node("treatment_advisor", self._treatment_advisor_node, self.treatment_advisor.aprocess))
+        workflow.add_node("emergency_triage", self._traced_node("emergency_triage", self._emergency_triage_node, self.emergency_triage.aprocess))
+        workflow.add_node("fan_out", self._traced_node("fan_out", self._fan_out_node, self._afan_out_node))
+        workflow.add_node("retrieve", self._traced_node("retrieve", self._retrieve_node, self._aretrieve_node))
+        workflow.add_node("route", self._traced_node("route", self._route_node))
+        workflow.add_node("format_response", self._traced_node("format_response", self._format_response))
         
-        workflow.set_conditional_entry_point(
+        # Embed and search once; routing and every agent read from the shared state
+        workflow.set_entry_point("retrieve")
+        workflow.add_edge("retrieve", "route")
+        workflow.add_conditional_edges(
+            "route",
             self._route_query,
             {
                 "symptom_analyzer": "symptom_analyzer",
                 "disease_expert": "disease_expert",
                 "treatment_advisor": "treatment_advisor",
-                "emergency_triage": "emergency_triage"
+                "emergency_triage": "emergency_triage",
+                "fan_out": "fan_out"
             }
         )
         
@@ -131,12 +403,18 @@ class MedicalWorkflow:
         workflow.add_edge("disease_expert", "format_response")
         workflow.add_edge("treatment_advisor", "format_response")
         workflow.add_edge("emergency_triage", "format_response")
+        workflow.add_edge("fan_out", "format_response")
         
         workflow.add_edge("format_response", END)
         
         return workflow.compile()
     
     
+    def _record_timings(self, final_state: Dict[str, Any], trace) -> None:
+        final_state['metadata']['trace_id'] = trace.trace_id
+        final_state['metadata']['timings_ms'] = trace.durations_ms()
+    
+    
     def process(self, query: str) -> Dict[str, Any]:
         logger.info(f"Processing query: '{query}'")
         
@@ -147,7 +425,30 @@ class MedicalWorkflow:
             metadata={}
         )
         
-        final_state = self.graph.invoke(initial_state.dict())
+        with start_trace("workflow") as trace:
+            final_state = self.graph.invoke(initial_state.dict())
+        
+        self._record_timings(final_state, trace)
+        
+        logger.info("Workflow complete")
+        
+        return final_state
+    
+    
+    async def aprocess(self, query: str) -> Dict[str, Any]:
+        logger.info(f"Processing query: '{query}'")
+        
+        initial_state = AgentState(
+            query=query,
+            rag_results=[],
+            agent_outputs={},
+            metadata={}
+        )
+        
+        with start_trace("workflow") as trace:
+            final_state = await self.graph.ainvoke(initial_state.dict())
+        
+        self._record_timings(final_state, trace)
         
         logger.info("Workflow complete")
         
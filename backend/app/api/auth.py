@@ -1,7 +1,8 @@
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import logging
 
@@ -11,8 +12,11 @@ from app.auth.security import (
     hash_password,
     create_access_token,
     authenticate_user,
-    get_current_user
+    get_current_user,
+    get_stored_user,
+    user_claims
 )
+from app.auth.user_cache import invalidate_user
 
 logger = logging.getLogger(__name__)
 
@@ -40,14 +44,14 @@ class UserResponse(BaseModel):
     id: str
     email: str
     name: Optional[str]
-    created_at: str
+    created_at: Optional[str]
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
 
     try:
-        existing_user = db.query(User).filter(User.email == request.email).first()
+        existing_user = (await db.execute(select(User).where(User.email == request.email))).scalars().first()
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,12 +66,10 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
         
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
         
-        access_token = create_access_token(
-            data={"sub": str(new_user.id), "email": new_user.email}
-        )
+        access_token = create_access_token(data=user_claims(new_user))
         
         logger.info(f"New user registered: {new_user.email}")
         
@@ -85,7 +87,7 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         logger.error(f"Registration failed: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed"
@@ -93,10 +95,10 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
 
     try:
-        user = authenticate_user(request.email, request.password, db)
+        user = await authenticate_user(request.email, request.password, db)
         
         if not user:
             raise HTTPException(
@@ -104,9 +106,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
                 detail="Incorrect email or password"
             )
         
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
+        access_token = create_access_token(data=user_claims(user))
         
         logger.info(f"User logged in: {user.email}")
         
@@ -131,13 +131,13 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_stored_user)):
     
     return UserResponse(
         id=str(current_user.id),
         email=current_user.email,
         name=current_user.name,
-        created_at=current_user.created_at.isoformat()
+        created_at=current_user.created_at.isoformat() if current_user.created_at else None
     )
 
 
@@ -145,28 +145,39 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
 async def update_profile(
     name: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
+        # current_user may be a cached snapshot; edit the stored row
+        user = await db.get(User, current_user.id)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+        
         if name is not None:
-            current_user.name = name
+            user.name = name
         
-        db.commit()
-        db.refresh(current_user)
+        await db.commit()
+        # Again after commit, so a request that read the old row mid-update can't leave it cached
+        invalidate_user(user.id)
         
-        logger.info(f"User profile updated: {current_user.email}")
+        logger.info(f"User profile updated: {user.email}")
         
         return UserResponse(
-            id=str(current_user.id),
-            email=current_user.email,
-            name=current_user.name,
-            created_at=current_user.created_at.isoformat()
+            id=str(user.id),
+            email=user.email,
+            name=user.name,
+            created_at=user.created_at.isoformat() if user.created_at else None
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Profile update failed: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Profile update failed"
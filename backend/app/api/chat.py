@@ -1,10 +1,14 @@
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 import logging
 
 from app.llm.rag_chain import get_rag_chain
+from app.utils.emergency_protocols import get_emergency_protocols
+from app.utils.resilience import BulkheadFullError
+from app.utils.sse import SSE_HEADERS, format_sse
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,17 @@ class ChatResponse(BaseModel):
     n_results: int
 
 
+def _to_rag_results(results: List[Dict]) -> List[RAGResult]:
+    return [
+        RAGResult(
+            name=r['metadata']['name'],
+            type=r['metadata']['type'],
+            similarity=round(r['similarity'], 3)
+        )
+        for r in results
+    ]
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
     
@@ -39,29 +54,22 @@ async def chat_with_ai(request: ChatRequest):
         chain = get_rag_chain()
         
         if request.chat_type == "symptoms":
-            result = chain.analyze_symptoms(
+            result = await chain.aanalyze_symptoms(
                 query=request.query,
                 n_results=request.n_results
             )
         elif request.chat_type == "disease":
-            result = chain.get_disease_info(
+            result = await chain.aget_disease_info(
                 query=request.query,
                 n_results=request.n_results
             )
         else: 
-            result = chain.answer_question(
+            result = await chain.aanswer_question(
                 query=request.query,
                 n_results=request.n_results
             )
         
-        rag_results = [
-            RAGResult(
-                name=r['metadata']['name'],
-                type=r['metadata']['type'],
-                similarity=round(r['similarity'], 3)
-            )
-            for r in result['rag_results']
-        ]
+        rag_results = _to_rag_results(result['rag_results'])
         
         logger.info(f"Generated response (length: {len(result['response'])})")
         
@@ -72,6 +80,13 @@ async def chat_with_ai(request: ChatRequest):
             n_results=result['n_results']
         )
         
+    except BulkheadFullError as e:
+        logger.warning(f"Chat rejected, LLM overloaded: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="AI service is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Chat failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
@@ -88,4 +103,60 @@ async def analyze_symptoms(request: ChatRequest):
 async def get_disease_info(request: ChatRequest):
     
     request.chat_type = "disease"
-    return await chat_with_ai(request)
\ No newline at end of file
+    return await chat_with_ai(request)
+
+
+@router.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """Same as /chat, streamed as Server-Sent Events.
+
+    Clear emergencies first get an ``emergency`` event with precomputed protocol
+    guidance. Then one ``rag_results`` event, ``token`` events as the model
+    produces text, and ``done``. Failures after the stream has started arrive as an
+    ``error`` event since the status code is already sent; its ``code`` is
+    ``overloaded`` when the LLM queue is full (retry later) and ``failed`` otherwise.
+    """
+    
+    try:
+        logger.info(f"Streaming chat request: query='{request.query}', type={request.chat_type}")
+        
+        fast_response = get_emergency_protocols().respond(request.query)
+        
+        chain = get_rag_chain()
+        prepared = await chain.aprepare(
+            request.chat_type,
+            request.query,
+            request.n_results
+        )
+        
+    except Exception as e:
+        logger.error(f"Chat failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+    
+    async def event_stream():
+        if fast_response:
+            yield format_sse("emergency", {"text": fast_response})
+        yield format_sse("rag_results", {
+            "query": prepared["query"],
+            "rag_results": [r.dict() for r in _to_rag_results(prepared["rag_results"])],
+            "n_results": len(prepared["rag_results"])
+        })
+        
+        length = 0
+        try:
+            async for token in chain.astream(prepared):
+                length += len(token)
+                yield format_sse("token", {"text": token})
+        except BulkheadFullError as e:
+            logger.warning(f"Streaming chat rejected, LLM overloaded: {e}")
+            yield format_sse("error", {"code": "overloaded", "detail": "AI service is busy, please retry shortly"})
+            return
+        except Exception as e:
+            logger.error(f"Streaming chat failed: {e}", exc_info=True)
+            yield format_sse("error", {"code": "failed", "detail": f"Chat failed: {str(e)}"})
+            return
+        
+        logger.info(f"Streamed response (length: {length})")
+        yield format_sse("done", {"length": length})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import Select, and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, NamedTuple, Optional, Tuple
 from datetime import datetime
+import base64
+import binascii
 import logging
 import uuid
 
@@ -10,11 +15,25 @@ from app.database.connection import get_db
 from app.models.database import User, Conversation, Message, MedicalHistory
 from app.auth.security import get_current_user
 from app.agents.workflow import get_workflow
+from app.utils.emergency_protocols import get_emergency_protocols
+from app.utils.resilience import BulkheadFullError
+from app.utils.sse import SSE_HEADERS, format_sse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/conversations", tags=["Conversations"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Output key -> agent name. With fan-out several outputs come back; emergency wins
+# so the exchange is still recorded as one and logged to medical history as severe
+AGENT_NAMES = [
+    ("emergency_triage", "EmergencyTriage"),
+    ("symptom_analysis", "SymptomAnalyzer"),
+    ("disease_info", "DiseaseExpert"),
+    ("treatment_advice", "TreatmentAdvisor")
+]
+
 
 class MessageResponse(BaseModel):
     id: str
@@ -52,21 +71,122 @@ class ChatResponse(BaseModel):
     agent_used: str
 
 
+def encode_cursor(updated_at: datetime, conversation_id: uuid.UUID) -> str:
+    raw = f"{updated_at.isoformat()}|{conversation_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, conversation_id = raw.split("|")
+        return datetime.fromisoformat(updated_at), uuid.UUID(conversation_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def conversation_page_statement(
+    user_id,
+    limit: int,
+    cursor: Optional[Tuple[datetime, uuid.UUID]] = None,
+    offset: int = 0
+) -> Select:
+    
+    statement = select(
+        Conversation.id,
+        Conversation.title,
+        Conversation.created_at,
+        Conversation.updated_at
+    ).where(Conversation.user_id == user_id)
+    
+    if cursor:
+        # Keyset on (updated_at, id): seek past the last row instead of counting through skipped ones
+        cursor_updated_at, cursor_id = cursor
+        statement = statement.where(or_(
+            Conversation.updated_at < cursor_updated_at,
+            and_(Conversation.updated_at == cursor_updated_at, Conversation.id < cursor_id)
+        ))
+    
+    statement = statement.order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+    
+    if offset and not cursor:
+        statement = statement.offset(offset)
+    
+    return statement.limit(limit)
+
+
+def message_count_statement(conversation_ids: list) -> Select:
+    # One grouped COUNT for the whole page; message bodies are never loaded
+    return select(Message.conversation_id, func.count(Message.id))\
+        .where(Message.conversation_id.in_(conversation_ids))\
+        .group_by(Message.conversation_id)
+
+
+async def list_conversation_page(
+    db: AsyncSession,
+    user_id,
+    limit: int,
+    cursor: Optional[Tuple[datetime, uuid.UUID]] = None,
+    offset: int = 0
+) -> Tuple[list, dict]:
+    
+    conversations = (await db.execute(conversation_page_statement(user_id, limit, cursor, offset))).all()
+    
+    message_counts = {}
+    if conversations:
+        rows = await db.execute(message_count_statement([conv.id for conv in conversations]))
+        message_counts = dict(rows.all())
+    
+    return conversations, message_counts
+
+
+async def get_user_conversation(
+    db: AsyncSession,
+    conversation_id: uuid.UUID,
+    user_id,
+    *options
+) -> Optional[Conversation]:
+    
+    result = await db.execute(
+        select(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.user_id == user_id)
+        .options(*options)
+    )
+    return result.scalars().first()
+
+
 @router.get("", response_model=List[ConversationResponse])
 async def get_conversations(
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    limit: int = 50,
-    offset: int = 0
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None
 ):
+    """List conversations, most recently updated first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to fetch the
+    next page; the header is absent on the last page. ``offset`` still works
+    without a cursor but gets slower the deeper it pages.
+    """
     
     try:
-        conversations = db.query(Conversation)\
-            .filter(Conversation.user_id == current_user.id)\
-            .order_by(Conversation.updated_at.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        conversations, message_counts = await list_conversation_page(
+            db,
+            current_user.id,
+            limit,
+            cursor=decode_cursor(cursor) if cursor else None,
+            offset=offset
+        )
+        
+        if len(conversations) == limit:
+            last = conversations[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.updated_at, last.id)
         
         return [
             ConversationResponse(
@@ -74,11 +194,13 @@ async def get_conversations(
                 title=conv.title or "New Conversation",
                 created_at=conv.created_at.isoformat(),
                 updated_at=conv.updated_at.isoformat(),
-                message_count=len(conv.messages)
+                message_count=message_counts.get(conv.id, 0)
             )
             for conv in conversations
         ]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get conversations: {e}", exc_info=True)
         raise HTTPException(
@@ -91,17 +213,12 @@ async def get_conversations(
 async def get_conversation(
     conversation_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
         conversation_id_uuid = uuid.UUID(conversation_id)
-        conversation = db.query(Conversation)\
-            .filter(
-                Conversation.id == conversation_id_uuid,
-                Conversation.user_id == current_user.id
-            )\
-            .first()
+        conversation = await get_user_conversation(db, conversation_id_uuid, current_user.id)
         
         if not conversation:
             raise HTTPException(
@@ -109,10 +226,11 @@ async def get_conversation(
                 detail="Conversation not found"
             )
         
-        messages = db.query(Message)\
-            .filter(Message.conversation_id == conversation_id_uuid)\
-            .order_by(Message.timestamp.asc())\
-            .all()
+        messages = (await db.execute(
+            select(Message)
+            .where(Message.conversation_id == conversation_id_uuid)
+            .order_by(Message.timestamp.asc())
+        )).scalars().all()
         
         return ConversationDetailResponse(
             id=str(conversation.id),
@@ -141,122 +259,260 @@ async def get_conversation(
         )
 
 
+class PendingExchange(NamedTuple):
+    user_id: uuid.UUID
+    conversation_id: uuid.UUID
+    is_new_conversation: bool
+    query: str
+    asked_at: datetime
+
+
+async def _start_exchange(db: AsyncSession, current_user: User, request: ChatRequest) -> PendingExchange:
+    
+    asked_at = datetime.utcnow()
+    
+    if request.conversation_id:
+        conversation_id_uuid = uuid.UUID(request.conversation_id)
+        exists = (await db.execute(
+            select(Conversation.id).where(
+                Conversation.id == conversation_id_uuid,
+                Conversation.user_id == current_user.id
+            )
+        )).first()
+        
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+        
+        exchange = PendingExchange(current_user.id, conversation_id_uuid, False, request.query, asked_at)
+    else:
+        # The id is assigned up front so nothing has to be inserted before the LLM answers
+        exchange = PendingExchange(current_user.id, uuid.uuid4(), True, request.query, asked_at)
+    
+    # Nothing is written yet; hand the connection back to the pool for the length of the LLM call
+    await db.close()
+    
+    return exchange
+
+
+async def _save_exchange(
+    db: AsyncSession,
+    exchange: PendingExchange,
+    response_text: str,
+    agent_used: Optional[str]
+) -> Message:
+    
+    now = datetime.utcnow()
+    
+    if exchange.is_new_conversation:
+        db.add(Conversation(
+            id=exchange.conversation_id,
+            user_id=exchange.user_id,
+            title=exchange.query[:50],
+            created_at=exchange.asked_at,
+            updated_at=now
+        ))
+    else:
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == exchange.conversation_id)
+            .values(updated_at=now)
+        )
+    
+    ai_message = Message(
+        id=uuid.uuid4(),
+        conversation_id=exchange.conversation_id,
+        role="assistant",
+        content=response_text,
+        agent_used=agent_used,
+        timestamp=now
+    )
+    db.add_all([
+        Message(
+            conversation_id=exchange.conversation_id,
+            role="user",
+            content=exchange.query,
+            timestamp=exchange.asked_at
+        ),
+        ai_message
+    ])
+    
+    if agent_used in ["SymptomAnalyzer", "EmergencyTriage"]:
+        severity = "severe" if agent_used == "EmergencyTriage" else "moderate"
+        
+        medical_entry = MedicalHistory(
+            user_id=exchange.user_id,
+            symptoms=exchange.query,
+            agent_assessment=response_text,
+            emergency_detected="true" if agent_used == "EmergencyTriage" else "false",
+            severity=severity
+        )
+        db.add(medical_entry)
+    
+    # Conversation, both messages and the history entry land in one transaction
+    await db.commit()
+    
+    return ai_message
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
-        if request.conversation_id:
-            conversation_id_uuid = uuid.UUID(request.conversation_id)
-            conversation = db.query(Conversation)\
-                .filter(
-                    Conversation.id == conversation_id_uuid,
-                    Conversation.user_id == current_user.id
-                )\
-                .first()
-            
-            if not conversation:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Conversation not found"
-                )
-        else:
-            conversation = Conversation(
-                user_id=current_user.id,
-                title=request.query[:50] 
-            )
-            db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-        
-        user_message = Message(
-            conversation_id=conversation.id,
-            role="user",
-            content=request.query
-        )
-        db.add(user_message)
-        db.commit()
+        exchange = await _start_exchange(db, current_user, request)
         
         workflow = get_workflow()
-        result = workflow.process(request.query)
+        result = await workflow.aprocess(request.query)
         
-        agent_used = None
-        if result.get('agent_outputs'):
-            outputs = result['agent_outputs']
-            if outputs.get('symptom_analysis'):
-                agent_used = "SymptomAnalyzer"
-            elif outputs.get('disease_info'):
-                agent_used = "DiseaseExpert"
-            elif outputs.get('treatment_advice'):
-                agent_used = "TreatmentAdvisor"
-            elif outputs.get('emergency_triage'):
-                agent_used = "EmergencyTriage"
+        outputs = result.get('agent_outputs') or {}
+        agent_used = next((name for key, name in AGENT_NAMES if outputs.get(key)), None)
         
         response_text = result.get('final_response', 'No response generated')
         
-        ai_message = Message(
-            conversation_id=conversation.id,
-            role="assistant",
-            content=response_text,
-            agent_used=agent_used
-        )
-        db.add(ai_message)
-        
-        conversation.updated_at = datetime.utcnow()
-        
-        if agent_used in ["SymptomAnalyzer", "EmergencyTriage"]:
-            severity = "severe" if agent_used == "EmergencyTriage" else "moderate"
-            
-            medical_entry = MedicalHistory(
-                user_id=current_user.id,
-                symptoms=request.query,
-                agent_assessment=response_text,
-                emergency_detected="true" if agent_used == "EmergencyTriage" else "false",
-                severity=severity
-            )
-            db.add(medical_entry)
-        
-        db.commit()
-        db.refresh(ai_message)
+        ai_message = await _save_exchange(db, exchange, response_text, agent_used)
         
         logger.info(f"Chat processed for user {current_user.email}, agent: {agent_used}")
         
         return ChatResponse(
-            conversation_id=str(conversation.id),
+            conversation_id=str(exchange.conversation_id),
             message_id=str(ai_message.id),
             response=response_text,
             agent_used=agent_used or "Unknown"
         )
         
+    except HTTPException:
+        raise
+    except BulkheadFullError as e:
+        logger.warning(f"Chat rejected, LLM overloaded: {e}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI service is busy, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        logger.error(f"Chat failed: {e}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Chat processing failed: {str(e)}"
+        )
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Conversation chat streamed as Server-Sent Events.
+
+    Emits ``conversation`` (ids and the routed agent), ``emergency`` with
+    precomputed protocol guidance for clear emergencies, ``rag_results``, then
+    ``token`` events, and finally ``done`` with the id of the assistant message.
+    The exchange is only persisted once the full response has been generated.
+    """
+    
+    try:
+        exchange = await _start_exchange(db, current_user, request)
+        conversation_id = exchange.conversation_id
+        user_id = exchange.user_id
+        
+        fast_response = get_emergency_protocols().respond(request.query)
+        
+        workflow = get_workflow()
+        query_embedding = await workflow.aencode_query(request.query)
+        agent = workflow.select_agent(request.query, query_embedding)
+        rag_results, prompt = await agent.aprepare(request.query, query_embedding)
+        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Chat failed: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chat processing failed: {str(e)}"
         )
+    
+    async def event_stream():
+        yield format_sse("conversation", {
+            "conversation_id": str(conversation_id),
+            "agent_used": agent.name
+        })
+        if fast_response:
+            yield format_sse("emergency", {"text": fast_response})
+        yield format_sse("rag_results", [
+            {
+                "name": r['metadata']['name'],
+                "type": r['metadata']['type'],
+                "similarity": round(r['similarity'], 3)
+            }
+            for r in rag_results
+        ])
+        
+        parts = [f"{fast_response}\n\n"] if fast_response else []
+        try:
+            async for token in agent.astream_response(prompt):
+                parts.append(token)
+                yield format_sse("token", {"text": token})
+            
+            # The session was closed before streaming; a closed AsyncSession is
+            # reusable and starts a fresh transaction here
+            ai_message = await _save_exchange(
+                db,
+                exchange,
+                "".join(parts) or "No response generated",
+                agent.name
+            )
+            message_id = str(ai_message.id)
+            
+        except BulkheadFullError as e:
+            logger.warning(f"Streaming chat rejected, LLM overloaded: {e}")
+            await db.rollback()
+            yield format_sse("error", {"code": "overloaded", "detail": "AI service is busy, please retry shortly"})
+            return
+        except Exception as e:
+            logger.error(f"Streaming chat failed: {e}", exc_info=True)
+            await db.rollback()
+            yield format_sse("error", {"code": "failed", "detail": f"Chat processing failed: {str(e)}"})
+            return
+        finally:
+            await db.close()
+        
+        logger.info(f"Streamed chat for user {user_id}, agent: {agent.name}")
+        
+        yield format_sse("done", {
+            "conversation_id": str(conversation_id),
+            "message_id": message_id,
+            "agent_used": agent.name
+        })
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
     conversation_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
         conversation_id_uuid = uuid.UUID(conversation_id)
-        conversation = db.query(Conversation)\
-            .filter(
-                Conversation.id == conversation_id_uuid,
-                Conversation.user_id == current_user.id
-            )\
-            .first()
+        # The delete-orphan cascade needs the messages loaded up front; async can't lazy-load them
+        conversation = await get_user_conversation(
+            db,
+            conversation_id_uuid,
+            current_user.id,
+            selectinload(Conversation.messages)
+        )
         
         if not conversation:
             raise HTTPException(
@@ -264,8 +520,8 @@ async def delete_conversation(
                 detail="Conversation not found"
             )
         
-        db.delete(conversation)
-        db.commit()
+        await db.delete(conversation)
+        await db.commit()
         
         logger.info(f"Conversation {conversation_id} deleted by user {current_user.email}")
         
@@ -273,7 +529,7 @@ async def delete_conversation(
         raise
     except Exception as e:
         logger.error(f"Failed to delete conversation: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete conversation"
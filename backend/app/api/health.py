@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from datetime import datetime
 import asyncio
 from app.utils.metrics import get_metrics
+from app.utils.single_flight import get_single_flight
 
 router = APIRouter(prefix="/api", tags=["Health"])
 
@@ -28,7 +29,13 @@ async def detailed_health_check():
                 "vector_store": "healthy" if vector_status else "unhealthy",
                 "llm_service": "healthy" if llm_status else "unhealthy"
             },
-            "metrics": metrics.get_stats()
+            "metrics": metrics.get_stats(),
+            "database_pool": get_database_pool_stats(),
+            "embedding_batcher": get_embedding_batcher_stats(),
+            "response_cache": get_response_cache_stats(),
+            "user_cache": get_user_cache_stats(),
+            "llm": get_llm_stats(),
+            "single_flight": get_single_flight().get_stats()
         }
     except Exception as e:
         return {
@@ -37,16 +44,43 @@ async def detailed_health_check():
             "timestamp": datetime.utcnow().isoformat()
         }
 
+def get_embedding_batcher_stats():
+    from app.rag.embedding_batcher import get_embedding_batcher
+    batcher = get_embedding_batcher()
+    return batcher.get_stats() if batcher else None
+
+def get_response_cache_stats():
+    from app.llm.response_cache import get_response_cache
+    cache = get_response_cache()
+    return cache.get_stats() if cache else None
+
+def get_user_cache_stats():
+    from app.auth.user_cache import get_user_cache
+    cache = get_user_cache()
+    return cache.get_stats() if cache else None
+
+def get_llm_stats():
+    try:
+        from app.llm.gemini import get_gemini_llm
+        return get_gemini_llm().get_stats()
+    except Exception:
+        return None
+
 async def check_database_health() -> bool:
     try:
         from app.database.connection import get_db_manager
-        db_manager = get_db_manager()
-        with db_manager.get_session() as session:
-            session.execute("SELECT 1")
+        await get_db_manager().ping()
         return True
     except:
         return False
 
+def get_database_pool_stats():
+    try:
+        from app.database.connection import get_db_manager
+        return get_db_manager().get_pool_stats()
+    except Exception:
+        return None
+
 async def check_vector_store_health() -> bool:
     try:
         from app.rag.vectorstore import get_vector_store
@@ -60,7 +94,7 @@ async def check_llm_health() -> bool:
     try:
         from app.llm.gemini import get_gemini_llm
         llm = get_gemini_llm()
-        response = llm.generate("test")
+        response = await llm.agenerate("test")
         return len(response) > 0
     except:
         return False
@@ -1,7 +1,8 @@
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
@@ -27,18 +28,19 @@ class MedicalHistoryResponse(BaseModel):
 @router.get("", response_model=List[MedicalHistoryResponse])
 async def get_medical_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     limit: int = 50,
     offset: int = 0
 ):
     
     try:
-        history = db.query(MedicalHistory)\
-            .filter(MedicalHistory.user_id == current_user.id)\
-            .order_by(MedicalHistory.date.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        history = (await db.execute(
+            select(MedicalHistory)
+            .where(MedicalHistory.user_id == current_user.id)
+            .order_by(MedicalHistory.date.desc())
+            .limit(limit)
+            .offset(offset)
+        )).scalars().all()
         
         return [
             MedicalHistoryResponse(
@@ -65,16 +67,17 @@ async def get_medical_history(
 async def get_medical_history_entry(
     history_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
-        entry = db.query(MedicalHistory)\
-            .filter(
+        entry = (await db.execute(
+            select(MedicalHistory)
+            .where(
                 MedicalHistory.id == history_id,
                 MedicalHistory.user_id == current_user.id
-            )\
-            .first()
+            )
+        )).scalars().first()
         
         if not entry:
             raise HTTPException(
@@ -106,16 +109,17 @@ async def get_medical_history_entry(
 async def delete_medical_history_entry(
     history_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     
     try:
-        entry = db.query(MedicalHistory)\
-            .filter(
+        entry = (await db.execute(
+            select(MedicalHistory)
+            .where(
                 MedicalHistory.id == history_id,
                 MedicalHistory.user_id == current_user.id
-            )\
-            .first()
+            )
+        )).scalars().first()
         
         if not entry:
             raise HTTPException(
@@ -123,8 +127,8 @@ async def delete_medical_history_entry(
                 detail="Medical history entry not found"
             )
         
-        db.delete(entry)
-        db.commit()
+        await db.delete(entry)
+        await db.commit()
         
         logger.info(f"Medical history entry {history_id} deleted by user {current_user.email}")
         
@@ -132,7 +136,7 @@ async def delete_medical_history_entry(
         raise
     except Exception as e:
         logger.error(f"Failed to delete medical history entry: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete medical history entry"
@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 import logging
 
+from app.rag.executor import run_blocking
 from app.rag.medical_rag import get_medical_rag
 
 logger = logging.getLogger(__name__)
@@ -15,6 +16,7 @@ class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query", min_length=1)
     n_results: int = Field(5, description="Number of results", ge=1, le=20)
     filter_type: Optional[str] = Field(None, description="Filter by type: 'symptom' or 'disease'")
+    mode: Optional[str] = Field(None, description="Retrieval mode: 'vector' or 'hybrid' (BM25 + vector)", pattern="^(vector|hybrid)$")
 
 
 class SearchResult(BaseModel):
@@ -33,6 +35,33 @@ class SearchResponse(BaseModel):
     count: int
 
 
+class BatchSearchRequest(BaseModel):
+
+    queries: List[str] = Field(..., description="Search queries", min_length=1, max_length=20)
+    n_results: int = Field(5, description="Number of results per query", ge=1, le=20)
+    filter_type: Optional[str] = Field(None, description="Filter by type: 'symptom' or 'disease'")
+
+
+class BatchSearchResponse(BaseModel):
+    
+    results: List[SearchResponse]
+    count: int
+
+
+def _to_search_results(results: List[Dict]) -> List[SearchResult]:
+    
+    return [
+        SearchResult(
+            name=r['metadata']['name'],
+            type=r['metadata']['type'],
+            id=r['metadata']['id'],
+            similarity=round(r['similarity'], 3),
+            text=r['text']
+        )
+        for r in results
+    ]
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search_medical_knowledge(request: SearchRequest):
     
@@ -41,22 +70,14 @@ async def search_medical_knowledge(request: SearchRequest):
         
         rag = get_medical_rag()
         
-        results = rag.search(
+        results = await rag.asearch(
             query=request.query,
             n_results=request.n_results,
-            filter_type=request.filter_type
+            filter_type=request.filter_type,
+            mode=request.mode
         )
         
-        formatted_results = [
-            SearchResult(
-                name=r['metadata']['name'],
-                type=r['metadata']['type'],
-                id=r['metadata']['id'],
-                similarity=round(r['similarity'], 3),
-                text=r['text']
-            )
-            for r in results
-        ]
+        formatted_results = _to_search_results(results)
         
         logger.info(f"Found {len(formatted_results)} results")
         
@@ -71,6 +92,40 @@ async def search_medical_knowledge(request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def batch_search_medical_knowledge(request: BatchSearchRequest):
+    
+    try:
+        logger.info(f"Batch search request: {len(request.queries)} queries, n_results={request.n_results}, filter={request.filter_type}")
+        
+        rag = get_medical_rag()
+        
+        results_per_query = await run_blocking(
+            rag.search_many,
+            queries=request.queries,
+            n_results=request.n_results,
+            filter_type=request.filter_type
+        )
+        
+        responses = []
+        for query, results in zip(request.queries, results_per_query):
+            formatted_results = _to_search_results(results)
+            responses.append(SearchResponse(
+                query=query,
+                results=formatted_results,
+                count=len(formatted_results)
+            ))
+        
+        return BatchSearchResponse(
+            results=responses,
+            count=len(responses)
+        )
+        
+    except Exception as e:
+        logger.error(f"Batch search failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
+
 @router.get("/search/stats")
 async def get_search_stats():
     
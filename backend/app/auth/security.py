@@ -1,14 +1,17 @@
 import os
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
+from app.auth.user_cache import UserSnapshot, get_user_cache
 from app.database.connection import get_db
 from app.models.database import User
 
@@ -19,6 +22,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRATION_MINUTES", "10080"))
+USER_CLAIMS_ENABLED = os.getenv("JWT_USER_CLAIMS_ENABLED", "false").lower() == "true"
+USER_CLAIMS_MAX_AGE_SECONDS = int(os.getenv("JWT_USER_CLAIMS_MAX_AGE_SECONDS", "300"))
 
 security = HTTPBearer()
 
@@ -46,6 +51,37 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def user_claims(user: User) -> dict:
+    
+    claims = {"sub": str(user.id), "email": user.email}
+    
+    # Profile fields in the token let get_current_user skip the database entirely
+    if USER_CLAIMS_ENABLED:
+        claims["name"] = user.name
+        claims["created_at"] = user.created_at.isoformat() if user.created_at else None
+        claims["iat"] = int(time.time())
+    
+    return claims
+
+
+def snapshot_from_claims(user_id: uuid.UUID, payload: dict) -> Optional[UserSnapshot]:
+    
+    if not USER_CLAIMS_ENABLED or not {"email", "name", "created_at", "iat"} <= payload.keys():
+        return None
+    
+    # The token outlives the profile it carries; past this age, look the user up again
+    if time.time() - payload["iat"] > USER_CLAIMS_MAX_AGE_SECONDS:
+        return None
+    
+    created_at = payload["created_at"]
+    return UserSnapshot(
+        id=user_id,
+        email=payload["email"],
+        name=payload["name"],
+        created_at=datetime.fromisoformat(created_at) if created_at else None
+    )
+
+
 def decode_access_token(token: str) -> dict:
     
     try:
@@ -60,12 +96,8 @@ def decode_access_token(token: str) -> dict:
         )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+async def _resolve_user(token: str, db: AsyncSession, trust_claims: bool) -> User:
     
-    token = credentials.credentials
     payload = decode_access_token(token)
     
     user_id_str: str = payload.get("sub")
@@ -83,19 +115,48 @@ def get_current_user(
             detail="Invalid user ID format"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    snapshot = snapshot_from_claims(user_id, payload) if trust_claims else None
+    if snapshot is not None:
+        return snapshot.to_user()
+    
+    cache = get_user_cache()
+    snapshot = cache.get(user_id) if cache else None
+    if snapshot is not None:
+        return snapshot.to_user()
+    
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    if cache:
+        cache.put(UserSnapshot.from_user(user))
+    
     return user
 
 
-def authenticate_user(email: str, password: str, db: Session) -> Optional[User]:
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    
+    return await _resolve_user(credentials.credentials, db, trust_claims=True)
+
+
+async def get_stored_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    
+    # For endpoints that show the profile: token claims may predate an edit, the cache is invalidated by it
+    return await _resolve_user(credentials.credentials, db, trust_claims=False)
+
+
+async def authenticate_user(email: str, password: str, db: AsyncSession) -> Optional[User]:
     
-    user = db.query(User).filter(User.email == email).first()
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     
     if not user:
         return None
@@ -0,0 +1,129 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy import event
+
+from app.models.database import User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class UserSnapshot(NamedTuple):
+    id: uuid.UUID
+    email: str
+    name: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(user.id, user.email, user.name, user.created_at)
+
+    def to_user(self) -> User:
+        # A detached User so endpoints keep reading current_user.id/.email as before
+        return User(id=self.id, email=self.email, name=self.name, created_at=self.created_at)
+
+
+class UserCache:
+    """Short-lived cache of authenticated users, keyed by user id.
+
+    Entries expire after ``ttl_seconds`` and the least recently used one is
+    evicted past ``max_entries``. Invalidation is per process, so the TTL bounds
+    how long another worker can serve a stale profile.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[UserSnapshot]:
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or now - entry[1] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, snapshot: UserSnapshot) -> None:
+        with self._lock:
+            self._entries[snapshot.id] = (snapshot, time.monotonic())
+            self._entries.move_to_end(snapshot.id)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+_user_cache = None
+
+
+def get_user_cache() -> Optional[UserCache]:
+
+    global _user_cache
+
+    if os.getenv("AUTH_USER_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    if _user_cache is None:
+        logger.info("Creating global user cache instance")
+        _user_cache = UserCache(
+            ttl_seconds=float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30")),
+            max_entries=int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "10000"))
+        )
+
+    return _user_cache
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    cache = get_user_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+
+
+# Any flushed update or delete of a User in this process drops its cached copy
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target) -> None:
+    invalidate_user(target.id)
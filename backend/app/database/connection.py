@@ -1,16 +1,36 @@
 import os
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Dict, Generator
 
+from app.database.migrations import ensure_indexes
 from app.models.database import Base
 
 logger = logging.getLogger(__name__)
 
 
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+
+def to_async_url(database_url: str) -> str:
+    scheme, _, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
 class DatabaseManager:
+    """Owns the sync and async engines for one database.
+
+    Request handlers use the async engine (asyncpg, or aiosqlite locally) so DB
+    round trips never block the event loop; the sync engine is kept for table
+    creation, migrations and scripts.
+    """
     
     def __init__(self):
         self.database_url = os.getenv("DATABASE_URL")
@@ -24,12 +44,19 @@ class DatabaseManager:
         if self.database_url.startswith("postgres://"):
             self.database_url = self.database_url.replace("postgres://", "postgresql://", 1)
         
-        self.engine = create_engine(
-            self.database_url,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10
-        )
+        self.pool_settings = {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "pool_recycle": int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+        }
+        
+        engine_options = {"pool_pre_ping": True}
+        # SQLite's default pools take no sizing arguments
+        if not self.database_url.startswith("sqlite"):
+            engine_options.update(self.pool_settings)
+        
+        self.engine = create_engine(self.database_url, **engine_options)
         
         self.SessionLocal = sessionmaker(
             autocommit=False,
@@ -37,11 +64,25 @@ class DatabaseManager:
             bind=self.engine
         )
         
-        logger.info("Database connection initialized")
+        self.async_engine = create_async_engine(to_async_url(self.database_url), **engine_options)
+        
+        # Attributes stay loaded after commit; an expired attribute would need a lazy load, which async can't do
+        self.AsyncSessionLocal = async_sessionmaker(
+            self.async_engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        
+        logger.info(f"Database connection initialized (async driver: {self.async_engine.dialect.driver})")
     
     def create_tables(self):
         try:
             Base.metadata.create_all(bind=self.engine)
+            
+            created = ensure_indexes(self.engine)
+            if created:
+                logger.info(f"Added missing indexes: {', '.join(created)}")
+            
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Failed to create tables: {e}")
@@ -59,6 +100,42 @@ class DatabaseManager:
             raise
         finally:
             session.close()
+    
+    @asynccontextmanager
+    async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
+        session = self.AsyncSessionLocal()
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Database session error: {e}")
+            raise
+        finally:
+            await session.close()
+    
+    async def ping(self) -> None:
+        async with self.async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    def get_pool_stats(self) -> Dict:
+        pool = self.async_engine.pool
+        stats = {
+            "driver": self.async_engine.dialect.driver,
+            "pool_class": type(pool).__name__,
+            "settings": self.pool_settings
+        }
+        
+        # Queue pools report live usage; SQLite's static/null pools have nothing to report
+        if hasattr(pool, "checkedout"):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow()
+            })
+        
+        return stats
 
 
 _db_manager = None
@@ -74,7 +151,7 @@ def get_db_manager() -> DatabaseManager:
     return _db_manager
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     db_manager = get_db_manager()
-    with db_manager.get_session() as session:
-        yield session
\ No newline at end of file
+    async with db_manager.get_async_session() as session:
+        yield session
@@ -0,0 +1,59 @@
+import logging
+from typing import List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from app.models.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def missing_indexes(engine: Engine) -> list:
+    
+    inspector = inspect(engine)
+    missing = []
+    
+    for table in Base.metadata.sorted_tables:
+        # Tables that don't exist yet get their indexes from create_all
+        if not inspector.has_table(table.name):
+            continue
+        
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    
+    return missing
+
+
+def ensure_indexes(engine: Engine, concurrently: bool = False) -> List[str]:
+    """Create model indexes that are missing from already-existing tables.
+
+    ``create_all`` skips tables that exist, and their indexes with them, so
+    deployments created before an index was declared never get it. This is
+    idempotent. On PostgreSQL, ``concurrently=True`` builds each index without
+    blocking writes; run it ahead of a deploy on large tables (see
+    scripts/migrate_indexes.py) so startup finds nothing left to do.
+    """
+    
+    created = []
+    use_concurrently = concurrently and engine.dialect.name == "postgresql"
+    
+    for index in missing_indexes(engine):
+        logger.info(f"Creating index {index.name} on {index.table.name}")
+        
+        if use_concurrently:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            index.dialect_kwargs["postgresql_concurrently"] = True
+            try:
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            finally:
+                del index.dialect_kwargs["postgresql_concurrently"]
+        else:
+            with engine.begin() as conn:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+        
+        created.append(index.name)
+    
+    return created
@@ -1,14 +1,27 @@
 import os
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 import logging
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
+from app.utils.resilience import (
+    Bulkhead,
+    BulkheadFullError,
+    CircuitBreaker,
+    retry_with_backoff,
+    retry_with_backoff_sync
+)
+from app.utils.tracing import traced
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+FALLBACK_RESPONSE = "I'm experiencing technical difficulties. Please try again or consult a healthcare provider."
+
+
 class GeminiLLM:
     def __init__(
         self,
@@ -42,19 +55,122 @@ class GeminiLLM:
             
             logger.info("Gemini LLM initialized successfully")
             
+            # Bound upstream concurrency so a burst queues (or is rejected) here
+            # instead of turning into quota errors for every caller
+            self.bulkhead = Bulkhead(
+                "Gemini",
+                max_concurrent=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+                queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+            )
+            self.circuit_breaker = CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+                timeout=int(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "60"))
+            )
+            self.retry_attempts = int(os.getenv("LLM_RETRY_ATTEMPTS", "2"))
+            self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+            
         except Exception as e:
             logger.error(f"Failed to initialize Gemini: {e}")
             raise
     
+    @traced("llm.generate")
     def generate(self, prompt: str) -> str:
-        """Generate response using Gemini - synchronous version."""
+        """Generate response using Gemini - synchronous version.
+        
+        Raises BulkheadFullError when the LLM queue is full; other failures
+        degrade to FALLBACK_RESPONSE.
+        """
+        def invoke():
+            return self.llm.invoke(prompt).content
+        
+        def protected():
+            return self.circuit_breaker.call_sync(
+                lambda: retry_with_backoff_sync(invoke, self.retry_attempts, self.retry_base_delay)
+            )
+        
         try:
-            # ChatGoogleGenerativeAI.invoke() is synchronous, no need for async
-            response = self.llm.invoke(prompt)
+            return self.bulkhead.call(protected)
+        except BulkheadFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return FALLBACK_RESPONSE
+    
+    @traced("llm.generate")
+    async def agenerate(self, prompt: str) -> str:
+        """Generate response using Gemini without blocking the event loop."""
+        async def invoke():
+            response = await self.llm.ainvoke(prompt)
             return response.content
+        
+        async def with_retries():
+            return await retry_with_backoff(invoke, self.retry_attempts, self.retry_base_delay)
+        
+        async def protected():
+            return await self.circuit_breaker.call(with_retries)
+        
+        try:
+            return await self.bulkhead.call_async(protected)
+        except BulkheadFullError:
+            raise
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return "I'm experiencing technical difficulties. Please try again or consult a healthcare provider."
+            return FALLBACK_RESPONSE
+    
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield response text chunks as Gemini produces them."""
+        self.bulkhead.acquire()
+        emitted = False
+        try:
+            self.circuit_breaker.check()
+            try:
+                for chunk in self.llm.stream(prompt):
+                    if chunk.content:
+                        emitted = True
+                        yield chunk.content
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            # Once text is out, a fallback would read as part of the answer; let callers see it was cut off
+            if emitted:
+                raise
+            yield FALLBACK_RESPONSE
+        finally:
+            self.bulkhead.release()
+    
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async variant of stream() for use inside the event loop."""
+        await self.bulkhead.acquire_async()
+        emitted = False
+        try:
+            self.circuit_breaker.check()
+            try:
+                async for chunk in self.llm.astream(prompt):
+                    if chunk.content:
+                        emitted = True
+                        yield chunk.content
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+            self.circuit_breaker.record_success()
+        except Exception as e:
+            logger.error(f"Error streaming response: {e}")
+            # Once text is out, a fallback would read as part of the answer; let callers see it was cut off
+            if emitted:
+                raise
+            yield FALLBACK_RESPONSE
+        finally:
+            self.bulkhead.release()
+    
+    def get_stats(self) -> dict:
+        return {
+            "bulkhead": self.bulkhead.get_stats(),
+            "circuit_breaker": self.circuit_breaker.get_stats()
+        }
     
     def get_model(self):
         return self.llm
@@ -1,11 +1,17 @@
 import logging
-from typing import Dict, List
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from langchain.chains import LLMChain
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
+import numpy as np
 
+from app.rag.embedding_cache import normalize_text
+from app.rag.executor import run_blocking
 from app.rag.medical_rag import get_medical_rag
-from app.llm.gemini import get_gemini_llm
+from app.llm.gemini import FALLBACK_RESPONSE, get_gemini_llm
+from app.llm.response_cache import get_response_cache, is_emergency_query
+from app.utils.single_flight import get_single_flight
 from app.llm.prompts import (
     get_symptom_analysis_prompt,
     get_disease_info_prompt,
@@ -22,6 +28,12 @@ class MedicalRAGChain:
         
         self.rag = get_medical_rag()
         self.llm = get_gemini_llm()
+        self.response_cache = get_response_cache()
+        self.single_flight = (
+            get_single_flight()
+            if os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+            else None
+        )
         
         self.symptom_prompt = get_symptom_analysis_prompt()
         self.disease_prompt = get_disease_info_prompt()
@@ -49,6 +61,139 @@ class MedicalRAGChain:
         return "\n".join(context_parts)
     
     
+    def _cache_context(self, query: str, rag_results: List[Dict]) -> Tuple:
+        
+        doc_ids = [
+            (r['metadata'].get('type'), r['metadata'].get('id'))
+            for r in rag_results
+        ]
+        return doc_ids, is_emergency_query(query)
+    
+    
+    def _cache_lookup(self, prepared: Dict[str, any]) -> Tuple[Optional[str], Optional[Tuple]]:
+        
+        if self.response_cache is None:
+            return None, None
+        
+        doc_ids, is_emergency = self._cache_context(prepared["query"], prepared["rag_results"])
+        key = (prepared["query_embedding"], prepared["chain_type"], doc_ids, is_emergency)
+        
+        cached = self.response_cache.lookup(*key)
+        if cached is not None:
+            logger.info(f"Semantic cache hit for {prepared['chain_type']} query")
+        
+        return cached, key
+    
+    
+    def _cache_store(self, key: Optional[Tuple], response: str) -> None:
+        
+        # Fallbacks and empty answers are outages, not answers worth replaying
+        if key is not None and response and response != FALLBACK_RESPONSE:
+            self.response_cache.store(*key, response)
+    
+    
+    def _generate(self, prepared: Dict[str, any]) -> Tuple[str, bool]:
+        
+        cached, key = self._cache_lookup(prepared)
+        if cached is not None:
+            return cached, True
+        
+        response = self.llm.generate(prepared["prompt_text"])
+        self._cache_store(key, response)
+        
+        return response, False
+    
+    
+    def _result(self, prepared: Dict[str, any], response: str, cached: bool) -> Dict[str, any]:
+        return {
+            "query": prepared["query"],
+            "response": response,
+            "context": prepared["context"],
+            "rag_results": prepared["rag_results"],
+            "n_results": len(prepared["rag_results"]),
+            "cached": cached
+        }
+    
+    
+    def prepare(
+        self,
+        chain_type: str,
+        query: str,
+        n_results: int = 5,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Dict[str, any]:
+        
+        # Encoded once here; retrieval and the semantic cache key share the vector
+        if query_embedding is None:
+            query_embedding = self.rag.encode_query(query)
+        
+        if chain_type == "symptoms":
+            filter_type, prompt = None, self.symptom_prompt
+        elif chain_type == "disease":
+            filter_type, prompt = "disease", self.disease_prompt
+        else:
+            chain_type = "general"
+            filter_type, prompt = None, self.general_prompt
+        
+        rag_results = self.rag.search(
+            query,
+            n_results=n_results,
+            filter_type=filter_type,
+            query_embedding=query_embedding
+        )
+        
+        context = self._format_context(rag_results)
+        
+        return {
+            "chain_type": chain_type,
+            "query": query,
+            "query_embedding": query_embedding,
+            "context": context,
+            "rag_results": rag_results,
+            "prompt_text": prompt.format(context=context, query=query)
+        }
+    
+    
+    async def aprepare(
+        self,
+        chain_type: str,
+        query: str,
+        n_results: int = 5
+    ) -> Dict[str, any]:
+        
+        # Encode through the batcher on the loop; the store lookup runs on the retrieval executor
+        query_embedding = await self.rag.aencode_query(query)
+        return await run_blocking(self.prepare, chain_type, query, n_results, query_embedding)
+    
+    
+    async def astream(self, prepared: Dict[str, any]) -> AsyncIterator[str]:
+        
+        cached, key = self._cache_lookup(prepared)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        async for token in self.llm.astream(prepared["prompt_text"]):
+            parts.append(token)
+            yield token
+        
+        self._cache_store(key, "".join(parts))
+    
+    
+    def _run(
+        self,
+        chain_type: str,
+        query: str,
+        n_results: int
+    ) -> Dict[str, any]:
+        
+        prepared = self.prepare(chain_type, query, n_results)
+        response, cached = self._generate(prepared)
+        
+        return self._result(prepared, response, cached)
+    
+    
     def analyze_symptoms(
         self,
         query: str,
@@ -56,33 +201,7 @@ class MedicalRAGChain:
     ) -> Dict[str, any]:
         try:
             logger.info(f"Analyzing symptoms: '{query}'")
-            
-            logger.info("Step 1: Retrieving medical knowledge...")
-            rag_results = self.rag.search(query, n_results=n_results)
-            
-            logger.info(f"Retrieved {len(rag_results)} results")
-            
-            logger.info("Step 2: Formatting context...")
-            context = self._format_context(rag_results)
-            
-            logger.info("Step 3: Generating AI response...")
-            prompt_text = self.symptom_prompt.format(
-                context=context,
-                query=query
-            )
-            
-            response = self.llm.generate(prompt_text)
-            
-            logger.info(f"Generated response (length: {len(response)})")
-            
-            return {
-                "query": query,
-                "response": response,
-                "context": context,
-                "rag_results": rag_results,
-                "n_results": len(rag_results)
-            }
-            
+            return self._run("symptoms", query, n_results)
         except Exception as e:
             logger.error(f"Symptom analysis failed: {e}", exc_info=True)
             raise
@@ -95,26 +214,7 @@ class MedicalRAGChain:
     ) -> Dict[str, any]:
         try:
             logger.info(f"Getting disease info: '{query}'")
-            
-            rag_results = self.rag.search_diseases(query, n_results=n_results)
-            
-            context = self._format_context(rag_results)
-            
-            prompt_text = self.disease_prompt.format(
-                context=context,
-                query=query
-            )
-            
-            response = self.llm.generate(prompt_text)
-            
-            return {
-                "query": query,
-                "response": response,
-                "context": context,
-                "rag_results": rag_results,
-                "n_results": len(rag_results)
-            }
-            
+            return self._run("disease", query, n_results)
         except Exception as e:
             logger.error(f"Disease info retrieval failed: {e}", exc_info=True)
             raise
@@ -127,26 +227,92 @@ class MedicalRAGChain:
     ) -> Dict[str, any]:
         try:
             logger.info(f"Answering question: '{query}'")
-            
-            rag_results = self.rag.search(query, n_results=n_results)
-            
-            context = self._format_context(rag_results)
-            
-            prompt_text = self.general_prompt.format(
-                context=context,
-                query=query
-            )
-            
-            response = self.llm.generate(prompt_text)
-            
-            return {
-                "query": query,
-                "response": response,
-                "context": context,
-                "rag_results": rag_results,
-                "n_results": len(rag_results)
-            }
-            
+            return self._run("general", query, n_results)
+        except Exception as e:
+            logger.error(f"Question answering failed: {e}", exc_info=True)
+            raise
+    
+    
+    async def _agenerate(self, prepared: Dict[str, any]) -> Tuple[str, bool]:
+        
+        cached, key = self._cache_lookup(prepared)
+        if cached is not None:
+            return cached, True
+        
+        response = await self.llm.agenerate(prepared["prompt_text"])
+        self._cache_store(key, response)
+        
+        return response, False
+    
+    
+    async def _arun(
+        self,
+        chain_type: str,
+        query: str,
+        n_results: int
+    ) -> Dict[str, any]:
+        
+        if self.single_flight is None:
+            return await self._arun_uncoalesced(chain_type, query, n_results)
+        
+        # Identical requests already in flight share one retrieve + generate
+        key = (chain_type, normalize_text(query).lower(), n_results)
+        result = await self.single_flight.do(
+            key,
+            lambda: self._arun_uncoalesced(chain_type, query, n_results)
+        )
+        
+        return {**result, "query": query}
+    
+    
+    async def _arun_uncoalesced(
+        self,
+        chain_type: str,
+        query: str,
+        n_results: int
+    ) -> Dict[str, any]:
+        
+        # Retrieval runs on the bounded retrieval executor, generation awaits Gemini
+        prepared = await self.aprepare(chain_type, query, n_results)
+        response, cached = await self._agenerate(prepared)
+        
+        return self._result(prepared, response, cached)
+    
+    
+    async def aanalyze_symptoms(
+        self,
+        query: str,
+        n_results: int = 5
+    ) -> Dict[str, any]:
+        try:
+            logger.info(f"Analyzing symptoms: '{query}'")
+            return await self._arun("symptoms", query, n_results)
+        except Exception as e:
+            logger.error(f"Symptom analysis failed: {e}", exc_info=True)
+            raise
+    
+    
+    async def aget_disease_info(
+        self,
+        query: str,
+        n_results: int = 3
+    ) -> Dict[str, any]:
+        try:
+            logger.info(f"Getting disease info: '{query}'")
+            return await self._arun("disease", query, n_results)
+        except Exception as e:
+            logger.error(f"Disease info retrieval failed: {e}", exc_info=True)
+            raise
+    
+    
+    async def aanswer_question(
+        self,
+        query: str,
+        n_results: int = 5
+    ) -> Dict[str, any]:
+        try:
+            logger.info(f"Answering question: '{query}'")
+            return await self._arun("general", query, n_results)
         except Exception as e:
             logger.error(f"Question answering failed: {e}", exc_info=True)
             raise
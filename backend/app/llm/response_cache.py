@@ -0,0 +1,191 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.keyword_router import get_keyword_router
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SIMILARITY_BUCKETS = (0.80, 0.90, 0.95, 0.98)
+
+
+def is_emergency_query(query: str) -> bool:
+    # Same matcher the router and triage use, so the cache partition lines up with routing
+    return get_keyword_router().matches(query, "emergency")
+
+
+class CacheEntry(NamedTuple):
+    context_key: Tuple
+    embedding: np.ndarray
+    response: str
+    created_at: float
+
+
+class SemanticResponseCache:
+    """LLM answer cache matched on query-embedding similarity.
+
+    Entries are partitioned by chain type, the exact retrieved document ids and
+    the emergency flag; within a partition the closest stored query is a hit if
+    its cosine similarity reaches ``similarity_threshold``. Entries expire after
+    ``ttl_seconds`` and the least recently used one is evicted past ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._partitions: Dict[Tuple, List[int]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._similarities = deque(maxlen=1000)
+        self._similarity_histogram = [0] * (len(SIMILARITY_BUCKETS) + 1)
+
+    @staticmethod
+    def make_context_key(chain_type: str, doc_ids: Sequence[Hashable], is_emergency: bool) -> Tuple:
+        return (chain_type, tuple(doc_ids), bool(is_emergency))
+
+    def lookup(
+        self,
+        query_embedding: np.ndarray,
+        chain_type: str,
+        doc_ids: Sequence[Hashable],
+        is_emergency: bool
+    ) -> Optional[str]:
+        context_key = self.make_context_key(chain_type, doc_ids, is_emergency)
+        query = self._normalize(query_embedding)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_similarity = None, None
+
+            for entry_id in list(self._partitions.get(context_key, ())):
+                entry = self._entries[entry_id]
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(entry_id)
+                    self.expirations += 1
+                    continue
+
+                similarity = float(np.dot(query, entry.embedding))
+                if best_similarity is None or similarity > best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+
+            if best_similarity is not None:
+                self._record_similarity(best_similarity)
+
+            if best_id is not None and best_similarity >= self.similarity_threshold:
+                self._entries.move_to_end(best_id)
+                self.hits += 1
+                return self._entries[best_id].response
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        query_embedding: np.ndarray,
+        chain_type: str,
+        doc_ids: Sequence[Hashable],
+        is_emergency: bool,
+        response: str
+    ) -> None:
+        context_key = self.make_context_key(chain_type, doc_ids, is_emergency)
+        entry = CacheEntry(context_key, self._normalize(query_embedding), response, time.time())
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._entries[entry_id] = entry
+            self._partitions.setdefault(context_key, []).append(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            similarities = sorted(self._similarities)
+            histogram = list(self._similarity_histogram)
+            entries = len(self._entries)
+
+        labels = [f"<{SIMILARITY_BUCKETS[0]:.2f}"]
+        labels += [f"{low:.2f}-{high:.2f}" for low, high in zip(SIMILARITY_BUCKETS, SIMILARITY_BUCKETS[1:])]
+        labels += [f">={SIMILARITY_BUCKETS[-1]:.2f}"]
+
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "similarity_threshold": self.similarity_threshold,
+            "p50_similarity": similarities[len(similarities) // 2] if similarities else None,
+            "p95_similarity": similarities[int(len(similarities) * 0.95)] if similarities else None,
+            "similarity_histogram": dict(zip(labels, histogram))
+        }
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        partition = self._partitions[entry.context_key]
+        partition.remove(entry_id)
+        if not partition:
+            del self._partitions[entry.context_key]
+
+    def _record_similarity(self, similarity: float) -> None:
+        self._similarities.append(similarity)
+        bucket = sum(similarity >= edge for edge in SIMILARITY_BUCKETS)
+        self._similarity_histogram[bucket] += 1
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+_response_cache = None
+
+
+def get_response_cache() -> Optional[SemanticResponseCache]:
+
+    global _response_cache
+
+    if os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() != "true":
+        return None
+
+    if _response_cache is None:
+        logger.info("Creating global semantic response cache instance")
+        _response_cache = SemanticResponseCache(
+            similarity_threshold=float(os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", "0.95")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+        )
+
+    return _response_cache
@@ -30,6 +30,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.include_router(rag_router)
@@ -51,6 +52,14 @@ async def startup_event():
         logger.error(f"Failed to initialize database: {e}")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    try:
+        await get_db_manager().async_engine.dispose()
+    except Exception as e:
+        logger.error(f"Failed to close database connections: {e}")
+
+
 @app.get("/")
 async def root():
     return {
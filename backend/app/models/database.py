@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -26,6 +26,11 @@ class Conversation(Base):
     
     __tablename__ = "conversations"
     
+    # Conversation list: filter by user, newest first, id breaks ties for the keyset cursor
+    __table_args__ = (
+        Index("ix_conversations_user_id_updated_at", "user_id", "updated_at", "id"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String(255))
@@ -40,6 +45,11 @@ class Message(Base):
     
     __tablename__ = "messages"
     
+    # Conversation detail (ordered by time) and per-conversation message counts
+    __table_args__ = (
+        Index("ix_messages_conversation_id_timestamp", "conversation_id", "timestamp"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=False)
     role = Column(String(50), nullable=False)  
@@ -54,6 +64,10 @@ class MedicalHistory(Base):
     
     __tablename__ = "medical_history"
     
+    __table_args__ = (
+        Index("ix_medical_history_user_id_date", "user_id", "date"),
+    )
+    
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     symptoms = Column(Text)
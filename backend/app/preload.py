@@ -0,0 +1,29 @@
+import logging
+import os
+
+from app.rag.embeddings import get_embedding_model
+from app.rag.vectorstore import get_vector_store
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def preload_shared_resources() -> None:
+    """Load read-only, fork-safe resources in the master before workers fork.
+
+    Pages touched here (model weights, the memory-mapped snapshot matrix) stay
+    shared copy-on-write across all workers instead of being loaded once per
+    worker. Nothing here runs inference or opens a database/Chroma client, since
+    thread pools and connections don't survive fork.
+    """
+
+    logger.info(f"Preloading shared resources in master process (pid={os.getpid()})")
+
+    embedding_model = get_embedding_model()
+    logger.info(f"Embedding model preloaded: {embedding_model.model_name}")
+
+    if os.getenv("VECTOR_STORE_BACKEND", "chroma").lower() == "mmap":
+        vector_store = get_vector_store()
+        logger.info(f"Memory-mapped vector index preloaded ({vector_store.get_document_count()} documents)")
+    else:
+        logger.info("Vector store is not memory-mapped; workers will open it after fork")
@@ -0,0 +1,199 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Optional
+import logging
+
+import numpy as np
+
+from app.rag.embeddings import EmbeddingModel, get_embedding_model
+from app.rag.embedding_batcher import get_embedding_batcher
+from app.rag.executor import run_blocking
+from app.rag.snapshot import check_snapshot_model, read_snapshot
+from app.utils.tracing import traced
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def empty_results() -> Dict:
+    return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+class VectorStore(ABC):
+
+    def __init__(
+        self,
+        collection_name: str,
+        persist_directory: str,
+        embedding_model: Optional[EmbeddingModel] = None
+    ):
+
+        self.collection_name = collection_name
+        self.persist_directory = persist_directory
+
+        if embedding_model is None:
+            self.embedding_model = get_embedding_model()
+            self.embedding_batcher = get_embedding_batcher()
+        else:
+            self.embedding_model = embedding_model
+            self.embedding_batcher = None
+
+
+    @abstractmethod
+    def add_documents(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> None:
+        pass
+
+
+    @abstractmethod
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+        pass
+
+
+    def search_many_by_embedding(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+
+        merged = {"documents": [], "metadatas": [], "distances": []}
+
+        for query_embedding in query_embeddings:
+            results = self.search_by_embedding(query_embedding, n_results, filter_metadata)
+            for key in merged:
+                merged[key].append(results[key][0])
+
+        return merged
+
+
+    @abstractmethod
+    def get_by_ids(self, ids: List[str]) -> Dict:
+        pass
+
+
+    @abstractmethod
+    def get_all_metadatas(self) -> Dict[str, Dict]:
+        pass
+
+
+    @abstractmethod
+    def delete_documents(self, ids: List[str]) -> None:
+        pass
+
+
+    @abstractmethod
+    def get_document_count(self) -> int:
+        pass
+
+
+    @abstractmethod
+    def delete_collection(self) -> None:
+        pass
+
+
+    @abstractmethod
+    def reset(self) -> None:
+        pass
+
+
+    def hydrate_from_snapshot(self, path: str, batch_size: int = 5000) -> int:
+
+        snapshot = read_snapshot(path)
+        check_snapshot_model(snapshot, self.embedding_model.model_name)
+
+        logger.info(f"Hydrating '{self.collection_name}' from snapshot {path} ({len(snapshot.ids)} documents)")
+
+        for start in range(0, len(snapshot.ids), batch_size):
+            end = start + batch_size
+            self.add_documents(
+                texts=snapshot.texts[start:end],
+                metadatas=snapshot.metadatas[start:end],
+                ids=snapshot.ids[start:end],
+                embeddings=np.asarray(snapshot.embeddings[start:end])
+            )
+
+        return len(snapshot.ids)
+
+
+    def encode_query(self, query: str) -> np.ndarray:
+
+        # Concurrent single-query encodes share one forward pass when batching is on
+        if self.embedding_batcher is not None:
+            return self.embedding_batcher.encode(query)
+
+        return self.embedding_model.encode(query)
+
+
+    async def aencode_query(self, query: str) -> np.ndarray:
+
+        # Awaiting the future leaves the loop and the executor free, so concurrent requests share a batch
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.aencode(query)
+
+        return await run_blocking(self.embedding_model.encode, query)
+
+
+    @traced("vector_store.search")
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Dict:
+        """Search vector store - synchronous version."""
+        try:
+            logger.info(f"Searching for: '{query}' (n_results={n_results})")
+
+            if query_embedding is None:
+                query_embedding = self.encode_query(query)
+
+            results = self.search_by_embedding(
+                query_embedding,
+                n_results=n_results,
+                filter_metadata=filter_metadata
+            )
+
+            logger.info(f"Found {len(results['documents'][0])} results")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            return empty_results()
+
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+
+        try:
+            logger.info(f"Searching for {len(queries)} queries (n_results={n_results})")
+
+            query_embeddings = self.embedding_model.encode_batch(queries)
+
+            return self.search_many_by_embedding(
+                query_embeddings,
+                n_results=n_results,
+                filter_metadata=filter_metadata
+            )
+
+        except Exception as e:
+            logger.error(f"Error searching vector store: {e}")
+            return {
+                "documents": [[] for _ in queries],
+                "metadatas": [[] for _ in queries],
+                "distances": [[] for _ in queries]
+            }
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.rag.embeddings import EmbeddingModel, get_embedding_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text encodes into one batched forward pass.
+
+    Requests are collected until either ``max_batch_size`` items are pending or
+    ``max_wait_ms`` has elapsed since the oldest one arrived, then encoded together
+    on a background thread. Sync callers block on the returned future; async callers
+    await it without holding the event loop.
+    """
+
+    def __init__(
+        self,
+        embedding_model: EmbeddingModel,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 3.0
+    ):
+        self.embedding_model = embedding_model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        self._batch_sizes = deque(maxlen=1000)
+        self._wait_times_ms = deque(maxlen=1000)
+        self._stats_lock = threading.Lock()
+        self.total_batches = 0
+        self.total_items = 0
+
+        self._start()
+
+        logger.info(f"Embedding batcher started (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms})")
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._queue: "queue.Queue[Optional[Tuple[str, Future, float]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        # Threads don't survive fork; a worker forked from a preloaded master starts its own
+        if self._pid != os.getpid():
+            self._stats_lock = threading.Lock()
+            self._start()
+
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        return self.submit(text).result(timeout=timeout)
+
+    async def aencode(self, text: str) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(text))
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._wait_times_ms)
+
+        return {
+            "total_batches": self.total_batches,
+            "total_items": self.total_items,
+            "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "max_batch_size": max(sizes) if sizes else 0,
+            "p50_wait_ms": waits[len(waits) // 2] if waits else 0.0,
+            "p95_wait_ms": waits[int(len(waits) * 0.95)] if waits else 0.0
+        }
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = item[2] + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    next_item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stopping = True
+                    break
+                batch.append(next_item)
+
+            self._process(batch)
+
+    def _process(self, batch: List[Tuple[str, Future, float]]) -> None:
+        dispatched_at = time.perf_counter()
+
+        # Drop requests whose callers have already given up
+        live = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        with self._stats_lock:
+            self._batch_sizes.append(len(live))
+            self._wait_times_ms.extend((dispatched_at - enqueued) * 1000 for _, _, enqueued in live)
+            self.total_batches += 1
+            self.total_items += len(live)
+
+        try:
+            embeddings = self.embedding_model.encode_batch([text for text, _, _ in live])
+        except Exception as e:
+            logger.error(f"Batched embedding failed: {e}")
+            for _, future, _ in live:
+                future.set_exception(e)
+            return
+
+        for (_, future, _), embedding in zip(live, embeddings):
+            future.set_result(embedding)
+
+
+_embedding_batcher = None
+
+
+def get_embedding_batcher() -> Optional[EmbeddingBatcher]:
+
+    global _embedding_batcher
+
+    if os.getenv("EMBEDDING_BATCHING_ENABLED", "false").lower() != "true":
+        return None
+
+    if _embedding_batcher is None:
+        logger.info("Creating global embedding batcher instance")
+        _embedding_batcher = EmbeddingBatcher(
+            get_embedding_model(),
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "3"))
+        )
+
+    return _embedding_batcher
@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def make_cache_key(model_name: str, text: str) -> str:
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: in-process LRU backed by an on-disk SQLite store."""
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = "./embedding_cache",
+        max_memory_items: int = 10000,
+        max_disk_bytes: int = 256 * 1024 * 1024
+    ):
+        self.model_name = model_name
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._db_path = None
+        self._pid = os.getpid()
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                db_path = os.path.join(cache_dir, "embeddings.sqlite3")
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._db_path = db_path
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "key TEXT PRIMARY KEY, "
+                    "dim INTEGER NOT NULL, "
+                    "vector BLOB NOT NULL, "
+                    "last_access REAL NOT NULL)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access "
+                    "ON embeddings (last_access)"
+                )
+                self._conn.commit()
+                row = self._conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                ).fetchone()
+                self._disk_bytes = int(row[0])
+                logger.info(f"Embedding disk cache ready at {db_path} ({self._disk_bytes} bytes)")
+            except Exception as e:
+                logger.error(f"Failed to open embedding disk cache, using memory only: {e}")
+                self._conn = None
+
+    def get_many(self, texts: List[str]) -> Dict[int, np.ndarray]:
+        found: Dict[int, np.ndarray] = {}
+        disk_lookups: Dict[str, List[int]] = {}
+
+        self._reopen_after_fork()
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = make_cache_key(self.model_name, text)
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = vector
+                else:
+                    disk_lookups.setdefault(key, []).append(i)
+
+            if disk_lookups and self._conn is not None:
+                for key, vector in self._read_disk(list(disk_lookups)).items():
+                    self._remember(key, vector)
+                    for i in disk_lookups[key]:
+                        found[i] = vector
+                    self.disk_hits += len(disk_lookups[key])
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        now = time.time()
+        rows = []
+
+        self._reopen_after_fork()
+
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = make_cache_key(self.model_name, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.shape[0], vector.tobytes(), now))
+
+            if rows and self._conn is not None:
+                try:
+                    self._write_disk(rows)
+                except Exception as e:
+                    logger.error(f"Failed to write embedding disk cache: {e}")
+
+    def clear(self) -> None:
+        self._reopen_after_fork()
+
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings")
+                self._conn.commit()
+                self._disk_bytes = 0
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "memory_items": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def _reopen_after_fork(self) -> None:
+        # SQLite handles must not cross fork(); a worker forked from a preloaded
+        # master reopens its own connection and keeps the inherited memory tier
+        if self._pid == os.getpid():
+            return
+
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        if self._db_path is not None:
+            try:
+                self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            except Exception as e:
+                logger.error(f"Failed to reopen embedding disk cache after fork: {e}")
+                self._conn = None
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        results = {}
+        try:
+            placeholders = ",".join("?" for _ in keys)
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                keys
+            ).fetchall()
+            for key, blob in rows:
+                results[key] = np.frombuffer(blob, dtype=np.float32).copy()
+            if results:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(time.time(), key) for key in results]
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to read embedding disk cache: {e}")
+        return results
+
+    def _write_disk(self, rows: List[tuple]) -> None:
+        keys = [row[0] for row in rows]
+        placeholders = ",".join("?" for _ in keys)
+        existing = self._conn.execute(
+            f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({placeholders})",
+            keys
+        ).fetchone()[0]
+
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_access) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        self._disk_bytes += sum(len(row[2]) for row in rows) - int(existing)
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+        self._conn.commit()
+
+    def _evict_disk(self) -> None:
+        target = int(self.max_disk_bytes * 0.9)
+        cursor = self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access ASC"
+        )
+        evicted = []
+        freed = 0
+        for key, size in cursor:
+            if self._disk_bytes - freed <= target:
+                break
+            evicted.append((key,))
+            freed += size
+
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+        self._disk_bytes -= freed
+        logger.info(f"Evicted {len(evicted)} embeddings from disk cache ({freed} bytes)")
+
+
+def create_embedding_cache(model_name: str) -> Optional[EmbeddingCache]:
+
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    cache_dir = os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache") or None
+
+    return EmbeddingCache(
+        model_name=model_name,
+        cache_dir=cache_dir,
+        max_memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000")),
+        max_disk_bytes=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "256")) * 1024 * 1024
+    )
@@ -1,18 +1,40 @@
-from sentence_transformers import SentenceTransformer
-from typing import List, Union
+from typing import List, Optional, Union
 import numpy as np
 import logging
+import os
+
+from app.rag.embedding_cache import EmbeddingCache, create_embedding_cache
+from app.utils.tracing import traced
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class EmbeddingModel:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        logger.info(f"Loading embedding model: {model_name}")
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = "torch",
+        onnx_dir: Optional[str] = None
+    ):
+        logger.info(f"Loading embedding model: {model_name} (backend={backend})")
+        
+        self.model_name = model_name
+        self.cache = cache
+        self.backend = backend
         
         try:
-            self.model = SentenceTransformer(model_name)
+            if backend == "onnx":
+                from app.rag.onnx_backend import OnnxSentenceEncoder
+                
+                self.model = OnnxSentenceEncoder(onnx_dir or default_onnx_dir(model_name))
+            elif backend == "torch":
+                from sentence_transformers import SentenceTransformer
+                
+                self.model = SentenceTransformer(model_name)
+            else:
+                raise ValueError(f"Unknown embedding backend: {backend}")
             
             self.dimension = self.model.get_sentence_embedding_dimension()
             
@@ -23,6 +45,7 @@ class EmbeddingModel:
             raise
     
     
+    @traced("embedding.encode")
     def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
         
         try:
@@ -32,15 +55,10 @@ class EmbeddingModel:
             else:
                 return_single = False
             
-            logger.info(f"Encoding {len(texts)} text(s)")
-            
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                normalize_embeddings=True,
-                show_progress_bar=False,
-                convert_to_numpy=True
-            )
+            if self.cache is not None:
+                embeddings = self._encode_cached(texts, batch_size)
+            else:
+                embeddings = self._encode_uncached(texts, batch_size)
             
             if return_single:
                 return embeddings[0]
@@ -52,6 +70,42 @@ class EmbeddingModel:
             raise
     
     
+    def _encode_uncached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        
+        logger.info(f"Encoding {len(texts)} text(s)")
+        
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+    
+    
+    def _encode_cached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        
+        cached = self.cache.get_many(texts)
+        
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, vector in cached.items():
+            embeddings[i] = vector
+        
+        misses = {}
+        for i, text in enumerate(texts):
+            if i not in cached:
+                misses.setdefault(text, []).append(i)
+        
+        if misses:
+            miss_texts = list(misses)
+            computed = self._encode_uncached(miss_texts, batch_size)
+            for text, vector in zip(miss_texts, computed):
+                embeddings[misses[text]] = vector
+            self.cache.put_many(miss_texts, computed)
+        
+        return embeddings
+    
+    
     def encode_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
         
         return self.encode(texts, batch_size=batch_size)
@@ -81,12 +135,28 @@ class EmbeddingModel:
 _embedding_model = None
 
 
+def default_onnx_dir(model_name: str) -> str:
+    
+    return os.path.join("./onnx_models", model_name.split("/")[-1])
+
+
 def get_embedding_model() -> EmbeddingModel:
     
     global _embedding_model
     
     if _embedding_model is None:
         logger.info("Creating global embedding model instance")
-        _embedding_model = EmbeddingModel()
+        model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        backend = os.getenv("EMBEDDING_BACKEND", "torch")
+        
+        # int8 vectors differ slightly from fp32 ones, so keep their cache entries apart
+        cache_namespace = model_name if backend == "torch" else f"{model_name}:{backend}-int8"
+        
+        _embedding_model = EmbeddingModel(
+            model_name=model_name,
+            cache=create_embedding_cache(cache_namespace),
+            backend=backend,
+            onnx_dir=os.getenv("EMBEDDING_ONNX_DIR")
+        )
     
     return _embedding_model
\ No newline at end of file
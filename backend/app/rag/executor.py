@@ -0,0 +1,36 @@
+import asyncio
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+_retrieval_executor = None
+
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+
+    global _retrieval_executor
+
+    if _retrieval_executor is None:
+        # Bounded on purpose: embedding is CPU-bound, so more threads than cores
+        # only adds contention while the event loop stays free either way
+        max_workers = int(os.getenv("RETRIEVAL_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+        logger.info(f"Creating retrieval executor (max_workers={max_workers})")
+        _retrieval_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retrieval")
+
+    return _retrieval_executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking retrieval/embedding call on the retrieval executor."""
+
+    loop = asyncio.get_running_loop()
+    # Carry context variables (the active trace) onto the worker thread, as asyncio.to_thread does
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_retrieval_executor(), partial(context.run, func, *args, **kwargs))
@@ -0,0 +1,135 @@
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "i", "in", "is", "it", "my", "of", "on", "or", "the", "to", "was", "with"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    # Splits snake_case ids too, so "chest_pain" indexes as "chest" + "pain"
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring over the formatted knowledge documents."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.ids: List[str] = []
+        self.metadatas: List[Dict] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.avg_doc_length = 0.0
+
+    def build(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> "BM25Index":
+
+        self.ids = list(ids)
+        self.metadatas = list(metadatas)
+        self.doc_lengths = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for doc_index, text in enumerate(texts):
+            tokens = tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_index, tf))
+
+        self.postings = postings
+        self.avg_doc_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+        logger.info(f"Built lexical index: {len(self.ids)} documents, {len(self.postings)} terms")
+
+        return self
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filter_type: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+
+        if not self.ids:
+            return []
+
+        n_docs = len(self.ids)
+        scores: Dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+
+            for doc_index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_index] / self.avg_doc_length)
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        if filter_type:
+            scores = {i: s for i, s in scores.items() if self.metadatas[i].get("type") == filter_type}
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+
+        return [(self.ids[i], score) for i, score in ranked]
+
+    def save(self, path: str) -> None:
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "ids": self.ids,
+                "metadatas": self.metadatas,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings
+            }, f)
+
+        logger.info(f"Saved lexical index to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=data["k1"], b=data["b"])
+        index.ids = data["ids"]
+        index.metadatas = data["metadatas"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {term: [tuple(p) for p in plist] for term, plist in data["postings"].items()}
+        index.avg_doc_length = sum(index.doc_lengths) / len(index.doc_lengths) if index.doc_lengths else 0.0
+
+        logger.info(f"Loaded lexical index from {path} ({len(index.ids)} documents)")
+
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+
+    fused: Dict[str, float] = {}
+
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
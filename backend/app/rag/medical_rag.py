@@ -1,10 +1,16 @@
+import hashlib
 import json
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
 
+import numpy as np
+
 from app.rag.vectorstore import get_vector_store
 from app.rag.embeddings import get_embedding_model
+from app.rag.executor import run_blocking
+from app.rag.lexical_index import BM25Index, reciprocal_rank_fusion
+from app.utils.tracing import traced
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +24,16 @@ class MedicalRAG:
         self.vector_store = get_vector_store()
         self.embedding_model = get_embedding_model()
         
+        self.default_mode = os.getenv("RAG_SEARCH_MODE", "vector")
+        self.lexical_index_path = os.path.join(self.vector_store.persist_directory, "lexical_index.json")
+        self.lexical_index: Optional[BM25Index] = None
+        
+        if os.path.exists(self.lexical_index_path):
+            try:
+                self.lexical_index = BM25Index.load(self.lexical_index_path)
+            except Exception as e:
+                logger.error(f"Failed to load lexical index, it will be rebuilt: {e}")
+        
         logger.info(f"Medical RAG initialized with data directory: {data_dir}")
     
     
@@ -40,7 +56,8 @@ class MedicalRAG:
             raise
     
     
-    def _format_symptom_text(self, symptom_id: str, symptom_data: Dict) -> str:
+    @staticmethod
+    def _format_symptom_text(symptom_id: str, symptom_data: Dict) -> str:
         
         text_parts = [f"Symptom: {symptom_id}"]
         
@@ -73,7 +90,8 @@ class MedicalRAG:
         return "\n".join(text_parts)
     
     
-    def _format_disease_text(self, disease_id: str, disease_data: Dict) -> str:
+    @staticmethod
+    def _format_disease_text(disease_id: str, disease_data: Dict) -> str:
         
         text_parts = [f"Disease: {disease_data.get('name', disease_id)}"]
         
@@ -114,17 +132,7 @@ class MedicalRAG:
         return "\n".join(text_parts)
     
     
-    def load_knowledge(self, reset: bool = False) -> Dict[str, int]:
-        
-        if reset:
-            logger.info("Resetting vector store")
-            self.vector_store.reset()
-        
-        current_count = self.vector_store.get_document_count()
-        if current_count > 0 and not reset:
-            logger.info(f"Vector store already contains {current_count} documents. Skipping load.")
-            logger.info("Use reset=True to reload data.")
-            return {"already_loaded": current_count}
+    def _build_documents(self) -> Tuple[List[str], List[Dict], List[str], int, int]:
         
         texts = []
         metadatas = []
@@ -173,6 +181,63 @@ class MedicalRAG:
         disease_count = len(diseases)
         logger.info(f"Processed {disease_count} diseases")
         
+        for text, metadata in zip(texts, metadatas):
+            metadata["content_hash"] = self._content_hash(text, metadata)
+        
+        return texts, metadatas, ids, symptom_count, disease_count
+    
+    
+    def _content_hash(self, text: str, metadata: Dict) -> str:
+        
+        # The model name is part of the hash so switching models re-embeds everything
+        payload = json.dumps(
+            {
+                "model": self.embedding_model.model_name,
+                "text": text,
+                "metadata": {k: v for k, v in metadata.items() if k != "content_hash"}
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    
+    def _rebuild_lexical_index(self, texts: List[str], metadatas: List[Dict], ids: List[str]) -> None:
+        
+        try:
+            self.lexical_index = BM25Index().build(ids, texts, metadatas)
+            self.lexical_index.save(self.lexical_index_path)
+        except Exception as e:
+            logger.error(f"Failed to build lexical index: {e}")
+    
+    
+    def _ensure_lexical_index(self) -> Optional[BM25Index]:
+        
+        # Building from the JSON files needs no embeddings, so it's cheap to do lazily
+        if self.lexical_index is None:
+            logger.info("Lexical index missing, building it from the knowledge files")
+            texts, metadatas, ids, _, _ = self._build_documents()
+            self._rebuild_lexical_index(texts, metadatas, ids)
+        
+        return self.lexical_index
+    
+    
+    def load_knowledge(self, reset: bool = False, incremental: bool = False) -> Dict[str, int]:
+        
+        if incremental and not reset:
+            return self.sync_knowledge()
+        
+        if reset:
+            logger.info("Resetting vector store")
+            self.vector_store.reset()
+        
+        current_count = self.vector_store.get_document_count()
+        if current_count > 0 and not reset:
+            logger.info(f"Vector store already contains {current_count} documents. Skipping load.")
+            logger.info("Use reset=True to reload data.")
+            self._ensure_lexical_index()
+            return {"already_loaded": current_count}
+        
+        texts, metadatas, ids, symptom_count, disease_count = self._build_documents()
         
         logger.info(f"Adding {len(texts)} documents to vector store...")
         logger.info("This will take 2-3 minutes (generating embeddings)...")
@@ -183,6 +248,8 @@ class MedicalRAG:
             ids=ids
         )
         
+        self._rebuild_lexical_index(texts, metadatas, ids)
+        
         total_count = self.vector_store.get_document_count()
         logger.info(f"Successfully loaded {total_count} documents into vector store")
         
@@ -193,33 +260,208 @@ class MedicalRAG:
         }
     
     
+    def sync_knowledge(self) -> Dict[str, int]:
+        
+        texts, metadatas, ids, _, _ = self._build_documents()
+        
+        # Only symptom/disease documents are owned by this loader; other sources are left alone
+        existing = {
+            doc_id: metadata
+            for doc_id, metadata in self.vector_store.get_all_metadatas().items()
+            if (metadata or {}).get("type") in ("symptom", "disease")
+        }
+        
+        changed = [
+            i for i, doc_id in enumerate(ids)
+            if (existing.get(doc_id) or {}).get("content_hash") != metadatas[i]["content_hash"]
+        ]
+        added = sum(1 for i in changed if ids[i] not in existing)
+        
+        current_ids = set(ids)
+        removed = [doc_id for doc_id in existing if doc_id not in current_ids]
+        
+        logger.info(f"Knowledge sync: {added} new, {len(changed) - added} changed, {len(removed)} removed")
+        
+        if changed:
+            self.vector_store.add_documents(
+                texts=[texts[i] for i in changed],
+                metadatas=[metadatas[i] for i in changed],
+                ids=[ids[i] for i in changed]
+            )
+        
+        if removed:
+            self.vector_store.delete_documents(removed)
+        
+        if changed or removed or self.lexical_index is None:
+            self._rebuild_lexical_index(texts, metadatas, ids)
+        
+        return {
+            "added": added,
+            "updated": len(changed) - added,
+            "deleted": len(removed),
+            "unchanged": len(ids) - len(changed),
+            "total": self.vector_store.get_document_count()
+        }
+    
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        
+        return self.vector_store.encode_query(query)
+    
+    
+    async def aencode_query(self, query: str) -> np.ndarray:
+        
+        return await self.vector_store.aencode_query(query)
+    
+    
+    @traced("rag.search")
     def search(
         self,
         query: str,
         n_results: int = 5,
-        filter_type: Optional[str] = None
+        filter_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None
     ) -> List[Dict]:
         
+        mode = mode or self.default_mode
+        
         filter_metadata = None
         if filter_type:
             filter_metadata = {"type": filter_type}
         
+        if query_embedding is not None:
+            query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        
+        if mode == "hybrid":
+            return self._hybrid_search(query, n_results, filter_type, filter_metadata, query_embedding)
+        
         results = self.vector_store.search(
             query=query,
             n_results=n_results,
+            filter_metadata=filter_metadata,
+            query_embedding=query_embedding
+        )
+        
+        return self._format_results(results, 0)
+    
+    
+    async def asearch(
+        self,
+        query: str,
+        n_results: int = 5,
+        filter_type: Optional[str] = None,
+        mode: Optional[str] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        
+        if query_embedding is None:
+            query_embedding = await self.aencode_query(query)
+        
+        # The store query is blocking; keep it off the event loop
+        return await run_blocking(self.search, query, n_results, filter_type, mode, query_embedding)
+    
+    
+    def _hybrid_search(
+        self,
+        query: str,
+        n_results: int,
+        filter_type: Optional[str],
+        filter_metadata: Optional[Dict],
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        
+        # Each retriever ranks a wider candidate pool than requested so fusion has room to reorder
+        candidate_count = max(n_results * 4, 20)
+        
+        try:
+            if query_embedding is None:
+                query_embedding = self.vector_store.encode_query(query)
+            vector_results = self.vector_store.search_by_embedding(
+                query_embedding,
+                n_results=candidate_count,
+                filter_metadata=filter_metadata
+            )
+        except Exception as e:
+            logger.error(f"Vector retrieval failed in hybrid search: {e}")
+            return []
+        
+        lexical_index = self._ensure_lexical_index()
+        lexical_hits = lexical_index.search(query, candidate_count, filter_type) if lexical_index else []
+        
+        vector_ids = vector_results.get('ids', [[]])[0]
+        fused = reciprocal_rank_fusion([vector_ids, [doc_id for doc_id, _ in lexical_hits]])[:n_results]
+        
+        documents = {}
+        for i, doc_id in enumerate(vector_ids):
+            distance = vector_results['distances'][0][i]
+            documents[doc_id] = {
+                "text": vector_results['documents'][0][i],
+                "metadata": vector_results['metadatas'][0][i],
+                "distance": distance,
+                "similarity": 1 - (distance / 2)
+            }
+        
+        # Lexical-only hits still get a real cosine similarity for the prompt context
+        missing = [doc_id for doc_id, _ in fused if doc_id not in documents]
+        if missing:
+            fetched = self.vector_store.get_by_ids(missing)
+            for i, doc_id in enumerate(fetched['ids']):
+                similarity = float(np.dot(fetched['embeddings'][i], query_embedding))
+                documents[doc_id] = {
+                    "text": fetched['documents'][i],
+                    "metadata": fetched['metadatas'][i],
+                    "distance": 2 - 2 * similarity,
+                    "similarity": similarity
+                }
+        
+        formatted_results = []
+        for doc_id, score in fused:
+            if doc_id in documents:
+                formatted_results.append({**documents[doc_id], "rrf_score": score})
+        
+        return formatted_results
+    
+    
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filter_type: Optional[str] = None
+    ) -> List[List[Dict]]:
+        
+        if not queries:
+            return []
+        
+        filter_metadata = None
+        if filter_type:
+            filter_metadata = {"type": filter_type}
+        
+        # One encode_batch call and one multi-query store lookup for all queries
+        results = self.vector_store.search_many(
+            queries=queries,
+            n_results=n_results,
             filter_metadata=filter_metadata
         )
         
+        return [self._format_results(results, i) for i in range(len(queries))]
+    
+    
+    @staticmethod
+    def _format_results(results: Dict, query_index: int) -> List[Dict]:
+        
         formatted_results = []
         
-        for i in range(len(results['documents'][0])):
+        documents = results['documents'][query_index]
+        
+        for i in range(len(documents)):
             
-            distance = results['distances'][0][i]
+            distance = results['distances'][query_index][i]
             similarity = 1 - (distance / 2)
             
             formatted_results.append({
-                "text": results['documents'][0][i],
-                "metadata": results['metadatas'][0][i],
+                "text": documents[i],
+                "metadata": results['metadatas'][query_index][i],
                 "distance": distance,
                 "similarity": similarity
             })
@@ -227,14 +469,14 @@ class MedicalRAG:
         return formatted_results
     
     
-    def search_symptoms(self, query: str, n_results: int = 5) -> List[Dict]:
+    def search_symptoms(self, query: str, n_results: int = 5, mode: Optional[str] = None) -> List[Dict]:
         
-        return self.search(query, n_results=n_results, filter_type="symptom")
+        return self.search(query, n_results=n_results, filter_type="symptom", mode=mode)
     
     
-    def search_diseases(self, query: str, n_results: int = 5) -> List[Dict]:
+    def search_diseases(self, query: str, n_results: int = 5, mode: Optional[str] = None) -> List[Dict]:
         
-        return self.search(query, n_results=n_results, filter_type="disease")
+        return self.search(query, n_results=n_results, filter_type="disease", mode=mode)
 
 
 _medical_rag = None
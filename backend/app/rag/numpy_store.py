@@ -0,0 +1,381 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, NamedTuple, Optional
+
+import numpy as np
+
+from app.rag.base_store import VectorStore, empty_results
+from app.rag.embeddings import EmbeddingModel
+from app.rag.snapshot import check_snapshot_model, read_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IndexData(NamedTuple):
+    embeddings: np.ndarray
+    ids: List[str]
+    texts: List[str]
+    metadatas: List[Dict]
+    id_to_row: Dict[str, int]
+    masks: Dict[str, Dict[object, np.ndarray]]
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact in-process search over a contiguous matrix of normalized embeddings.
+
+    Rows of ``embeddings`` line up with the ``ids``/``texts``/``metadatas`` lists.
+    Top-k is one matrix-vector product plus ``argpartition``; ``where`` filters on
+    indexed metadata fields use precomputed boolean row masks.
+
+    With ``read_only=True`` the matrix is a read-only memory map of a knowledge
+    snapshot, so every worker process on a node shares one page-cached copy.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "medical_knowledge",
+        persist_directory: str = "./chroma_db",
+        dtype: str = "float32",
+        indexed_fields: tuple = ("type",),
+        embedding_model: Optional[EmbeddingModel] = None,
+        read_only: bool = False,
+        snapshot_path: Optional[str] = None
+    ):
+
+        super().__init__(collection_name, persist_directory, embedding_model)
+
+        if read_only and not snapshot_path:
+            raise ValueError("A read-only NumPy index needs a snapshot_path to map")
+
+        # Snapshots are float32 on disk; any other dtype would force a private copy
+        self.dtype = np.dtype("float32" if read_only else dtype)
+        self.indexed_fields = indexed_fields
+        self.index_directory = os.path.join(persist_directory, f"numpy_{collection_name}")
+        self.read_only = read_only
+
+        self._lock = threading.Lock()
+        self._set_data(
+            np.empty((0, self.embedding_model.get_dimension()), dtype=self.dtype),
+            [], [], []
+        )
+
+        if read_only:
+            self.hydrate_from_snapshot(snapshot_path)
+        else:
+            self._load()
+
+        logger.info(f"NumPy index '{collection_name}' ready. Documents: {self.get_document_count()}")
+
+
+    def add_documents(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> None:
+
+        self._check_writable()
+
+        try:
+            if ids is None:
+                ids = [f"doc_{i}" for i in range(len(texts))]
+
+            if metadatas is None:
+                metadatas = [{} for _ in range(len(texts))]
+
+            logger.info(f"Adding {len(texts)} documents to NumPy index")
+
+            if embeddings is None:
+                embeddings = self.embedding_model.encode_batch(texts)
+
+            embeddings = np.asarray(embeddings, dtype=self.dtype)
+
+            with self._lock:
+                data = self._data
+                matrix = data.embeddings
+                all_ids = list(data.ids)
+                all_texts = list(data.texts)
+                all_metadatas = list(data.metadatas)
+                id_to_row = dict(data.id_to_row)
+
+                new_rows = []
+                updates = {}
+                for i, doc_id in enumerate(ids):
+                    row = id_to_row.get(doc_id)
+                    if row is None:
+                        id_to_row[doc_id] = len(all_ids)
+                        all_ids.append(doc_id)
+                        all_texts.append(texts[i])
+                        all_metadatas.append(metadatas[i])
+                        new_rows.append(i)
+                    else:
+                        all_texts[row] = texts[i]
+                        all_metadatas[row] = metadatas[i]
+                        updates[row] = i
+
+                matrix = np.vstack([matrix, embeddings[new_rows]]) if new_rows else matrix.copy()
+                for row, i in updates.items():
+                    matrix[row] = embeddings[i]
+
+                self._set_data(np.ascontiguousarray(matrix), all_ids, all_texts, all_metadatas)
+                self._save()
+
+            logger.info(f"Successfully added {len(texts)} documents")
+
+        except Exception as e:
+            logger.error(f"Failed to add documents: {e}")
+            raise
+
+
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+
+        query = np.asarray(query_embedding)[None, :]
+        results = self.search_many_by_embedding(query, n_results, filter_metadata)
+
+        if not results["documents"][0]:
+            return empty_results()
+
+        return results
+
+
+    def search_many_by_embedding(
+        self,
+        query_embeddings: np.ndarray,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+
+        # One snapshot per call so a concurrent add_documents can't tear the read
+        data = self._data
+
+        queries = np.asarray(query_embeddings, dtype=self.dtype)
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        if data.embeddings.shape[0] == 0:
+            for key in results:
+                results[key] = [[] for _ in range(len(queries))]
+            return results
+
+        scores = (queries @ data.embeddings.T).astype(np.float32)
+
+        if filter_metadata:
+            mask = self._filter_mask(data, filter_metadata)
+            candidates = int(mask.sum())
+            scores[:, ~mask] = -np.inf
+        else:
+            candidates = scores.shape[1]
+
+        k = min(n_results, candidates)
+
+        for row_scores in scores:
+            if k <= 0:
+                top = np.empty(0, dtype=np.int64)
+            elif k < row_scores.shape[0]:
+                top = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                top = np.arange(row_scores.shape[0])
+            top = top[np.argsort(-row_scores[top])]
+
+            # Match Chroma's squared-L2 distance for normalized vectors
+            distances = (2.0 - 2.0 * row_scores[top]).clip(min=0.0)
+
+            results["ids"].append([data.ids[i] for i in top])
+            results["documents"].append([data.texts[i] for i in top])
+            results["metadatas"].append([data.metadatas[i] for i in top])
+            results["distances"].append(distances.tolist())
+
+        return results
+
+
+    def hydrate_from_snapshot(self, path: str, batch_size: int = 5000) -> int:
+
+        snapshot = read_snapshot(path, mmap=True)
+        check_snapshot_model(snapshot, self.embedding_model.model_name)
+
+        # The memory-mapped matrix is used as-is; nothing is embedded or copied for float32
+        with self._lock:
+            self._set_data(
+                np.ascontiguousarray(snapshot.embeddings.astype(self.dtype, copy=False)),
+                list(snapshot.ids),
+                list(snapshot.texts),
+                list(snapshot.metadatas)
+            )
+
+        logger.info(f"Hydrated NumPy index from snapshot {path} ({len(snapshot.ids)} documents)")
+
+        return len(snapshot.ids)
+
+
+    def get_by_ids(self, ids: List[str]) -> Dict:
+
+        data = self._data
+        rows = [data.id_to_row[doc_id] for doc_id in ids if doc_id in data.id_to_row]
+
+        return {
+            "ids": [data.ids[i] for i in rows],
+            "documents": [data.texts[i] for i in rows],
+            "metadatas": [data.metadatas[i] for i in rows],
+            "embeddings": data.embeddings[rows]
+        }
+
+
+    def get_all_metadatas(self) -> Dict[str, Dict]:
+
+        data = self._data
+        return dict(zip(data.ids, data.metadatas))
+
+
+    def delete_documents(self, ids: List[str]) -> None:
+
+        self._check_writable()
+
+        logger.info(f"Deleting {len(ids)} documents from NumPy index")
+
+        with self._lock:
+            data = self._data
+            removed = {data.id_to_row[doc_id] for doc_id in ids if doc_id in data.id_to_row}
+            keep = [row for row in range(len(data.ids)) if row not in removed]
+
+            self._set_data(
+                np.ascontiguousarray(data.embeddings[keep]),
+                [data.ids[i] for i in keep],
+                [data.texts[i] for i in keep],
+                [data.metadatas[i] for i in keep]
+            )
+            self._save()
+
+
+    def get_document_count(self) -> int:
+
+        return len(self._data.ids)
+
+
+    def delete_collection(self) -> None:
+
+        self._check_writable()
+
+        logger.warning(f"Deleting NumPy index '{self.collection_name}'")
+
+        with self._lock:
+            self._set_data(
+                np.empty((0, self._data.embeddings.shape[1]), dtype=self.dtype),
+                [], [], []
+            )
+            for filename in ("embeddings.npy", "documents.json"):
+                path = os.path.join(self.index_directory, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+
+        logger.info("Collection deleted successfully")
+
+
+    def reset(self) -> None:
+
+        logger.info("Resetting collection")
+        self.delete_collection()
+
+
+    def _check_writable(self) -> None:
+
+        if self.read_only:
+            raise RuntimeError(
+                "NumPy index is read-only (memory-mapped snapshot); "
+                "rebuild the snapshot with scripts/build_snapshot.py instead"
+            )
+
+
+    @staticmethod
+    def _filter_mask(data: IndexData, filter_metadata: Dict) -> np.ndarray:
+
+        mask = np.ones(len(data.ids), dtype=bool)
+
+        for field, value in filter_metadata.items():
+            if isinstance(value, dict):
+                if set(value) != {"$eq"}:
+                    raise ValueError(f"Unsupported filter operator for NumPy index: {value}")
+                value = value["$eq"]
+
+            field_masks = data.masks.get(field)
+            if field_masks is not None:
+                field_mask = field_masks.get(value)
+                if field_mask is None:
+                    return np.zeros(len(data.ids), dtype=bool)
+            else:
+                field_mask = np.array([m.get(field) == value for m in data.metadatas], dtype=bool)
+
+            mask &= field_mask
+
+        return mask
+
+
+    def _set_data(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict]
+    ) -> None:
+
+        masks = {}
+        for field in self.indexed_fields:
+            values = np.array([m.get(field) for m in metadatas], dtype=object)
+            masks[field] = {value: values == value for value in set(values.tolist())}
+
+        self._data = IndexData(
+            embeddings=embeddings,
+            ids=ids,
+            texts=texts,
+            metadatas=metadatas,
+            id_to_row={doc_id: row for row, doc_id in enumerate(ids)},
+            masks=masks
+        )
+
+
+    def _save(self) -> None:
+
+        os.makedirs(self.index_directory, exist_ok=True)
+
+        data = self._data
+
+        np.save(os.path.join(self.index_directory, "embeddings.npy"), data.embeddings)
+
+        with open(os.path.join(self.index_directory, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {"ids": data.ids, "texts": data.texts, "metadatas": data.metadatas},
+                f
+            )
+
+
+    def _load(self) -> None:
+
+        embeddings_path = os.path.join(self.index_directory, "embeddings.npy")
+        documents_path = os.path.join(self.index_directory, "documents.json")
+
+        if not (os.path.exists(embeddings_path) and os.path.exists(documents_path)):
+            return
+
+        try:
+            embeddings = np.load(embeddings_path).astype(self.dtype, copy=False)
+
+            with open(documents_path, "r", encoding="utf-8") as f:
+                documents = json.load(f)
+
+            self._set_data(
+                np.ascontiguousarray(embeddings),
+                documents["ids"],
+                documents["texts"],
+                documents["metadatas"]
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to load NumPy index from {self.index_directory}: {e}")
+            raise
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+DOCUMENTS_FILE = "documents.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+class KnowledgeSnapshot(NamedTuple):
+    manifest: Dict
+    ids: List[str]
+    texts: List[str]
+    metadatas: List[Dict]
+    embeddings: np.ndarray
+
+
+def compute_corpus_hash(ids: List[str], texts: List[str], metadatas: List[Dict]) -> str:
+
+    digest = hashlib.sha256()
+    for doc_id, text, metadata in sorted(zip(ids, texts, metadatas), key=lambda d: d[0]):
+        digest.update(json.dumps([doc_id, text, metadata], sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def compute_embeddings_hash(embeddings: np.ndarray) -> str:
+    return hashlib.sha256(memoryview(np.ascontiguousarray(embeddings))).hexdigest()
+
+
+def write_snapshot(
+    output_dir: str,
+    model_name: str,
+    ids: List[str],
+    texts: List[str],
+    metadatas: List[Dict],
+    embeddings: np.ndarray
+) -> Dict:
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "model_name": model_name,
+        "dimension": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+        "count": len(ids),
+        "dtype": "float32",
+        "corpus_hash": compute_corpus_hash(ids, texts, metadatas),
+        "embeddings_hash": compute_embeddings_hash(embeddings),
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+    embeddings_path = os.path.join(output_dir, EMBEDDINGS_FILE)
+    np.save(embeddings_path, embeddings)
+    manifest["embeddings_bytes"] = os.path.getsize(embeddings_path)
+
+    with open(os.path.join(output_dir, DOCUMENTS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "texts": texts, "metadatas": metadatas}, f, separators=(",", ":"))
+
+    # Manifest goes last so a half-written snapshot is never picked up
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Wrote knowledge snapshot to {output_dir} ({len(ids)} documents)")
+
+    return manifest
+
+
+def read_snapshot(path: str, mmap: bool = True, verify: Optional[bool] = None) -> KnowledgeSnapshot:
+    """Load a snapshot, checking it against its manifest.
+
+    Shape, dtype, file size and the corpus hash are always checked. Hashing the
+    embeddings reads the whole matrix, which undoes the point of mapping it, so
+    it only runs with ``verify`` (default: KNOWLEDGE_SNAPSHOT_VERIFY).
+    """
+    if verify is None:
+        verify = os.getenv("KNOWLEDGE_SNAPSHOT_VERIFY", "false").lower() == "true"
+
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"No knowledge snapshot manifest found in {path}")
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {manifest.get('format_version')}")
+
+    with open(os.path.join(path, DOCUMENTS_FILE), "r", encoding="utf-8") as f:
+        documents = json.load(f)
+
+    embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+    embeddings = np.load(embeddings_path, mmap_mode="r" if mmap else None)
+
+    if embeddings.shape[0] != manifest["count"] or len(documents["ids"]) != manifest["count"]:
+        raise ValueError(f"Snapshot in {path} is inconsistent with its manifest")
+
+    # Header-only checks; none of them touch the mapped pages
+    if (
+        (embeddings.ndim == 2 and embeddings.shape[1] != manifest["dimension"])
+        or str(embeddings.dtype) != manifest["dtype"]
+        or ("embeddings_bytes" in manifest and os.path.getsize(embeddings_path) != manifest["embeddings_bytes"])
+    ):
+        raise ValueError(f"Snapshot embeddings in {path} do not match the manifest; rebuild the snapshot")
+
+    # A file replaced after export (say a stale embeddings.npy next to newer documents) fails here
+    if compute_corpus_hash(documents["ids"], documents["texts"], documents["metadatas"]) != manifest["corpus_hash"]:
+        raise ValueError(f"Snapshot documents in {path} do not match the manifest corpus hash; rebuild the snapshot")
+
+    if verify and "embeddings_hash" in manifest and compute_embeddings_hash(embeddings) != manifest["embeddings_hash"]:
+        raise ValueError(f"Snapshot embeddings in {path} do not match the manifest; rebuild the snapshot")
+
+    return KnowledgeSnapshot(
+        manifest=manifest,
+        ids=documents["ids"],
+        texts=documents["texts"],
+        metadatas=documents["metadatas"],
+        embeddings=embeddings
+    )
+
+
+def check_snapshot_model(snapshot: KnowledgeSnapshot, model_name: str) -> None:
+
+    # Vectors from a different model live in a different space; refuse rather than serve garbage
+    if snapshot.manifest["model_name"] != model_name:
+        raise ValueError(
+            f"Snapshot was built with '{snapshot.manifest['model_name']}' "
+            f"but the embedding model is '{model_name}'"
+        )
+
+
+def export_snapshot(vector_store, output_dir: str) -> Dict:
+
+    ids = list(vector_store.get_all_metadatas())
+    documents = vector_store.get_by_ids(ids)
+
+    return write_snapshot(
+        output_dir,
+        model_name=vector_store.embedding_model.model_name,
+        ids=list(documents["ids"]),
+        texts=list(documents["documents"]),
+        metadatas=list(documents["metadatas"]),
+        embeddings=np.asarray(documents["embeddings"], dtype=np.float32)
+    )
@@ -1,31 +1,33 @@
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Optional
 import logging
 import os
 
-from app.rag.embeddings import get_embedding_model
+import numpy as np
+
+from app.rag.base_store import VectorStore
+from app.rag.embeddings import EmbeddingModel
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class MedicalVectorStore:
+class MedicalVectorStore(VectorStore):
     
     def __init__(
         self,
         collection_name: str = "medical_knowledge",
-        persist_directory: str = "./chroma_db"
+        persist_directory: str = "./chroma_db",
+        embedding_model: Optional[EmbeddingModel] = None
     ):
        
-        self.collection_name = collection_name
-        self.persist_directory = persist_directory
-        
-        self.embedding_model = get_embedding_model()
+        super().__init__(collection_name, persist_directory, embedding_model)
         
         logger.info(f"Initializing Chroma DB at {persist_directory}")
         
         try:
+            import chromadb
+            from chromadb.config import Settings
+            
             os.makedirs(persist_directory, exist_ok=True)
             
             self.client = chromadb.PersistentClient(
@@ -52,7 +54,8 @@ class MedicalVectorStore:
         self,
         texts: List[str],
         metadatas: Optional[List[Dict]] = None,
-        ids: Optional[List[str]] = None
+        ids: Optional[List[str]] = None,
+        embeddings: Optional[np.ndarray] = None
     ) -> None:
         
         try:
@@ -64,9 +67,10 @@ class MedicalVectorStore:
             
             logger.info(f"Adding {len(texts)} documents to collection")
             
-            embeddings = self.embedding_model.encode_batch(texts)
+            if embeddings is None:
+                embeddings = self.embedding_model.encode_batch(texts)
             
-            embeddings_list = embeddings.tolist()
+            embeddings_list = np.asarray(embeddings).tolist()
             
             self.collection.upsert(
                 ids=ids,
@@ -83,33 +87,60 @@ class MedicalVectorStore:
             raise
     
     
-    def search(
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        n_results: int = 5,
+        filter_metadata: Optional[Dict] = None
+    ) -> Dict:
+        
+        return self.collection.query(
+            query_embeddings=[np.asarray(query_embedding).tolist()],
+            n_results=n_results,
+            where=filter_metadata,
+            include=["documents", "metadatas", "distances"]
+        )
+    
+    
+    def search_many_by_embedding(
         self,
-        query: str,
+        query_embeddings: np.ndarray,
         n_results: int = 5,
         filter_metadata: Optional[Dict] = None
     ) -> Dict:
-        """Search vector store - synchronous version."""
+        
+        # Chroma answers every query in a single round trip
+        return self.collection.query(
+            query_embeddings=np.asarray(query_embeddings).tolist(),
+            n_results=n_results,
+            where=filter_metadata,
+            include=["documents", "metadatas", "distances"]
+        )
+    
+    
+    def get_by_ids(self, ids: List[str]) -> Dict:
+        
+        return self.collection.get(
+            ids=ids,
+            include=["documents", "metadatas", "embeddings"]
+        )
+    
+    
+    def get_all_metadatas(self) -> Dict[str, Dict]:
+        
+        results = self.collection.get(include=["metadatas"])
+        return dict(zip(results['ids'], results['metadatas']))
+    
+    
+    def delete_documents(self, ids: List[str]) -> None:
+        
         try:
-            logger.info(f"Searching for: '{query}' (n_results={n_results})")
-            
-            # Embedding and ChromaDB query are synchronous operations
-            query_embedding = self.embedding_model.encode(query)
-            query_embedding_list = query_embedding.tolist()
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding_list],
-                n_results=n_results,
-                where=filter_metadata,
-                include=["documents", "metadatas", "distances"]
-            )
-            
-            logger.info(f"Found {len(results['documents'][0])} results")
-            return results
+            logger.info(f"Deleting {len(ids)} documents from collection")
+            self.collection.delete(ids=ids)
             
         except Exception as e:
-            logger.error(f"Error searching vector store: {e}")
-            return {"documents": [[]], "metadatas": [[]], "distances": [[]]}
+            logger.error(f"Failed to delete documents: {e}")
+            raise
     
     
     def get_document_count(self) -> int:
@@ -151,12 +182,40 @@ class MedicalVectorStore:
 _vector_store = None
 
 
-def get_vector_store() -> MedicalVectorStore:
+def get_vector_store() -> VectorStore:
 
     global _vector_store
     
     if _vector_store is None:
-        logger.info("Creating global vector store instance")
-        _vector_store = MedicalVectorStore()
+        backend = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+        persist_directory = os.getenv("CHROMA_DB_PATH", "./chroma_db")
+        logger.info(f"Creating global vector store instance (backend={backend})")
+        
+        snapshot_path = os.getenv("KNOWLEDGE_SNAPSHOT_PATH")
+        
+        if backend == "numpy":
+            from app.rag.numpy_store import NumpyVectorStore
+            
+            _vector_store = NumpyVectorStore(
+                persist_directory=persist_directory,
+                dtype=os.getenv("VECTOR_STORE_DTYPE", "float32")
+            )
+        elif backend == "mmap":
+            from app.rag.numpy_store import NumpyVectorStore
+            
+            # Read-only and shared: workers map the same snapshot file instead of copying it
+            _vector_store = NumpyVectorStore(
+                persist_directory=persist_directory,
+                read_only=True,
+                snapshot_path=snapshot_path
+            )
+            return _vector_store
+        elif backend == "chroma":
+            _vector_store = MedicalVectorStore(persist_directory=persist_directory)
+        else:
+            raise ValueError(f"Unknown vector store backend: {backend}")
+        
+        if snapshot_path and (backend == "numpy" or _vector_store.get_document_count() == 0):
+            _vector_store.hydrate_from_snapshot(snapshot_path)
     
     return _vector_store
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .resilience import with_timeout, retry_with_backoff
+from .resilience import with_timeout, retry_with_backoff, CircuitBreaker, Bulkhead, BulkheadFullError
 from .metrics import MetricsCollector
 
-__all__ = ["with_timeout", "retry_with_backoff", "MetricsCollector"]
+__all__ = ["with_timeout", "retry_with_backoff", "CircuitBreaker", "Bulkhead", "BulkheadFullError", "MetricsCollector"]
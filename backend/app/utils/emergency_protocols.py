@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.utils.keyword_router import KeywordRouter, get_keyword_router
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROTOCOLS_PATH = Path(__file__).parent / "emergency_protocols.json"
+
+FAST_RESPONSE_HEADER = "**⚠️ THIS MAY BE A MEDICAL EMERGENCY.**"
+FAST_RESPONSE_FOOTER = "_A detailed assessment follows. Do not wait for it before calling for help._"
+
+
+def load_protocol_file(path: Optional[str] = None) -> Dict:
+    with open(path or DEFAULT_PROTOCOLS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class EmergencyProtocols:
+    """Precomputed first-aid guidance served before any retrieval or LLM call.
+
+    Protocol keywords share the routing automaton, so picking the matching
+    protocols costs one more pass over the query; the response strings are
+    built once at load time.
+    """
+    
+    def __init__(self, protocols: List[Dict], default: Dict, keyword_router: KeywordRouter):
+        self.protocols = {protocol["emergency"]: protocol for protocol in protocols}
+        self.default = default
+        self.keyword_router = keyword_router
+        
+        self._matcher = KeywordRouter({
+            protocol["emergency"]: protocol.get("keywords", []) for protocol in protocols
+        })
+        self._rendered = {
+            name: self._render(protocol) for name, protocol in self.protocols.items()
+        }
+        self._rendered_default = self._render(default)
+        
+        logger.info(f"Emergency fast path ready: {len(self.protocols)} protocols")
+    
+    @classmethod
+    def from_file(cls, path: str, keyword_router: KeywordRouter) -> "EmergencyProtocols":
+        data = load_protocol_file(path)
+        return cls(data["protocols"], data["default"], keyword_router)
+    
+    @staticmethod
+    def _render(protocol: Dict) -> str:
+        return f"**{protocol['emergency']}:** {protocol['text']}"
+    
+    def match(self, query: str) -> List[str]:
+        matched = self._matcher.categories(query)
+        # Keep file order so the same query always renders the same response
+        return [name for name in self.protocols if name in matched]
+    
+    def respond(self, query: str) -> Optional[str]:
+        # Only clear emergencies, the same test that routes a query to triage;
+        # protocol keywords just pick which guidance to show
+        if not self.keyword_router.matches(query, "emergency"):
+            return None
+        
+        sections = [self._rendered[name] for name in self.match(query)] or [self._rendered_default]
+        
+        return "\n\n".join([FAST_RESPONSE_HEADER, *sections, FAST_RESPONSE_FOOTER])
+
+
+_emergency_protocols = None
+
+
+def get_emergency_protocols() -> EmergencyProtocols:
+    
+    global _emergency_protocols
+    
+    if _emergency_protocols is None:
+        path = os.getenv("EMERGENCY_PROTOCOLS_PATH") or str(DEFAULT_PROTOCOLS_PATH)
+        logger.info(f"Loading emergency protocols from {path}")
+        _emergency_protocols = EmergencyProtocols.from_file(path, get_keyword_router())
+    
+    return _emergency_protocols
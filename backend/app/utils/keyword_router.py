@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS_PATH = Path(__file__).parent / "routing_keywords.json"
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().replace("’", "'").split())
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher: one pass over the text finds every pattern."""
+    
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]
+        
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        
+        self._build()
+    
+    def _add(self, pattern: str, value: Any) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+    
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                # Depth-1 states fall back to the root, never to themselves
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        state = 0
+        
+        for end, char in enumerate(text, 1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            
+            for length, value in self._output[state]:
+                yield end - length, end, value
+
+
+class KeywordRouter:
+    """Word-boundary keyword matching for every routing category in one pass."""
+    
+    def __init__(self, keyword_sets: Dict[str, List[str]]):
+        self.keyword_sets = {
+            category: sorted({normalize_query(k) for k in keywords if k.strip()})
+            for category, keywords in keyword_sets.items()
+        }
+        
+        self._automaton = AhoCorasick(
+            (keyword, (category, keyword))
+            for category, keywords in self.keyword_sets.items()
+            for keyword in keywords
+        )
+        
+        logger.info(
+            f"Keyword router ready: {sum(len(k) for k in self.keyword_sets.values())} keywords "
+            f"in {len(self.keyword_sets)} categories"
+        )
+    
+    @classmethod
+    def from_file(cls, path: str) -> "KeywordRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+    
+    def match(self, query: str) -> Dict[str, List[str]]:
+        text = normalize_query(query)
+        matches: Dict[str, List[str]] = {}
+        
+        for start, end, (category, keyword) in self._automaton.iter_matches(text):
+            # Whole words only: "severe" must not fire inside "persevere"
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            
+            found = matches.setdefault(category, [])
+            if keyword not in found:
+                found.append(keyword)
+        
+        return matches
+    
+    def categories(self, query: str) -> Set[str]:
+        return set(self.match(query))
+    
+    def matches(self, query: str, category: str) -> bool:
+        return category in self.match(query)
+
+
+_keyword_router = None
+
+
+def get_keyword_router() -> KeywordRouter:
+    
+    global _keyword_router
+    
+    if _keyword_router is None:
+        path = os.getenv("ROUTING_KEYWORDS_PATH") or str(DEFAULT_KEYWORDS_PATH)
+        logger.info(f"Loading routing keywords from {path}")
+        _keyword_router = KeywordRouter.from_file(path)
+    
+    return _keyword_router
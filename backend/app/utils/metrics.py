@@ -1,13 +1,23 @@
+import threading
 import time
 from collections import defaultdict, deque
 from typing import Dict, List
 
+# Upper edges, in milliseconds, of the per-stage latency histogram buckets
+STAGE_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
 class MetricsCollector:
     def __init__(self):
         self.response_times = deque(maxlen=1000)
         self.error_counts = defaultdict(int)
         self.request_counts = defaultdict(int)
         self.start_time = time.time()
+        
+        # Spans end on executor threads as well as the event loop
+        self._stage_lock = threading.Lock()
+        self.stage_latencies = defaultdict(lambda: deque(maxlen=1000))
+        self.stage_counts = defaultdict(int)
+        self.stage_histograms = defaultdict(lambda: [0] * (len(STAGE_LATENCY_BUCKETS_MS) + 1))
     
     def record_response_time(self, endpoint: str, response_time: float):
         self.response_times.append(response_time)
@@ -16,6 +26,35 @@ class MetricsCollector:
     def record_error(self, endpoint: str, error_type: str):
         self.error_counts[f"{endpoint}:{error_type}"] += 1
     
+    def record_stage(self, stage: str, duration_ms: float):
+        bucket = sum(duration_ms > edge for edge in STAGE_LATENCY_BUCKETS_MS)
+        with self._stage_lock:
+            self.stage_latencies[stage].append(duration_ms)
+            self.stage_counts[stage] += 1
+            self.stage_histograms[stage][bucket] += 1
+    
+    def get_stage_stats(self) -> Dict:
+        labels = [f"<={edge}ms" for edge in STAGE_LATENCY_BUCKETS_MS] + [f">{STAGE_LATENCY_BUCKETS_MS[-1]}ms"]
+        
+        with self._stage_lock:
+            snapshot = {
+                stage: (sorted(latencies), self.stage_counts[stage], list(self.stage_histograms[stage]))
+                for stage, latencies in self.stage_latencies.items()
+            }
+        
+        stats = {}
+        for stage, (latencies, count, histogram) in sorted(snapshot.items()):
+            stats[stage] = {
+                "count": count,
+                "avg_ms": round(sum(latencies) / len(latencies), 2),
+                "p50_ms": round(latencies[len(latencies) // 2], 2),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+                "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2),
+                "histogram": dict(zip(labels, histogram))
+            }
+        
+        return stats
+    
     def get_avg_response_time(self) -> float:
         if not self.response_times:
             return 0.0
@@ -27,7 +66,8 @@ class MetricsCollector:
             "total_requests": sum(self.request_counts.values()),
             "total_errors": sum(self.error_counts.values()),
             "uptime_seconds": time.time() - self.start_time,
-            "recent_response_times": list(self.response_times)[-10:]
+            "recent_response_times": list(self.response_times)[-10:],
+            "stages": self.get_stage_stats()
         }
 
 _metrics = MetricsCollector()
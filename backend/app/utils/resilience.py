@@ -1,6 +1,8 @@
 import asyncio
+import threading
 import time
-from typing import Callable, Any
+from collections import deque
+from typing import Callable, Any, Dict, Optional
 
 async def with_timeout(coro, timeout_seconds: float):
     try:
@@ -27,6 +29,22 @@ async def retry_with_backoff(func: Callable, max_retries: int = 3, base_delay: f
     
     raise last_exception
 
+def retry_with_backoff_sync(func: Callable, max_retries: int = 3, base_delay: float = 1.0):
+    last_exception = None
+    
+    for attempt in range(max_retries):
+        try:
+            return func()
+        except Exception as e:
+            last_exception = e
+            if attempt == max_retries - 1:
+                raise last_exception
+            
+            delay = base_delay * (2 ** attempt)
+            time.sleep(delay)
+    
+    raise last_exception
+
 class CircuitBreaker:
     def __init__(self, failure_threshold: int = 5, timeout: int = 60):
         self.failure_threshold = failure_threshold
@@ -35,12 +53,27 @@ class CircuitBreaker:
         self.last_failure_time = None
         self.state = "CLOSED"
     
-    async def call(self, func: Callable):
+    def check(self):
         if self.state == "OPEN":
             if time.time() - self.last_failure_time > self.timeout:
                 self.state = "HALF_OPEN"
             else:
                 raise Exception("Circuit breaker is OPEN")
+    
+    def record_success(self):
+        if self.state == "HALF_OPEN":
+            self.state = "CLOSED"
+            self.failure_count = 0
+    
+    def record_failure(self):
+        self.failure_count += 1
+        self.last_failure_time = time.time()
+        
+        if self.failure_count >= self.failure_threshold:
+            self.state = "OPEN"
+    
+    async def call(self, func: Callable):
+        self.check()
         
         try:
             if asyncio.iscoroutinefunction(func):
@@ -48,17 +81,175 @@ class CircuitBreaker:
             else:
                 result = func()
             
-            if self.state == "HALF_OPEN":
-                self.state = "CLOSED"
-                self.failure_count = 0
-            
+            self.record_success()
+            return result
+        
+        except Exception as e:
+            self.record_failure()
+            raise e
+    
+    def call_sync(self, func: Callable):
+        self.check()
+        
+        try:
+            result = func()
+            self.record_success()
             return result
         
         except Exception as e:
-            self.failure_count += 1
-            self.last_failure_time = time.time()
+            self.record_failure()
+            raise e
+    
+    def get_stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "failure_count": self.failure_count,
+            "failure_threshold": self.failure_threshold
+        }
+
+class BulkheadFullError(Exception):
+    pass
+
+class _Waiter:
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+    
+    def wake(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve)
+        else:
+            self.event.set()
+    
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+class Bulkhead:
+    """Caps concurrent calls to a dependency, with a bounded FIFO wait queue.
+    
+    At most ``max_concurrent`` calls run at once and at most ``max_queue`` wait
+    for a slot; beyond that callers are rejected immediately with
+    BulkheadFullError instead of piling up. Works for both sync callers (threads)
+    and async callers on any event loop, sharing one limit.
+    """
+    
+    def __init__(self, name: str, max_concurrent: int = 8, max_queue: int = 32, queue_timeout: float = 30.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        
+        self._lock = threading.Lock()
+        self._waiters: "deque[_Waiter]" = deque()
+        self._queue_times_ms = deque(maxlen=1000)
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+    
+    def _try_enter(self, waiter_factory: Callable[[], _Waiter]) -> Optional[_Waiter]:
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                self._queue_times_ms.append(0.0)
+                return None
             
-            if self.failure_count >= self.failure_threshold:
-                self.state = "OPEN"
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise BulkheadFullError(
+                    f"{self.name} is overloaded: {self.active} calls running, {len(self._waiters)} queued"
+                )
             
-            raise e
+            waiter = waiter_factory()
+            self._waiters.append(waiter)
+            return waiter
+    
+    def _abandon(self, waiter: _Waiter) -> bool:
+        # Returns True if the slot had already been handed to this waiter
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self.timed_out += 1
+            return False
+    
+    def _admitted_after_wait(self, started: float):
+        with self._lock:
+            self.admitted += 1
+            self._queue_times_ms.append((time.perf_counter() - started) * 1000)
+    
+    def acquire(self):
+        started = time.perf_counter()
+        waiter = self._try_enter(_Waiter)
+        if waiter is None:
+            return
+        
+        if not waiter.event.wait(self.queue_timeout) and not self._abandon(waiter):
+            raise BulkheadFullError(f"Timed out after {self.queue_timeout}s waiting for {self.name}")
+        
+        self._admitted_after_wait(started)
+    
+    async def acquire_async(self):
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        waiter = self._try_enter(lambda: _Waiter(loop))
+        if waiter is None:
+            return
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                raise BulkheadFullError(f"Timed out after {self.queue_timeout}s waiting for {self.name}")
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        
+        self._admitted_after_wait(started)
+    
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the oldest waiter; active stays the same
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self.active -= 1
+    
+    def call(self, func: Callable):
+        self.acquire()
+        try:
+            return func()
+        finally:
+            self.release()
+    
+    async def call_async(self, func: Callable):
+        await self.acquire_async()
+        try:
+            return await func()
+        finally:
+            self.release()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            queue_times = sorted(self._queue_times_ms)
+            queued = len(self._waiters)
+        
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "p50_queue_ms": queue_times[len(queue_times) // 2] if queue_times else 0.0,
+            "p95_queue_ms": queue_times[int(len(queue_times) * 0.95)] if queue_times else 0.0,
+            "max_queue_ms": queue_times[-1] if queue_times else 0.0
+        }
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent async calls that share a key into one execution.
+    
+    The first caller for a key starts the work as a task; callers arriving while
+    it is in flight await the same task instead of repeating it. The task is
+    shielded, so a caller that disconnects doesn't cancel it for the others.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Tuple[asyncio.AbstractEventLoop, asyncio.Task, list]] = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        
+        with self._lock:
+            entry = self._in_flight.get(key)
+            # Tasks belong to one event loop; a different loop just runs its own
+            if entry is not None and entry[0] is loop:
+                _, task, waiters = entry
+                waiters[0] += 1
+                self.coalesced += 1
+                self.max_waiters = max(self.max_waiters, waiters[0])
+            else:
+                task = loop.create_task(func())
+                waiters = [0]
+                self._in_flight[key] = (loop, task, waiters)
+                self.executions += 1
+                task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+        
+        if waiters[0]:
+            logger.info(f"Coalesced duplicate in-flight request ({waiters[0]} waiting)")
+        
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is not None and entry[1] is task:
+                del self._in_flight[key]
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            in_flight = len(self._in_flight)
+        
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": in_flight,
+            "executions": self.executions,
+            "coalesced_waiters": self.coalesced,
+            "max_waiters_per_key": self.max_waiters,
+            "coalesced_rate": self.coalesced / total if total else 0.0
+        }
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
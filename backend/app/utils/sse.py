@@ -0,0 +1,13 @@
+import json
+from typing import Any
+
+# Stop proxies (nginx, Railway's edge) from buffering the stream into one late chunk
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
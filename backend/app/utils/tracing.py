@@ -0,0 +1,146 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from app.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Span(NamedTuple):
+    name: str
+    started: float
+    duration: float
+    thread_id: int
+
+
+class Trace:
+    """Spans recorded while one workflow run is in progress.
+
+    Spans may end on executor threads, so appends are locked. ``export`` writes
+    the Chrome trace-event format, which chrome://tracing and Perfetto open.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.perf_counter()
+        self.started_wall = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, started: float, duration: float) -> None:
+        with self._lock:
+            self.spans.append(Span(name, started, duration, threading.get_ident()))
+    
+    def durations_ms(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration * 1000
+        return {name: round(total, 2) for name, total in totals.items()}
+    
+    def to_chrome_trace(self) -> Dict:
+        pid = os.getpid()
+        origin_us = self.started_wall * 1e6
+        
+        with self._lock:
+            events = [
+                {
+                    "name": span.name,
+                    "cat": span.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": round(origin_us + (span.started - self.started) * 1e6, 1),
+                    "dur": round(span.duration * 1e6, 1),
+                    "pid": pid,
+                    "tid": span.thread_id
+                }
+                for span in self.spans
+            ]
+        
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "name": self.name}
+        }
+    
+    def export(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.name}-{self.trace_id}.json")
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        
+        return path
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def start_trace(name: str) -> Iterator[Trace]:
+    trace = Trace(name)
+    token = _current_trace.set(trace)
+    
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        
+        export_dir = os.getenv("TRACE_EXPORT_DIR")
+        if export_dir:
+            try:
+                trace.export(export_dir)
+            except OSError as e:
+                logger.error(f"Trace export failed: {e}")
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        
+        # Stage histograms cover every call; the per-run trace only exists inside start_trace
+        get_metrics().record_stage(name, duration * 1000)
+        
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(name, started, duration)
+
+
+def traced(name: str) -> Callable:
+    
+    def decorator(func: Callable) -> Callable:
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,24 @@
+# Multi-worker deployment: gunicorn master + uvicorn workers sharing one
+# memory-mapped knowledge index. Use with VECTOR_STORE_BACKEND=mmap and
+# KNOWLEDGE_SNAPSHOT_PATH pointing at a snapshot from scripts/build_snapshot.py:
+#
+#   gunicorn app.main:app -c gunicorn.conf.py
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Import the app (and everything it loads at import time) once, in the master
+preload_app = True
+
+
+def on_starting(server):
+    from app.preload import preload_shared_resources
+
+    preload_shared_resources()
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} forked with shared knowledge index")
@@ -0,0 +1,183 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.api.conversations import conversation_page_statement, message_count_statement
+from app.models.database import Base, Conversation, Message, User
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def seed(session_factory, users: int, conversations: int, messages: int, message_chars: int) -> list:
+    """Insert users each holding `conversations` conversations of `messages` long messages"""
+    body = "x" * message_chars
+    base = datetime(2024, 1, 1)
+    user_ids = []
+    
+    db = session_factory()
+    try:
+        for u in range(users):
+            user_id = uuid.uuid4()
+            user_ids.append(user_id)
+            db.add(User(id=user_id, email=f"bench{u}@example.com", password_hash="x", name=f"Bench {u}"))
+            
+            conversation_rows, message_rows = [], []
+            for c in range(conversations):
+                conversation_id = uuid.uuid4()
+                updated_at = base + timedelta(minutes=c)
+                conversation_rows.append({
+                    "id": conversation_id, "user_id": user_id, "title": f"Conversation {c}",
+                    "created_at": base, "updated_at": updated_at
+                })
+                message_rows.extend(
+                    {
+                        "id": uuid.uuid4(), "conversation_id": conversation_id, "role": "user" if m % 2 == 0 else "assistant",
+                        "content": body, "timestamp": updated_at
+                    }
+                    for m in range(messages)
+                )
+            
+            db.bulk_insert_mappings(Conversation, conversation_rows)
+            db.bulk_insert_mappings(Message, message_rows)
+            db.commit()
+    finally:
+        db.close()
+    
+    return user_ids
+
+
+def legacy_page(db, user_id, limit: int, offset: int) -> list:
+    """The previous implementation: OFFSET paging and len(conv.messages) per row"""
+    conversations = db.query(Conversation)\
+        .filter(Conversation.user_id == user_id)\
+        .order_by(Conversation.updated_at.desc())\
+        .limit(limit)\
+        .offset(offset)\
+        .all()
+    return [len(conv.messages) for conv in conversations]
+
+
+def list_conversation_page(db, user_id, limit: int, cursor=None):
+    """Sync twin of the endpoint's async page query, built from the same statements"""
+    conversations = db.execute(conversation_page_statement(user_id, limit, cursor)).all()
+    counts = {}
+    if conversations:
+        counts = dict(db.execute(message_count_statement([conv.id for conv in conversations])).all())
+    return conversations, counts
+
+
+def cursor_for_page(session_factory, user_id, limit: int, page: int):
+    """Walk the cursors up to `page` so the timed run fetches just that one page"""
+    cursor = None
+    db = session_factory()
+    try:
+        for _ in range(page):
+            conversations, _ = list_conversation_page(db, user_id, limit, cursor=cursor)
+            if not conversations:
+                break
+            cursor = (conversations[-1].updated_at, conversations[-1].id)
+    finally:
+        db.close()
+    return cursor
+
+
+def keyset_page(db, user_id, limit: int, cursor) -> list:
+    conversations, counts = list_conversation_page(db, user_id, limit, cursor=cursor)
+    return [counts.get(conv.id, 0) for conv in conversations]
+
+
+def measure(session_factory, engine, func, repeats: int) -> dict:
+    statements = []
+    
+    def count(*_):
+        statements.append(1)
+    
+    event.listen(engine, "before_cursor_execute", count)
+    latencies = []
+    try:
+        for _ in range(repeats):
+            db = session_factory()
+            try:
+                start = time.perf_counter()
+                func(db)
+                latencies.append((time.perf_counter() - start) * 1000)
+            finally:
+                db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    
+    return {
+        "p50_ms": statistics.median(latencies),
+        "queries": len(statements) // repeats
+    }
+
+
+def main():
+    """Compare OFFSET + lazy message counts with keyset paging + one grouped COUNT"""
+    parser = argparse.ArgumentParser(description="Benchmark the conversation list endpoint queries")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--message-chars", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", nargs="+", type=int, default=[0, 10, 35])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        
+        print("🏥 Dr.Heal AI - Conversation List Benchmark")
+        print("="*60)
+        
+        start = time.perf_counter()
+        user_ids = seed(session_factory, args.users, args.conversations, args.messages, args.message_chars)
+        print(
+            f"Seeded {args.users} users x {args.conversations} conversations x {args.messages} messages"
+            f" ({args.message_chars} chars each) in {time.perf_counter() - start:.1f}s"
+        )
+        
+        user_id = user_ids[0]
+        for page in args.pages:
+            cursor = cursor_for_page(session_factory, user_id, args.limit, page)
+            legacy = measure(
+                session_factory, engine,
+                lambda db: legacy_page(db, user_id, args.limit, page * args.limit),
+                args.repeats
+            )
+            keyset = measure(
+                session_factory, engine,
+                lambda db: keyset_page(db, user_id, args.limit, cursor),
+                args.repeats
+            )
+            print(
+                f"page {page:>3} | offset + lazy counts p50 {legacy['p50_ms']:8.2f}ms ({legacy['queries']} queries)"
+                f" | keyset + grouped COUNT p50 {keyset['p50_ms']:8.2f}ms ({keyset['queries']} queries)"
+            )
+        
+        print("="*60)
+        
+        if args.database_url:
+            Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
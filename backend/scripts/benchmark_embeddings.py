@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.rag.embeddings import EmbeddingModel
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "medical_knowledge"
+
+QUERIES = [
+    "I have fever and cough",
+    "headache and fever",
+    "My head hurts really bad",
+    "chest pain when breathing",
+    "what is diabetes",
+    "how to treat a migraine",
+    "stomach ache after eating",
+    "I feel dizzy and tired",
+]
+
+
+def load_corpus() -> List[str]:
+    from app.rag.medical_rag import MedicalRAG
+    
+    with open(DATA_DIR / "symptoms.json", "r", encoding="utf-8") as f:
+        symptoms = json.load(f)
+    with open(DATA_DIR / "diseases.json", "r", encoding="utf-8") as f:
+        diseases = json.load(f)
+    
+    texts = [MedicalRAG._format_symptom_text(k, v) for k, v in symptoms.items()]
+    texts += [MedicalRAG._format_disease_text(k, v) for k, v in diseases.items()]
+    return texts
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_backend(backend: str, corpus: List[str], repeats: int) -> dict:
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = EmbeddingModel(backend=backend)
+    load_time = time.perf_counter() - start
+    
+    model.encode(QUERIES[0])
+    
+    single_latencies = []
+    for _ in range(repeats):
+        for query in QUERIES:
+            start = time.perf_counter()
+            model.encode(query)
+            single_latencies.append((time.perf_counter() - start) * 1000)
+    
+    start = time.perf_counter()
+    model.encode_batch(corpus)
+    corpus_time = time.perf_counter() - start
+    
+    single_latencies.sort()
+    return {
+        "backend": backend,
+        "load_s": load_time,
+        "single_p50_ms": statistics.median(single_latencies),
+        "single_p95_ms": single_latencies[int(len(single_latencies) * 0.95) - 1],
+        "corpus_docs_per_s": len(corpus) / corpus_time,
+        "peak_rss_delta_mb": rss_mb() - rss_before
+    }
+
+
+def main():
+    """Compare embedding latency of the PyTorch and ONNX backends"""
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    
+    # Measure raw model cost, not cache hits
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    
+    corpus = load_corpus()
+    
+    print("🏥 Dr.Heal AI - Embedding Backend Benchmark")
+    print("="*60)
+    print(f"Corpus documents: {len(corpus)}, single queries: {len(QUERIES) * args.repeats}")
+    print("="*60)
+    
+    for backend in args.backends:
+        result = benchmark_backend(backend, corpus, args.repeats)
+        print(
+            f"{result['backend']:>6} | load {result['load_s']:.2f}s"
+            f" | single p50 {result['single_p50_ms']:.2f}ms p95 {result['single_p95_ms']:.2f}ms"
+            f" | corpus {result['corpus_docs_per_s']:.1f} docs/s"
+            f" | peak RSS +{result['peak_rss_delta_mb']:.0f}MB"
+        )
+    
+    print("="*60)
+    if len(args.backends) > 1:
+        print("Note: peak RSS is per-process; run one backend at a time for exact memory numbers.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+import logging
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.rag.embeddings import get_embedding_model
+from app.rag.numpy_store import NumpyVectorStore
+from app.rag.vectorstore import MedicalVectorStore
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+CHROMA_BATCH = 5000
+
+
+def synthetic_corpus(n: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    
+    ids = [f"doc_{i}" for i in range(n)]
+    texts = [f"Synthetic document {i}" for i in range(n)]
+    metadatas = [
+        {"type": "symptom" if i % 3 else "disease", "id": str(i), "name": f"Doc {i}"}
+        for i in range(n)
+    ]
+    return ids, texts, metadatas, embeddings
+
+
+def load_store(store, ids, texts, metadatas, embeddings) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(ids), CHROMA_BATCH):
+        end = i + CHROMA_BATCH
+        store.add_documents(
+            texts=texts[i:end],
+            metadatas=metadatas[i:end],
+            ids=ids[i:end],
+            embeddings=embeddings[i:end]
+        )
+    return time.perf_counter() - start
+
+
+def time_queries(store, queries: np.ndarray, n_results: int, filter_metadata=None) -> dict:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.search_by_embedding(query, n_results=n_results, filter_metadata=filter_metadata)
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1]
+    }
+
+
+def main():
+    """Compare Chroma and the in-process NumPy index on synthetic corpora"""
+    parser = argparse.ArgumentParser(description="Benchmark vector store backends")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    args = parser.parse_args()
+    
+    model = get_embedding_model()
+    dim = model.get_dimension()
+    queries = synthetic_corpus(args.queries, dim, seed=1)[3]
+    
+    print("🏥 Dr.Heal AI - Vector Store Benchmark")
+    print("="*60)
+    
+    for size in args.sizes:
+        ids, texts, metadatas, embeddings = synthetic_corpus(size, dim)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            stores = {
+                "chroma": MedicalVectorStore(
+                    collection_name="benchmark",
+                    persist_directory=f"{tmp}/chroma",
+                    embedding_model=model
+                ),
+                f"numpy-{args.dtype}": NumpyVectorStore(
+                    collection_name="benchmark",
+                    persist_directory=f"{tmp}/numpy",
+                    dtype=args.dtype,
+                    embedding_model=model
+                )
+            }
+            
+            for name, store in stores.items():
+                load_s = load_store(store, ids, texts, metadatas, embeddings)
+                plain = time_queries(store, queries, args.n_results)
+                filtered = time_queries(store, queries, args.n_results, {"type": "disease"})
+                
+                print(
+                    f"{size:>7} docs | {name:>13} | load {load_s:6.2f}s"
+                    f" | top-{args.n_results} p50 {plain['p50_ms']:.3f}ms p95 {plain['p95_ms']:.3f}ms"
+                    f" | filtered p50 {filtered['p50_ms']:.3f}ms p95 {filtered['p95_ms']:.3f}ms"
+                )
+    
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.rag.medical_rag import get_medical_rag
+from app.rag.snapshot import export_snapshot, read_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Embed the knowledge base and write a snapshot that replicas can hydrate from"""
+    parser = argparse.ArgumentParser(description="Build a prebuilt knowledge snapshot")
+    parser.add_argument(
+        "--output",
+        default=os.getenv("KNOWLEDGE_SNAPSHOT_PATH", "./snapshots/medical_knowledge"),
+        help="Snapshot output directory"
+    )
+    args = parser.parse_args()
+    
+    # Build from the JSON sources, never from a previous snapshot
+    os.environ.pop("KNOWLEDGE_SNAPSHOT_PATH", None)
+    
+    print("🏥 Dr.Heal AI - Knowledge Snapshot Builder")
+    print("="*60)
+    
+    rag = get_medical_rag()
+    rag.load_knowledge(incremental=True)
+    
+    manifest = export_snapshot(rag.vector_store, args.output)
+    
+    # Replicas skip the full embeddings hash at startup, so check the written files once here
+    read_snapshot(args.output, mmap=False, verify=True)
+    
+    print(f"📦 Documents: {manifest['count']}")
+    print(f"🧠 Model: {manifest['model_name']} ({manifest['dimension']} dims)")
+    print(f"🔑 Corpus hash: {manifest['corpus_hash']}")
+    print(f"\n✅ Snapshot written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
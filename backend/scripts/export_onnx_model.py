@@ -0,0 +1,38 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.rag.embeddings import default_onnx_dir
+from app.rag.onnx_backend import export_onnx_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Export the embedding model to a quantized ONNX model for EMBEDDING_BACKEND=onnx"""
+    model_name = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--model", default=model_name, help="sentence-transformers model name")
+    parser.add_argument("--output", default=None, help="Output directory (default: ./onnx_models/<model>)")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip int8 dynamic quantization")
+    args = parser.parse_args()
+    
+    output_dir = args.output or os.getenv("EMBEDDING_ONNX_DIR") or default_onnx_dir(args.model)
+    
+    print("🏥 Dr.Heal AI - ONNX Embedding Export")
+    print("="*60)
+    
+    export_onnx_model(args.model, output_dir, quantize=not args.no_quantize)
+    
+    print(f"\n✅ ONNX model written to {output_dir}")
+    print("🚀 Set EMBEDDING_BACKEND=onnx to serve embeddings without PyTorch")
+
+
+if __name__ == "__main__":
+    main()
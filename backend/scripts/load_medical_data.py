@@ -9,6 +9,7 @@ import logging
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.rag.vectorstore import get_vector_store
+from app.utils.emergency_protocols import load_protocol_file
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -201,47 +202,10 @@ class MedicalDataLoader:
         """Load emergency medical protocols"""
         logger.info("Loading emergency protocols...")
         
+        # Shared with the emergency fast path so both always serve the same guidance
         protocols = [
-            {
-                "emergency": "Cardiac Arrest",
-                "text": "CALL 911 IMMEDIATELY. Begin CPR if trained: 30 chest compressions (2 inches deep, 100-120/min) followed by 2 rescue breaths. Use AED if available. Continue until help arrives. Signs: unresponsive, not breathing normally, no pulse. Time is critical - brain damage begins within 4-6 minutes without oxygen."
-            },
-            {
-                "emergency": "Severe Bleeding",
-                "text": "CALL 911 for severe bleeding. Apply direct pressure with clean cloth. Do not remove cloth if soaked - add more on top. Elevate injured area above heart if possible. Apply pressure to pressure points if direct pressure insufficient. Use tourniquet only as last resort for life-threatening limb bleeding. Monitor for shock (pale, cold, rapid pulse)."
-            },
-            {
-                "emergency": "Choking",
-                "text": "If person can cough/speak, encourage coughing. If cannot breathe/speak: perform Heimlich maneuver - stand behind, wrap arms around waist, make fist above navel, grasp with other hand, give quick upward thrusts. For unconscious person, begin CPR. For infants, use back blows and chest thrusts. CALL 911 if obstruction not cleared."
-            },
-            {
-                "emergency": "Severe Allergic Reaction (Anaphylaxis)",
-                "text": "CALL 911 IMMEDIATELY. Use epinephrine auto-injector (EpiPen) in outer thigh if available. Lay person flat, elevate legs. Give second dose after 5-15 minutes if no improvement. Signs: difficulty breathing, throat swelling, rapid pulse, dizziness, hives, nausea. Even if symptoms improve, emergency evaluation required as symptoms can return."
-            },
-            {
-                "emergency": "Stroke",
-                "text": "CALL 911 IMMEDIATELY - time is brain. Use FAST test: Face drooping (smile), Arm weakness (raise both arms), Speech difficulty (repeat phrase), Time (note symptom onset time). Do not give food, drink, or medication. Keep person calm and lying down with head slightly elevated. Treatment most effective within 3-4.5 hours of symptom onset."
-            },
-            {
-                "emergency": "Seizure",
-                "text": "CALL 911 if: first seizure, lasts >5 minutes, multiple seizures, injury occurs, person has diabetes/pregnancy, or doesn't regain consciousness. During seizure: protect from injury, cushion head, turn on side, loosen tight clothing, time the seizure. DO NOT restrain, put anything in mouth, or give food/drink until fully conscious."
-            },
-            {
-                "emergency": "Severe Burns",
-                "text": "CALL 911 for large burns, burns on face/hands/feet/genitals, or third-degree burns. Remove from heat source. Remove jewelry/tight clothing before swelling. Cool burn with cool (not ice) water for 10-20 minutes. Cover with sterile, non-stick bandage. Do not apply ice, butter, or ointments. Treat for shock if needed. Do not break blisters."
-            },
-            {
-                "emergency": "Poisoning",
-                "text": "CALL POISON CONTROL (1-800-222-1222) or 911 immediately. Have poison container available. Do not induce vomiting unless instructed. If person unconscious, having seizures, or difficulty breathing, call 911 first. For skin contact, remove contaminated clothing and rinse with water for 15-20 minutes. For eye exposure, flush with water for 15 minutes."
-            },
-            {
-                "emergency": "Diabetic Emergency",
-                "text": "Low blood sugar (hypoglycemia): If conscious, give 15g fast-acting carbs (juice, glucose tablets, candy). Recheck in 15 minutes. If unconscious, CALL 911, place in recovery position. High blood sugar (hyperglycemia): Symptoms develop slowly - increased thirst, urination, fatigue. Seek medical care. Diabetic ketoacidosis is emergency: fruity breath, rapid breathing, confusion - CALL 911."
-            },
-            {
-                "emergency": "Head Injury",
-                "text": "CALL 911 if: loss of consciousness, severe headache, vomiting, confusion, seizure, clear fluid from nose/ears, unequal pupils, or weakness. Keep person still, stabilize head/neck. Apply ice to swelling. Monitor for deterioration. Do not move if neck injury suspected. Watch for concussion signs: confusion, memory loss, dizziness, nausea. Seek medical evaluation for any significant head trauma."
-            }
+            {"emergency": protocol["emergency"], "text": protocol["text"]}
+            for protocol in load_protocol_file()["protocols"]
         ]
         
         return protocols
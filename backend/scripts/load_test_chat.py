@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import httpx
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+QUERIES = [
+    "I have fever and cough",
+    "headache and fever",
+    "what is diabetes",
+    "how to treat a migraine",
+    "stomach ache after eating",
+    "I feel dizzy and tired",
+]
+
+
+async def send_chat(client: httpx.AsyncClient, url: str, query: str) -> Tuple[float, int]:
+    start = time.perf_counter()
+    response = await client.post(url, json={"query": query, "chat_type": "symptoms"})
+    return time.perf_counter() - start, response.status_code
+
+
+async def run_load(base_url: str, concurrency: int, total: int, timeout: float) -> dict:
+    url = f"{base_url.rstrip('/')}/api/chat"
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        
+        async def bounded(i: int) -> Tuple[float, int]:
+            async with semaphore:
+                return await send_chat(client, url, QUERIES[i % len(QUERIES)])
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(total)))
+        wall = time.perf_counter() - start
+    
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status != 200)
+    
+    return {
+        "wall_s": wall,
+        "throughput_rps": total / wall,
+        "p50_s": statistics.median(latencies),
+        "p95_s": latencies[int(len(latencies) * 0.95) - 1],
+        "errors": errors,
+        # ~1.0 means requests were served one at a time; ~concurrency means fully overlapped
+        "overlap": sum(latencies) / wall
+    }
+
+
+def main():
+    """Fire concurrent /api/chat requests at one running worker"""
+    parser = argparse.ArgumentParser(description="Load test the chat endpoint")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+    
+    print("🏥 Dr.Heal AI - Chat Load Test")
+    print("="*60)
+    print(f"Target: {args.url}  requests per level: {args.requests}")
+    print("Run against a single worker: uvicorn app.main:app --workers 1")
+    print("="*60)
+    
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_load(args.url, concurrency, args.requests, args.timeout))
+        print(
+            f"concurrency {concurrency:>3} | wall {result['wall_s']:.1f}s"
+            f" | {result['throughput_rps']:.2f} req/s"
+            f" | p50 {result['p50_s']:.2f}s p95 {result['p95_s']:.2f}s"
+            f" | overlap x{result['overlap']:.1f}"
+            f" | errors {result['errors']}"
+        )
+    
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import sys
+from pathlib import Path
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+from app.database.connection import get_db_manager
+from app.database.migrations import ensure_indexes, missing_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Add indexes declared on the models to an existing database"""
+    parser = argparse.ArgumentParser(description="Create missing model indexes on existing tables")
+    parser.add_argument("--dry-run", action="store_true", help="List missing indexes without creating them")
+    parser.add_argument(
+        "--no-concurrently",
+        action="store_true",
+        help="On PostgreSQL, build indexes inside a transaction (locks writes) instead of CONCURRENTLY"
+    )
+    args = parser.parse_args()
+    
+    load_dotenv()
+    engine = get_db_manager().engine
+    
+    if args.dry_run:
+        for index in missing_indexes(engine):
+            print(f"missing: {index.name} on {index.table.name}")
+        return
+    
+    created = ensure_indexes(engine, concurrently=not args.no_concurrently)
+    
+    print(f"✅ Created {len(created)} index(es)" + (f": {', '.join(created)}" if created else ""))
+
+
+if __name__ == "__main__":
+    main()
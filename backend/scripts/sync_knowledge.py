@@ -0,0 +1,33 @@
+import argparse
+import sys
+from pathlib import Path
+import logging
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.rag.medical_rag import get_medical_rag
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Sync symptoms.json/diseases.json into the vector store, re-embedding only what changed"""
+    parser = argparse.ArgumentParser(description="Sync the medical knowledge base")
+    parser.add_argument("--reset", action="store_true", help="Drop the collection and re-embed everything")
+    args = parser.parse_args()
+    
+    print("🏥 Dr.Heal AI - Knowledge Sync")
+    print("="*60)
+    
+    rag = get_medical_rag()
+    result = rag.load_knowledge(reset=args.reset, incremental=not args.reset)
+    
+    for key, value in result.items():
+        print(f"{key:>10}: {value}")
+    
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
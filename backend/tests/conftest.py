@@ -0,0 +1,64 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.agents.workflow import MedicalWorkflow
+from app.utils.keyword_router import DEFAULT_KEYWORDS_PATH, KeywordRouter
+
+
+@pytest.fixture
+def make_workflow():
+    """Builds a MedicalWorkflow from test doubles, skipping __init__ so no model or LLM client loads.
+    
+    Routing-only tests pass nothing; a compiled graph is built once ``agents``
+    maps every route to an agent.
+    """
+    executors = []
+    
+    def make(agents=None, rag=None, keyword_router=None, intent_classifier=None,
+             fanout_enabled=False, agent_deadline=5.0):
+        workflow = MedicalWorkflow.__new__(MedicalWorkflow)
+        workflow.rag = rag
+        workflow.keyword_router = keyword_router or KeywordRouter.from_file(str(DEFAULT_KEYWORDS_PATH))
+        workflow.intent_classifier = intent_classifier
+        workflow.retrieval_pool_size = 20
+        workflow.fanout_enabled = fanout_enabled
+        workflow.fanout_max_agents = 3
+        workflow.agent_deadline = agent_deadline
+        workflow.fanout_executor = ThreadPoolExecutor(max_workers=4)
+        executors.append(workflow.fanout_executor)
+        
+        if agents is not None:
+            workflow.agents = agents
+            workflow.symptom_analyzer = agents["symptom_analyzer"]
+            workflow.disease_expert = agents["disease_expert"]
+            workflow.treatment_advisor = agents["treatment_advisor"]
+            workflow.emergency_triage = agents["emergency_triage"]
+            workflow.graph = workflow._build_graph()
+        
+        return workflow
+    
+    yield make
+    
+    for executor in executors:
+        executor.shutdown(wait=False)
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limit():
+    yield
+    
+    # Every TestClient request shares one client address; without this the whole
+    # run counts against a single 100 requests/minute window
+    main = sys.modules.get("app.main")
+    if main is None:
+        return
+    
+    from app.middleware import RateLimitMiddleware
+    
+    layer = main.app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, RateLimitMiddleware):
+            layer.clients.clear()
+        layer = getattr(layer, "app", None)
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.agents.workflow import AGENT_OUTPUTS
+from app.utils.resilience import BulkheadFullError
+
+
+AGENT_LATENCY = 0.3
+
+
+class SleepyAgent:
+    """Sleeps like a model call, then records its answer the way the real agents do."""
+    
+    def __init__(self, route, latency=AGENT_LATENCY, fail=False, error=RuntimeError):
+        self.output_key = AGENT_OUTPUTS[route][0]
+        self.route = route
+        self.latency = latency
+        self.fail = fail
+        self.error = error
+    
+    def record(self, state):
+        if self.fail:
+            raise self.error("agent failed")
+        state['agent_outputs'][self.output_key] = f"{self.route} answer"
+        state['metadata'][f"{self.route}_done"] = True
+        state['rag_results'] = [{"text": "shared", "metadata": {"type": "symptom", "id": "shared"}, "similarity": 0.9}]
+        return state
+    
+    def process(self, state):
+        time.sleep(self.latency)
+        return self.record(state)
+    
+    async def aprocess(self, state):
+        await asyncio.sleep(self.latency)
+        return self.record(state)
+
+
+class EmptyRAG:
+    
+    def encode_query(self, query):
+        return np.ones(3, dtype=np.float32)
+    
+    async def aencode_query(self, query):
+        return self.encode_query(query)
+    
+    def search(self, query, n_results=5, filter_type=None, mode=None, query_embedding=None):
+        return []
+
+
+@pytest.fixture
+def fanout_workflow(make_workflow):
+    def make(agents, deadline=5.0):
+        return make_workflow(agents, rag=EmptyRAG(), fanout_enabled=True, agent_deadline=deadline)
+    return make
+
+
+@pytest.fixture
+def agents():
+    return {route: SleepyAgent(route) for route in AGENT_OUTPUTS}
+
+
+QUERY = "I have chest pain, what medication should I take?"
+
+
+class TestAgentFanOut:
+    
+    def test_routes_to_every_matching_agent(self, fanout_workflow, agents):
+        workflow = fanout_workflow(agents)
+        
+        assert workflow._route_query({"query": QUERY}) == "fan_out"
+        assert workflow._select_routes({"query": QUERY}) == ["emergency_triage", "treatment_advisor"]
+        assert workflow._route_query({"query": "what medication helps"}) == "treatment_advisor"
+    
+    def test_async_agents_overlap_and_merge(self, fanout_workflow, agents):
+        workflow = fanout_workflow(agents)
+        
+        started = time.perf_counter()
+        state = asyncio.run(workflow.aprocess(QUERY))
+        elapsed = time.perf_counter() - started
+        
+        assert elapsed < 2 * AGENT_LATENCY
+        response = state["final_response"]
+        assert response.index("## Emergency Assessment") < response.index("## Treatment Options")
+        assert "emergency_triage answer" in response and "treatment_advisor answer" in response
+        assert state["metadata"]["agents"] == ["emergency_triage", "treatment_advisor"]
+        assert set(state["metadata"]["agent_latency_ms"]) == {"emergency_triage", "treatment_advisor"}
+        assert state["metadata"]["treatment_advisor_done"]
+        # Both agents cited the same document; it is listed once
+        assert len(state["rag_results"]) == 1
+    
+    def test_sync_agents_run_in_thread_pool(self, fanout_workflow, agents):
+        workflow = fanout_workflow(agents)
+        
+        started = time.perf_counter()
+        state = workflow.process(QUERY)
+        
+        assert time.perf_counter() - started < 2 * AGENT_LATENCY
+        assert state["agent_outputs"].keys() == {"emergency_triage", "treatment_advice"}
+    
+    @pytest.mark.parametrize("run", ["sync", "async"])
+    def test_slow_agent_is_dropped_at_deadline(self, fanout_workflow, agents, run):
+        agents["treatment_advisor"] = SleepyAgent("treatment_advisor", latency=2.0)
+        workflow = fanout_workflow(agents, deadline=0.6)
+        
+        started = time.perf_counter()
+        state = workflow.process(QUERY) if run == "sync" else asyncio.run(workflow.aprocess(QUERY))
+        
+        assert time.perf_counter() - started < 1.5
+        assert state["metadata"]["agent_errors"] == {"treatment_advisor": "timeout"}
+        assert state["final_response"] == "emergency_triage answer"
+    
+    def test_failed_agent_does_not_sink_the_others(self, fanout_workflow, agents):
+        agents["emergency_triage"] = SleepyAgent("emergency_triage", fail=True)
+        workflow = fanout_workflow(agents)
+        
+        state = asyncio.run(workflow.aprocess(QUERY))
+        
+        assert state["final_response"] == "treatment_advisor answer"
+        assert state["metadata"]["agent_errors"] == {"emergency_triage": "error"}
+    
+    @pytest.mark.parametrize("run", ["sync", "async"])
+    def test_overloaded_agent_is_reported_as_overloaded(self, fanout_workflow, agents, run):
+        agents["emergency_triage"] = SleepyAgent("emergency_triage", fail=True, error=BulkheadFullError)
+        workflow = fanout_workflow(agents)
+        
+        state = workflow.process(QUERY) if run == "sync" else asyncio.run(workflow.aprocess(QUERY))
+        
+        assert state["final_response"] == "treatment_advisor answer"
+        assert state["metadata"]["agent_errors"] == {"emergency_triage": "overloaded"}
+    
+    @pytest.mark.parametrize("run", ["sync", "async"])
+    def test_overload_on_every_agent_is_raised(self, fanout_workflow, agents, run):
+        for route in ("emergency_triage", "treatment_advisor"):
+            agents[route] = SleepyAgent(route, fail=True, error=BulkheadFullError)
+        workflow = fanout_workflow(agents)
+        
+        # Callers map this to 503 instead of answering "No response generated"
+        with pytest.raises(BulkheadFullError):
+            workflow.process(QUERY) if run == "sync" else asyncio.run(workflow.aprocess(QUERY))
+    
+    @pytest.mark.parametrize("run", ["sync", "async"])
+    def test_routes_are_selected_once(self, fanout_workflow, agents, run, monkeypatch):
+        workflow = fanout_workflow(agents)
+        calls = []
+        select_routes = workflow._select_routes
+        
+        def counting_select_routes(state):
+            calls.append(state)
+            return select_routes(state)
+        
+        monkeypatch.setattr(workflow, "_select_routes", counting_select_routes)
+        
+        state = workflow.process(QUERY) if run == "sync" else asyncio.run(workflow.aprocess(QUERY))
+        
+        assert len(calls) == 1
+        assert state["routes"] == ["emergency_triage", "treatment_advisor"]
+        assert state["metadata"]["agents"] == ["emergency_triage", "treatment_advisor"]
@@ -0,0 +1,199 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import app.llm.rag_chain as rag_chain
+
+
+LLM_LATENCY = 0.3
+CONCURRENT_CHATS = 10
+
+
+class SlowRAG:
+    
+    def __init__(self):
+        self.encodes = 0
+    
+    def encode_query(self, query):
+        self.encodes += 1
+        return np.ones(3, dtype=np.float32)
+    
+    async def aencode_query(self, query):
+        return self.encode_query(query)
+    
+    def search(self, query, n_results=5, filter_type=None, mode=None, query_embedding=None):
+        time.sleep(0.02)
+        return [{"text": "Symptom: headache", "metadata": {"name": "Headache", "type": "symptom", "id": "headache"}, "similarity": 0.9}]
+
+
+class SlowLLM:
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    def generate(self, prompt):
+        time.sleep(LLM_LATENCY)
+        return "sync answer"
+    
+    async def agenerate(self, prompt):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(LLM_LATENCY)
+        self.in_flight -= 1
+        return "async answer"
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    llm = SlowLLM()
+    monkeypatch.setattr(rag_chain, "get_medical_rag", lambda: SlowRAG())
+    monkeypatch.setattr(rag_chain, "get_gemini_llm", lambda: llm)
+    monkeypatch.setattr(rag_chain, "get_response_cache", lambda: None)
+    return rag_chain.MedicalRAGChain()
+
+
+class TestAsyncChain:
+    
+    def test_async_result_matches_sync_shape(self, chain):
+        sync_result = chain.analyze_symptoms("headache")
+        async_result = asyncio.run(chain.aanalyze_symptoms("headache"))
+        
+        assert set(async_result) == set(sync_result)
+        assert async_result["response"] == "async answer"
+        assert async_result["context"] == sync_result["context"]
+    
+    def test_concurrent_chats_overlap(self, chain):
+        
+        async def run():
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                chain.aanalyze_symptoms(f"headache {i}") for i in range(CONCURRENT_CHATS)
+            ))
+            return results, time.perf_counter() - started
+        
+        results, elapsed = asyncio.run(run())
+        
+        assert len(results) == CONCURRENT_CHATS
+        assert chain.llm.max_in_flight == CONCURRENT_CHATS
+        # Serialized this would take CONCURRENT_CHATS * LLM_LATENCY = 3s
+        assert elapsed < LLM_LATENCY * 3
+    
+    def test_event_loop_stays_responsive(self, chain):
+        
+        async def run():
+            gaps = []
+            
+            async def ticker():
+                last = time.perf_counter()
+                for _ in range(20):
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+            
+            await asyncio.gather(ticker(), *(chain.aget_disease_info("flu") for _ in range(5)))
+            return max(gaps)
+        
+        # Retrieval sleeps run on the executor, so the loop never stalls for long
+        assert asyncio.run(run()) < 0.1
+    
+    def test_duplicate_in_flight_requests_are_coalesced(self, chain):
+        calls = []
+        original = chain.llm.agenerate
+        
+        async def counting_agenerate(prompt):
+            calls.append(prompt)
+            return await original(prompt)
+        
+        chain.llm.agenerate = counting_agenerate
+        before = chain.single_flight.get_stats()
+        
+        async def run():
+            return await asyncio.gather(
+                chain.aanalyze_symptoms("Severe  headache"),
+                chain.aanalyze_symptoms("severe headache"),
+                chain.aanalyze_symptoms("severe headache "),
+                chain.aanalyze_symptoms("severe headache", n_results=3),
+                chain.aget_disease_info("severe headache")
+            )
+        
+        results = asyncio.run(run())
+        after = chain.single_flight.get_stats()
+        
+        # Three symptom duplicates collapse to one; other n_results and chain types do not
+        assert len(calls) == 3
+        assert after["coalesced_waiters"] - before["coalesced_waiters"] == 2
+        assert after["in_flight"] == 0
+        assert [r["query"] for r in results[:3]] == ["Severe  headache", "severe headache", "severe headache "]
+        assert results[0]["response"] == results[1]["response"]
+    
+    def test_coalesced_failure_reaches_every_waiter(self, chain):
+        async def failing_agenerate(prompt):
+            await asyncio.sleep(0.05)
+            raise RuntimeError("upstream down")
+        
+        chain.llm.agenerate = failing_agenerate
+        
+        async def run():
+            return await asyncio.gather(
+                *(chain.aanswer_question("what is flu") for _ in range(3)),
+                return_exceptions=True
+            )
+        
+        results = asyncio.run(run())
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    @pytest.mark.parametrize("cache_enabled", [False, True])
+    def test_query_encoded_once(self, chain, cache_enabled):
+        from app.llm.response_cache import SemanticResponseCache
+        
+        chain.response_cache = SemanticResponseCache() if cache_enabled else None
+        
+        asyncio.run(chain.aanalyze_symptoms("headache"))
+        chain.analyze_symptoms("fever")
+        
+        # Retrieval's embedding doubles as the cache key; there is no second encode
+        assert chain.rag.encodes == 2
+        if cache_enabled:
+            assert chain.response_cache.get_stats()["entries"] == 1
+    
+    def test_cut_off_stream_is_not_cached(self, chain):
+        from app.llm.response_cache import SemanticResponseCache
+        
+        async def cut_off(prompt):
+            yield "partial "
+            raise RuntimeError("connection reset")
+        
+        chain.response_cache = SemanticResponseCache()
+        chain.llm.astream = cut_off
+        
+        async def run():
+            prepared = await chain.aprepare("symptoms", "headache")
+            return [token async for token in chain.astream(prepared)]
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        
+        assert chain.response_cache.get_stats()["entries"] == 0
+    
+    def test_sync_async_and_stream_share_the_cache(self, chain):
+        from app.llm.response_cache import SemanticResponseCache
+        
+        chain.response_cache = SemanticResponseCache()
+        
+        first = chain.analyze_symptoms("headache")
+        
+        async def run():
+            prepared = await chain.aprepare("symptoms", "headache")
+            streamed = [token async for token in chain.astream(prepared)]
+            return await chain.aanalyze_symptoms("headache"), streamed
+        
+        second, streamed = asyncio.run(run())
+        
+        assert not first["cached"]
+        assert second["cached"] and second["response"] == "sync answer"
+        assert streamed == ["sync answer"]
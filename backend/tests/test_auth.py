@@ -1,8 +1,12 @@
+import asyncio
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.models.database import Base
 from app.database.connection import get_db
@@ -11,13 +15,14 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient may run each request on a fresh event loop, so aiosqlite connections aren't pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+
+async def override_get_db():
+    async with AsyncTestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
@@ -193,3 +198,114 @@ class TestAuthentication:
         assert response.status_code == 200
         data = response.json()
         assert data["name"] == "Updated Name"
+
+
+class TestCurrentUserLookup:
+    
+    @pytest.fixture(autouse=True)
+    def use_this_engine(self, monkeypatch):
+        # Other test modules install their own get_db override; count checkouts on ours
+        monkeypatch.setitem(app.dependency_overrides, get_db, override_get_db)
+    
+    def _register(self):
+        return client.post(
+            "/api/auth/register",
+            json={
+                "email": "test@example.com",
+                "password": "password123",
+                "name": "Test User"
+            }
+        ).json()["access_token"]
+    
+    def _checkouts_for_get_me(self, token):
+        from sqlalchemy import event
+        
+        checkouts = []
+        listener = lambda *args: checkouts.append(1)
+        event.listen(async_engine.sync_engine, "checkout", listener)
+        try:
+            response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+        finally:
+            event.remove(async_engine.sync_engine, "checkout", listener)
+        return response, len(checkouts)
+    
+    def test_repeat_lookups_skip_the_database(self):
+        token = self._register()
+        
+        _, first = self._checkouts_for_get_me(token)
+        response, second = self._checkouts_for_get_me(token)
+        
+        assert first == 1
+        assert second == 0
+        assert response.json()["name"] == "Test User"
+    
+    def test_profile_update_invalidates_cached_user(self):
+        token = self._register()
+        self._checkouts_for_get_me(token)
+        
+        client.put("/api/auth/me?name=Updated Name", headers={"Authorization": f"Bearer {token}"})
+        response, _ = self._checkouts_for_get_me(token)
+        
+        assert response.json()["name"] == "Updated Name"
+    
+    @pytest.fixture
+    def claims_mode(self, monkeypatch):
+        import app.auth.security as security
+        
+        monkeypatch.setattr(security, "USER_CLAIMS_ENABLED", True)
+        monkeypatch.setattr(security, "get_user_cache", lambda: None)
+        return security
+    
+    def _resolve(self, security, token, db=None):
+        from fastapi.security import HTTPAuthorizationCredentials
+        
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return asyncio.run(security.get_current_user(credentials, db))
+    
+    def _stale(self, security, token):
+        payload = security.decode_access_token(token)
+        payload["iat"] -= security.USER_CLAIMS_MAX_AGE_SECONDS + 1
+        return security.create_access_token(payload)
+    
+    def test_user_claims_resolve_without_database(self, claims_mode):
+        token = self._register()
+        
+        # No session at all: fresh claims alone identify the user
+        user = self._resolve(claims_mode, token)
+        
+        assert user.email == "test@example.com"
+        assert user.name == "Test User"
+    
+    def test_stale_claims_are_looked_up_again(self, claims_mode):
+        from app.models.database import User
+        
+        token = self._register()
+        
+        db = TestingSessionLocal()
+        db.query(User).delete()
+        db.commit()
+        db.close()
+        
+        # Fresh claims would still vouch for the deleted user; stale ones go back to the database
+        assert self._resolve(claims_mode, token).email == "test@example.com"
+        with pytest.raises(HTTPException) as exc_info:
+            self._resolve(claims_mode, self._stale(claims_mode, token), AsyncTestingSessionLocal())
+        
+        assert exc_info.value.status_code == 401
+    
+    def test_get_me_agrees_with_put_me_in_claims_mode(self, claims_mode):
+        token = self._register()
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        updated = client.put("/api/auth/me?name=Updated Name", headers=headers).json()
+        
+        assert client.get("/api/auth/me", headers=headers).json() == updated
+    
+    def test_profile_without_created_at(self):
+        import uuid
+        from app.api.auth import get_current_user_profile
+        from app.models.database import User
+        
+        user = User(id=uuid.uuid4(), email="test@example.com", name=None, created_at=None)
+        
+        assert asyncio.run(get_current_user_profile(user)).created_at is None
@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.resilience import Bulkhead, BulkheadFullError, CircuitBreaker
+
+
+class TestBulkhead:
+    
+    def test_async_calls_are_capped(self):
+        bulkhead = Bulkhead("test", max_concurrent=3, max_queue=10)
+        in_flight = []
+        peak = []
+        
+        async def work():
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.02)
+            in_flight.pop()
+        
+        async def run():
+            await asyncio.gather(*(bulkhead.call_async(work) for _ in range(9)))
+        
+        asyncio.run(run())
+        
+        stats = bulkhead.get_stats()
+        assert max(peak) == 3
+        assert stats["admitted"] == 9
+        assert stats["active"] == 0
+        assert stats["p95_queue_ms"] > 0
+    
+    def test_full_queue_rejects_immediately(self):
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1)
+        
+        async def work():
+            await asyncio.sleep(0.1)
+        
+        async def run():
+            tasks = [asyncio.ensure_future(bulkhead.call_async(work)) for _ in range(2)]
+            await asyncio.sleep(0)
+            
+            started = time.perf_counter()
+            with pytest.raises(BulkheadFullError):
+                await bulkhead.call_async(work)
+            rejected_after = time.perf_counter() - started
+            
+            await asyncio.gather(*tasks)
+            return rejected_after
+        
+        assert asyncio.run(run()) < 0.05
+        assert bulkhead.get_stats()["rejected"] == 1
+    
+    def test_queue_timeout(self):
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=5, queue_timeout=0.05)
+        
+        async def run():
+            holder = asyncio.ensure_future(bulkhead.call_async(lambda: asyncio.sleep(0.3)))
+            await asyncio.sleep(0)
+            with pytest.raises(BulkheadFullError):
+                await bulkhead.acquire_async()
+            await holder
+        
+        asyncio.run(run())
+        
+        stats = bulkhead.get_stats()
+        assert stats["timed_out"] == 1
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+    
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=5)
+        
+        async def run():
+            holder = asyncio.ensure_future(bulkhead.call_async(lambda: asyncio.sleep(0.05)))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(bulkhead.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(holder, waiter, return_exceptions=True)
+            await bulkhead.call_async(lambda: asyncio.sleep(0))
+        
+        asyncio.run(run())
+        
+        assert bulkhead.get_stats()["active"] == 0
+    
+    def test_threads_share_the_limit(self):
+        bulkhead = Bulkhead("test", max_concurrent=2, max_queue=10)
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        
+        def work():
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+        
+        threads = [threading.Thread(target=bulkhead.call, args=(work,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert peak[0] == 2
+        assert bulkhead.get_stats()["admitted"] == 8
+
+
+class TestCircuitBreaker:
+    
+    def test_sync_calls_open_the_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=2, timeout=60)
+        
+        def fail():
+            raise RuntimeError("quota exceeded")
+        
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                breaker.call_sync(fail)
+        
+        with pytest.raises(Exception, match="OPEN"):
+            breaker.call_sync(lambda: "ok")
+        assert breaker.get_stats()["state"] == "OPEN"
+
+
+class FlakyChatModel:
+    
+    def __init__(self, failures, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+    
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError("429 quota exceeded")
+        return type("Message", (), {"content": f"answer to {prompt}"})()
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_RETRY_BASE_DELAY", "0")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("LLM_MAX_QUEUE", "0")
+    from app.llm.gemini import GeminiLLM
+    return GeminiLLM()
+
+
+class TestGeminiResilience:
+    
+    def test_transient_errors_are_retried(self, gemini):
+        gemini.llm = FlakyChatModel(failures=1)
+        
+        assert asyncio.run(gemini.agenerate("q")) == "answer to q"
+        assert gemini.llm.calls == 2
+    
+    def test_exhausted_retries_degrade_and_count_towards_circuit(self, gemini):
+        from app.llm.gemini import FALLBACK_RESPONSE
+        
+        gemini.llm = FlakyChatModel(failures=10)
+        
+        assert asyncio.run(gemini.agenerate("q")) == FALLBACK_RESPONSE
+        assert gemini.get_stats()["circuit_breaker"]["failure_count"] == 1
+    
+    def test_overload_is_raised_not_degraded(self, gemini):
+        gemini.llm = FlakyChatModel(failures=0, delay=0.1)
+        
+        async def run():
+            first = asyncio.ensure_future(gemini.agenerate("first"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(BulkheadFullError):
+                await gemini.agenerate("second")
+            return await first
+        
+        assert asyncio.run(run()) == "answer to first"
+        assert gemini.get_stats()["bulkhead"]["rejected"] == 1
+
+
+class FailingMidStream:
+    
+    class Chunk:
+        def __init__(self, content):
+            self.content = content
+    
+    def stream(self, prompt):
+        yield self.Chunk("Rest ")
+        raise RuntimeError("connection reset")
+    
+    async def astream(self, prompt):
+        yield self.Chunk("Rest ")
+        raise RuntimeError("connection reset")
+
+
+def make_streaming_llm():
+    from app.llm.gemini import GeminiLLM
+    
+    llm = GeminiLLM.__new__(GeminiLLM)
+    llm.llm = FailingMidStream()
+    llm.bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1)
+    llm.circuit_breaker = CircuitBreaker(failure_threshold=5, timeout=60)
+    return llm
+
+
+class TestGeminiStreaming:
+    
+    def test_sync_stream_cut_off_raises(self):
+        llm = make_streaming_llm()
+        tokens = []
+        
+        with pytest.raises(RuntimeError):
+            for token in llm.stream("prompt"):
+                tokens.append(token)
+        
+        assert tokens == ["Rest "]
+        assert llm.bulkhead.get_stats()["active"] == 0
+    
+    def test_async_stream_cut_off_raises(self):
+        llm = make_streaming_llm()
+        tokens = []
+        
+        async def run():
+            async for token in llm.astream("prompt"):
+                tokens.append(token)
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        
+        # The fallback text is never appended to a partial answer
+        assert tokens == ["Rest "]
+        assert llm.circuit_breaker.get_stats()["failure_count"] == 1
@@ -1,22 +1,29 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.models.database import Base
 from app.database.connection import get_db
+import app.api.conversations as conversations_api
+from app.utils.resilience import BulkheadFullError
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient may run each request on a fresh event loop, so aiosqlite connections aren't pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+
+async def override_get_db():
+    async with AsyncTestingSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 app.dependency_overrides[get_db] = override_get_db
@@ -170,3 +177,353 @@ class TestConversations:
         assert all("id" in conv for conv in data)
         assert all("title" in conv for conv in data)
         assert all("message_count" in conv for conv in data)
+
+
+class FakeStreamingAgent:
+    
+    name = "SymptomAnalyzer"
+    
+    async def aprepare(self, query, query_embedding=None):
+        result = {"metadata": {"name": "Headache", "type": "symptom"}, "similarity": 0.91}
+        return [result], f"prompt for {query}"
+    
+    async def astream_response(self, prompt):
+        for token in ["Rest ", "and ", "hydrate."]:
+            yield token
+
+
+class CutOffStreamingAgent(FakeStreamingAgent):
+    
+    async def astream_response(self, prompt):
+        yield "Rest "
+        raise RuntimeError("connection reset")
+
+
+class OverloadedStreamingAgent(FakeStreamingAgent):
+    
+    async def astream_response(self, prompt):
+        raise BulkheadFullError("queue full")
+        yield
+
+
+class FakeWorkflow:
+    
+    def __init__(self, agent_class=FakeStreamingAgent):
+        self.agent_class = agent_class
+    
+    async def aencode_query(self, query):
+        return None
+    
+    def select_agent(self, query, query_embedding=None):
+        return self.agent_class()
+
+
+class FakeChatWorkflow:
+    
+    def __init__(self, on_process=None, agent_outputs=None):
+        self.on_process = on_process
+        self.agent_outputs = agent_outputs or {"symptom_analysis": "Rest and hydrate."}
+    
+    async def aprocess(self, query):
+        if self.on_process:
+            self.on_process()
+        return {
+            "agent_outputs": self.agent_outputs,
+            "final_response": "\n\n".join(self.agent_outputs.values())
+        }
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestConversationStreaming:
+    
+    def test_stream_emits_rag_results_then_tokens(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow())
+        
+        response = client.post(
+            "/api/conversations/chat/stream",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"query": "I have a headache"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        
+        events = _parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names == ["conversation", "rag_results", "token", "token", "token", "done"]
+        assert events[1][1][0]["name"] == "Headache"
+        assert events[-1][1]["agent_used"] == "SymptomAnalyzer"
+    
+    def test_assistant_message_persisted_after_stream(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow())
+        
+        response = client.post(
+            "/api/conversations/chat/stream",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"query": "I have a headache"}
+        )
+        done = _parse_sse(response.text)[-1][1]
+        
+        detail = client.get(
+            f"/api/conversations/{done['conversation_id']}",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        ).json()
+        
+        assert [m["role"] for m in detail["messages"]] == ["user", "assistant"]
+        assert detail["messages"][1]["content"] == "Rest and hydrate."
+        assert detail["messages"][1]["id"] == done["message_id"]
+    
+    def test_stream_unknown_conversation(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow())
+        
+        response = client.post(
+            "/api/conversations/chat/stream",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"conversation_id": "00000000-0000-0000-0000-000000000000", "query": "hi"}
+        )
+        assert response.status_code == 404
+    
+    def test_emergency_guidance_streams_first_and_is_saved(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow())
+        
+        response = client.post(
+            "/api/conversations/chat/stream",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            json={"query": "My dad is having a seizure"}
+        )
+        events = _parse_sse(response.text)
+        
+        assert [name for name, _ in events][:3] == ["conversation", "emergency", "rag_results"]
+        assert "**Seizure:**" in events[1][1]["text"]
+        
+        detail = client.get(
+            f"/api/conversations/{events[-1][1]['conversation_id']}",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        ).json()
+        reply = detail["messages"][1]["content"]
+        assert reply.startswith(events[1][1]["text"])
+        assert reply.endswith("Rest and hydrate.")
+
+
+    def test_cut_off_stream_reports_error_and_saves_nothing(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow(CutOffStreamingAgent))
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        response = client.post("/api/conversations/chat/stream", headers=headers, json={"query": "I have a headache"})
+        events = _parse_sse(response.text)
+        names = [name for name, _ in events]
+        
+        assert names[-2:] == ["token", "error"]
+        assert events[-1][1]["code"] == "failed"
+        assert "done" not in names
+        assert client.get("/api/conversations", headers=headers).json() == []
+    
+    def test_overload_reports_distinct_error_code(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeWorkflow(OverloadedStreamingAgent))
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        response = client.post("/api/conversations/chat/stream", headers=headers, json={"query": "I have a headache"})
+        name, data = _parse_sse(response.text)[-1]
+        
+        assert name == "error"
+        assert data["code"] == "overloaded"
+        assert client.get("/api/conversations", headers=headers).json() == []
+
+
+class TestChatPersistence:
+    
+    def test_exchange_written_in_one_commit(self, auth_token, monkeypatch):
+        from sqlalchemy import event
+        
+        pool_events = []
+        commits = []
+        sync_engine = async_engine.sync_engine
+        
+        def no_connection_held():
+            # Every checkout so far has been returned while the LLM is "running"
+            assert pool_events.count("checkout") == pool_events.count("checkin")
+        
+        checkout = lambda *args: pool_events.append("checkout")
+        checkin = lambda *args: pool_events.append("checkin")
+        commit = lambda conn: commits.append(conn)
+        event.listen(sync_engine, "checkout", checkout)
+        event.listen(sync_engine, "checkin", checkin)
+        event.listen(sync_engine, "commit", commit)
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeChatWorkflow(no_connection_held))
+        try:
+            response = client.post(
+                "/api/conversations/chat",
+                headers={"Authorization": f"Bearer {auth_token}"},
+                json={"query": "I have a headache"}
+            )
+        finally:
+            event.remove(sync_engine, "checkout", checkout)
+            event.remove(sync_engine, "checkin", checkin)
+            event.remove(sync_engine, "commit", commit)
+        
+        assert response.status_code == 200
+        assert len(commits) == 1
+        
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        data = response.json()
+        detail = client.get(f"/api/conversations/{data['conversation_id']}", headers=headers).json()
+        assert [m["role"] for m in detail["messages"]] == ["user", "assistant"]
+        assert detail["messages"][1]["id"] == data["message_id"]
+        assert detail["title"] == "I have a headache"
+        
+        history = client.get("/api/medical-history", headers=headers).json()
+        assert [entry["severity"] for entry in history] == ["moderate"]
+    
+    def test_continue_appends_to_existing_conversation(self, auth_token, monkeypatch):
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeChatWorkflow())
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        first = client.post("/api/conversations/chat", headers=headers, json={"query": "Headache"}).json()
+        client.post(
+            "/api/conversations/chat",
+            headers=headers,
+            json={"conversation_id": first["conversation_id"], "query": "Still there"}
+        )
+        
+        detail = client.get(f"/api/conversations/{first['conversation_id']}", headers=headers).json()
+        assert [m["content"] for m in detail["messages"]] == [
+            "Headache", "Rest and hydrate.", "Still there", "Rest and hydrate."
+        ]
+    
+    def test_failed_llm_call_writes_nothing(self, auth_token, monkeypatch):
+        def fail():
+            raise RuntimeError("LLM unavailable")
+        
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeChatWorkflow(fail))
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        response = client.post("/api/conversations/chat", headers=headers, json={"query": "Headache"})
+        
+        assert response.status_code == 500
+        assert client.get("/api/conversations", headers=headers).json() == []
+    
+    def test_fanned_out_emergency_is_recorded_as_emergency(self, auth_token, monkeypatch):
+        outputs = {"treatment_advice": "Take aspirin.", "emergency_triage": "Call 911."}
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeChatWorkflow(agent_outputs=outputs))
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        response = client.post(
+            "/api/conversations/chat",
+            headers=headers,
+            json={"query": "chest pain, what medication should I take"}
+        ).json()
+        
+        detail = client.get(f"/api/conversations/{response['conversation_id']}", headers=headers).json()
+        assert detail["messages"][1]["agent_used"] == "EmergencyTriage"
+        
+        history = client.get("/api/medical-history", headers=headers).json()
+        assert [(h["severity"], h["emergency_detected"]) for h in history] == [("severe", "true")]
+    
+    def test_overloaded_workflow_returns_503(self, auth_token, monkeypatch):
+        def overloaded():
+            raise BulkheadFullError("queue full")
+        
+        monkeypatch.setattr(conversations_api, "get_workflow", lambda: FakeChatWorkflow(overloaded))
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        
+        response = client.post("/api/conversations/chat", headers=headers, json={"query": "Headache"})
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+
+def _seed_conversations(count, messages_per_conversation=2, same_timestamp=False):
+    from datetime import datetime, timedelta
+    from app.models.database import Conversation, Message, User
+    
+    db = TestingSessionLocal()
+    try:
+        user = db.query(User).filter(User.email == "test@example.com").first()
+        base = datetime(2024, 1, 1)
+        for i in range(count):
+            updated_at = base if same_timestamp else base + timedelta(minutes=i)
+            conversation = Conversation(user_id=user.id, title=f"Conversation {i}", created_at=base, updated_at=updated_at)
+            db.add(conversation)
+            db.flush()
+            for j in range(messages_per_conversation + i % 3):
+                db.add(Message(conversation_id=conversation.id, role="user", content=f"message {j}"))
+        db.commit()
+    finally:
+        db.close()
+
+
+class TestConversationPagination:
+    
+    def _pages(self, auth_token, limit):
+        pages, cursor = [], None
+        while True:
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            response = client.get(
+                "/api/conversations",
+                headers={"Authorization": f"Bearer {auth_token}"},
+                params=params
+            )
+            assert response.status_code == 200
+            pages.append(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return pages
+    
+    @pytest.mark.parametrize("same_timestamp", [False, True])
+    def test_cursor_walks_every_conversation_once(self, auth_token, same_timestamp):
+        _seed_conversations(7, same_timestamp=same_timestamp)
+        
+        pages = self._pages(auth_token, limit=3)
+        
+        assert [len(page) for page in pages] == [3, 3, 1]
+        ids = [conv["id"] for page in pages for conv in page]
+        assert len(set(ids)) == 7
+        if not same_timestamp:
+            assert [conv["title"] for conv in pages[0]] == ["Conversation 6", "Conversation 5", "Conversation 4"]
+    
+    def test_message_counts(self, auth_token):
+        _seed_conversations(4)
+        
+        data = client.get("/api/conversations", headers={"Authorization": f"Bearer {auth_token}"}).json()
+        
+        counts = {conv["title"]: conv["message_count"] for conv in data}
+        assert counts == {"Conversation 0": 2, "Conversation 1": 3, "Conversation 2": 4, "Conversation 3": 2}
+    
+    def test_offset_still_supported(self, auth_token):
+        _seed_conversations(5)
+        
+        response = client.get(
+            "/api/conversations",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            params={"limit": 2, "offset": 2}
+        )
+        
+        assert [conv["title"] for conv in response.json()] == ["Conversation 2", "Conversation 1"]
+    
+    def test_invalid_cursor(self, auth_token):
+        response = client.get(
+            "/api/conversations",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            params={"cursor": "not-a-cursor"}
+        )
+        
+        assert response.status_code == 400
+    
+    def test_detail_and_delete_seeded_conversation(self, auth_token):
+        _seed_conversations(1, messages_per_conversation=3)
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        conversation_id = client.get("/api/conversations", headers=headers).json()[0]["id"]
+        
+        detail = client.get(f"/api/conversations/{conversation_id}", headers=headers).json()
+        assert len(detail["messages"]) == 3
+        
+        # Messages go with the conversation through the delete-orphan cascade
+        response = client.delete(f"/api/conversations/{conversation_id}", headers=headers)
+        assert response.status_code == 204
+        assert client.get("/api/conversations", headers=headers).json() == []
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.database.connection import DatabaseManager, to_async_url
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("postgresql://u:p@host:5432/db", "postgresql+asyncpg://u:p@host:5432/db"),
+    ("postgresql+psycopg2://u:p@host/db", "postgresql+asyncpg://u:p@host/db"),
+    ("sqlite:///./local.db", "sqlite+aiosqlite:///./local.db"),
+    ("sqlite+aiosqlite:///./local.db", "sqlite+aiosqlite:///./local.db")
+])
+def test_to_async_url(url, expected):
+    assert to_async_url(url) == expected
+
+
+@pytest.fixture
+def db_manager(monkeypatch, tmp_path):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'pool.db'}")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_TIMEOUT_SECONDS", "2.5")
+    manager = DatabaseManager()
+    yield manager
+    asyncio.run(manager.async_engine.dispose())
+    manager.engine.dispose()
+
+
+class TestDatabaseManager:
+    
+    def test_pool_settings_from_env(self, db_manager):
+        assert db_manager.pool_settings == {
+            "pool_size": 3,
+            "max_overflow": 10,
+            "pool_recycle": 1800,
+            "pool_timeout": 2.5
+        }
+    
+    def test_async_session_round_trip(self, db_manager):
+        db_manager.create_tables()
+        
+        async def run():
+            await db_manager.ping()
+            return db_manager.get_pool_stats()
+        
+        stats = asyncio.run(run())
+        
+        assert stats["driver"] == "aiosqlite"
+        assert stats["settings"]["pool_size"] == 3
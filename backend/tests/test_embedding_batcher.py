@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.rag.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingModel:
+    
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+    
+    def encode_batch(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model failure")
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model():
+    return RecordingModel()
+
+
+class TestEmbeddingBatcher:
+    
+    def test_single_encode(self, model):
+        batcher = EmbeddingBatcher(model, max_wait_ms=1)
+        try:
+            np.testing.assert_array_equal(batcher.encode("fever"), [5.0, 1.0])
+        finally:
+            batcher.close()
+    
+    def test_concurrent_encodes_share_batches(self, model):
+        batcher = EmbeddingBatcher(model, max_batch_size=64, max_wait_ms=50)
+        texts = [f"query {i}" + "x" * i for i in range(16)]
+        try:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(batcher.encode, texts))
+        finally:
+            batcher.close()
+        
+        for text, result in zip(texts, results):
+            assert result[0] == len(text)
+        assert len(model.batches) < len(texts)
+        assert batcher.get_stats()["total_items"] == len(texts)
+    
+    def test_max_batch_size_respected(self, model):
+        batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=50)
+        try:
+            futures = [batcher.submit(f"q{i}") for i in range(10)]
+            [f.result(timeout=5) for f in futures]
+        finally:
+            batcher.close()
+        
+        assert max(len(b) for b in model.batches) <= 4
+    
+    def test_async_callers(self, model):
+        batcher = EmbeddingBatcher(model, max_wait_ms=20)
+        
+        async def run():
+            return await asyncio.gather(*(batcher.aencode(t) for t in ["a", "bb", "ccc"]))
+        
+        try:
+            results = asyncio.run(run())
+        finally:
+            batcher.close()
+        
+        assert [r[0] for r in results] == [1.0, 2.0, 3.0]
+        assert len(model.batches) == 1
+    
+    def test_errors_propagate_to_callers(self):
+        batcher = EmbeddingBatcher(RecordingModel(fail=True), max_wait_ms=1)
+        try:
+            with pytest.raises(RuntimeError):
+                batcher.encode("fever", timeout=5)
+        finally:
+            batcher.close()
+
+
+class TestAsyncSearchBatching:
+    
+    def test_concurrent_search_requests_share_one_model_call(self, tmp_path, monkeypatch):
+        import httpx
+        
+        from app.api import rag as rag_api
+        from app.main import app
+        from app.rag import medical_rag
+        from app.rag.numpy_store import NumpyVectorStore
+        
+        class UnitModel(RecordingModel):
+            model_name = "test-model"
+            
+            def get_dimension(self):
+                return 2
+            
+            def encode(self, text):
+                return self.encode_batch([text])[0]
+        
+        model = UnitModel()
+        store = NumpyVectorStore(persist_directory=str(tmp_path), embedding_model=model)
+        store.add_documents(
+            ["fever text"],
+            metadatas=[{"name": "Fever", "type": "symptom", "id": "fever"}],
+            ids=["symptom_fever"],
+            embeddings=np.array([[1.0, 0.0]], dtype=np.float32)
+        )
+        model.batches.clear()
+        store.embedding_batcher = EmbeddingBatcher(model, max_batch_size=64, max_wait_ms=100)
+        
+        monkeypatch.setattr(medical_rag, "get_vector_store", lambda: store)
+        monkeypatch.setattr(medical_rag, "get_embedding_model", lambda: model)
+        rag = medical_rag.MedicalRAG(data_dir=str(tmp_path))
+        monkeypatch.setattr(rag_api, "get_medical_rag", lambda: rag)
+        
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(
+                    client.post("/api/search", json={"query": f"fever {i}", "mode": "vector"})
+                    for i in range(8)
+                ))
+        
+        try:
+            responses = asyncio.run(run())
+        finally:
+            store.embedding_batcher.close()
+        
+        assert all(response.status_code == 200 for response in responses)
+        # Handlers await the batcher instead of blocking the loop, so all eight land in one batch
+        assert len(model.batches) == 1
+        assert len(model.batches[0]) == 8
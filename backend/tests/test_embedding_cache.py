@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.rag.embedding_cache import EmbeddingCache, make_cache_key
+
+
+def _vectors(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(model_name="test-model", cache_dir=str(tmp_path))
+
+
+class TestEmbeddingCache:
+    
+    def test_key_normalizes_whitespace(self):
+        assert make_cache_key("m", "headache  and\tfever ") == make_cache_key("m", "headache and fever")
+    
+    def test_key_includes_model_name(self):
+        assert make_cache_key("a", "headache") != make_cache_key("b", "headache")
+    
+    def test_miss_then_hit(self, cache):
+        vectors = _vectors(2)
+        assert cache.get_many(["headache", "fever"]) == {}
+        
+        cache.put_many(["headache", "fever"], vectors)
+        found = cache.get_many(["fever", "cough", "headache"])
+        
+        assert set(found) == {0, 2}
+        np.testing.assert_array_equal(found[0], vectors[1])
+        np.testing.assert_array_equal(found[2], vectors[0])
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        vectors = _vectors(1)
+        EmbeddingCache(model_name="test-model", cache_dir=str(tmp_path)).put_many(["nausea"], vectors)
+        
+        reopened = EmbeddingCache(model_name="test-model", cache_dir=str(tmp_path))
+        found = reopened.get_many(["nausea"])
+        
+        np.testing.assert_array_equal(found[0], vectors[0])
+        assert reopened.get_stats()["disk_hits"] == 1
+    
+    def test_memory_lru_eviction(self):
+        cache = EmbeddingCache(model_name="test-model", cache_dir=None, max_memory_items=2)
+        cache.put_many(["a", "b", "c"], _vectors(3))
+        
+        assert set(cache.get_many(["a", "b", "c"])) == {1, 2}
+    
+    def test_disk_size_eviction(self, tmp_path):
+        dim = 8
+        bytes_per_vector = dim * 4
+        cache = EmbeddingCache(
+            model_name="test-model",
+            cache_dir=str(tmp_path),
+            max_memory_items=1,
+            max_disk_bytes=bytes_per_vector * 10
+        )
+        
+        texts = [f"text {i}" for i in range(20)]
+        cache.put_many(texts, _vectors(20, dim=dim))
+        
+        assert cache.get_stats()["disk_bytes"] <= bytes_per_vector * 10
+        
+        reopened = EmbeddingCache(model_name="test-model", cache_dir=str(tmp_path))
+        assert len(reopened.get_many(texts)) <= 10
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+    def test_usable_after_fork(self, cache):
+        vectors = _vectors(2)
+        cache.put_many(["headache"], vectors[:1])
+        
+        pid = os.fork()
+        if pid == 0:
+            try:
+                cache.put_many(["fever"], vectors[1:])
+                ok = set(cache.get_many(["headache", "fever"])) == {0, 1}
+            finally:
+                os._exit(0 if ok else 1)
+        
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+        assert cache._conn is not None
+        assert set(cache.get_many(["headache"])) == {0}
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from app.utils.emergency_protocols import (
+    DEFAULT_PROTOCOLS_PATH,
+    FAST_RESPONSE_HEADER,
+    EmergencyProtocols,
+    load_protocol_file
+)
+from app.utils.keyword_router import DEFAULT_KEYWORDS_PATH, KeywordRouter
+
+
+@pytest.fixture
+def protocols():
+    router = KeywordRouter.from_file(str(DEFAULT_KEYWORDS_PATH))
+    return EmergencyProtocols.from_file(str(DEFAULT_PROTOCOLS_PATH), router)
+
+
+class TestEmergencyProtocols:
+    
+    def test_matching_protocol_is_returned(self, protocols):
+        response = protocols.respond("I think my mother is having a stroke")
+        
+        assert response.startswith(FAST_RESPONSE_HEADER)
+        assert "**Stroke:** CALL 911 IMMEDIATELY - time is brain." in response
+        assert "Seizure" not in response
+    
+    def test_several_protocols_in_file_order(self, protocols):
+        response = protocols.respond("he had a seizure after an overdose")
+        
+        assert response.index("**Seizure:**") < response.index("**Poisoning:**")
+    
+    def test_generic_guidance_without_specific_protocol(self, protocols):
+        response = protocols.respond("sudden chest pain")
+        
+        assert "**Possible Medical Emergency:** CALL 911" in response
+    
+    def test_non_emergency_gets_nothing(self, protocols):
+        assert protocols.respond("what is the best medicine for a cold") is None
+        assert protocols.respond("I have a mild headache") is None
+        assert protocols.respond("I stroked my cat and got a rash") is None
+    
+    @pytest.mark.parametrize("query, protocol", [
+        ("my dad collapsed", "Cardiac Arrest"),
+        ("my friend is unresponsive", "Cardiac Arrest"),
+        ("I think I was poisoned", "Poisoning"),
+        ("not breathing", "Cardiac Arrest"),
+        ("choking", "Choking"),
+        ("seizures", "Seizure"),
+        ("my toddler swallowed bleach", "Poisoning"),
+    ])
+    def test_acute_phrases_get_guidance(self, protocols, query, protocol):
+        response = protocols.respond(query)
+        
+        assert response is not None
+        assert f"**{protocol}:**" in response
+    
+    @pytest.mark.parametrize("query", ["my dad collapsed", "my friend is unresponsive", "swallowed bleach"])
+    def test_acute_phrases_route_to_triage(self, make_workflow, query):
+        assert make_workflow()._route_query({"query": query}) == "emergency_triage"
+    
+    @pytest.mark.parametrize("query", ["what is hypoglycemia", "how do I learn cpr", "tell me about concussion"])
+    def test_informational_protocol_topics_are_not_emergencies(self, protocols, make_workflow, query):
+        # Protocol keywords only choose the guidance; on their own they don't mean triage
+        assert protocols.respond(query) is None
+        assert make_workflow()._route_query({"query": query}) != "emergency_triage"
+    
+    def test_every_protocol_from_the_loader_is_served(self):
+        data = load_protocol_file()
+        
+        assert len(data["protocols"]) == 10
+        assert all(protocol["keywords"] and protocol["text"] for protocol in data["protocols"])
+    
+    def test_response_is_fast(self, protocols):
+        started = time.perf_counter()
+        for _ in range(1000):
+            protocols.respond("severe bleeding from a deep cut")
+        
+        assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+class TestFormatResponse:
+    
+    def test_fast_response_leads_the_detailed_triage(self, make_workflow):
+        workflow = make_workflow()
+        state = {
+            "agent_outputs": {"emergency_triage": "Detailed triage."},
+            "metadata": {
+                "emergency_fast_response": "CALL 911.",
+                "emergency_llm_response": "Detailed triage."
+            }
+        }
+        
+        assert workflow._format_response(state)["final_response"] == "CALL 911.\n\nDetailed triage."
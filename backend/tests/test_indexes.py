@@ -0,0 +1,130 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.conversations import conversation_page_statement, message_count_statement
+from app.database.migrations import ensure_indexes
+from app.models.database import Base, Conversation, MedicalHistory, Message
+
+MODEL_INDEXES = {
+    "conversations": "ix_conversations_user_id_updated_at",
+    "messages": "ix_messages_conversation_id_timestamp",
+    "medical_history": "ix_medical_history_user_id_date"
+}
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def list_page(db, user_id, limit, cursor=None):
+    conversations = db.execute(conversation_page_statement(user_id, limit, cursor)).all()
+    if conversations:
+        db.execute(message_count_statement([conv.id for conv in conversations])).all()
+    return conversations
+
+
+def query_plans(engine, run):
+    """Run `run` and return SQLite's EXPLAIN QUERY PLAN for every statement it issued"""
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    
+    with engine.connect() as conn:
+        return [
+            " | ".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+class TestIndexUsage:
+    
+    def test_conversation_list_page(self, engine, db):
+        user_id = uuid.uuid4()
+        
+        plans = query_plans(engine, lambda: list_page(db, user_id, 50))
+        
+        assert "ix_conversations_user_id_updated_at" in plans[0]
+        # Rows come out of the index already ordered; no sort step
+        assert "TEMP B-TREE" not in plans[0]
+    
+    def test_conversation_list_with_cursor_and_counts(self, engine, db):
+        user_id = uuid.uuid4()
+        conversation = Conversation(user_id=user_id, title="t", updated_at=datetime(2024, 1, 2))
+        db.add(conversation)
+        db.flush()
+        db.add(Message(conversation_id=conversation.id, role="user", content="x"))
+        db.commit()
+        
+        plans = query_plans(
+            engine,
+            lambda: list_page(db, user_id, 1, cursor=(datetime(2024, 1, 3), uuid.uuid4()))
+        )
+        
+        assert "ix_conversations_user_id_updated_at" in plans[0]
+        assert "TEMP B-TREE" not in plans[0]
+        assert "ix_messages_conversation_id_timestamp" in plans[1]
+    
+    def test_conversation_messages(self, engine, db):
+        conversation_id = uuid.uuid4()
+        
+        plans = query_plans(engine, lambda: db.query(Message)
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(Message.timestamp.asc())
+            .all())
+        
+        assert "ix_messages_conversation_id_timestamp" in plans[0]
+        assert "TEMP B-TREE" not in plans[0]
+    
+    def test_medical_history(self, engine, db):
+        user_id = uuid.uuid4()
+        
+        plans = query_plans(engine, lambda: db.query(MedicalHistory)
+            .filter(MedicalHistory.user_id == user_id)
+            .order_by(MedicalHistory.date.desc())
+            .all())
+        
+        assert "ix_medical_history_user_id_date" in plans[0]
+        assert "TEMP B-TREE" not in plans[0]
+
+
+class TestEnsureIndexes:
+    
+    def test_adds_indexes_to_existing_tables(self, engine):
+        # A deployment created before the indexes were declared
+        with engine.begin() as conn:
+            for name in MODEL_INDEXES.values():
+                conn.execute(text(f"DROP INDEX {name}"))
+        
+        created = ensure_indexes(engine)
+        
+        assert sorted(created) == sorted(MODEL_INDEXES.values())
+        inspector = inspect(engine)
+        for table, name in MODEL_INDEXES.items():
+            assert name in {index["name"] for index in inspector.get_indexes(table)}
+    
+    def test_idempotent(self, engine):
+        assert ensure_indexes(engine) == []
+        assert ensure_indexes(engine, concurrently=True) == []
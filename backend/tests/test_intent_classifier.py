@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from app.agents.intent_classifier import DEFAULT_EXAMPLES_PATH, IntentClassifier
+
+
+class FakeEmbeddingModel:
+    """Bag-of-words vectors over a tiny vocabulary; enough to give each intent a direction."""
+    
+    VOCAB = ["feel", "hurts", "rash", "what", "explain", "causes", "treat", "medication", "take", "collapsed", "bleeding"]
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def encode(self, text):
+        vector = np.array([1.0 if word in text.lower() else 0.0 for word in self.VOCAB], dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+    
+    def encode_batch(self, texts):
+        self.calls += 1
+        return np.vstack([self.encode(text) for text in texts])
+
+
+EXAMPLES = {
+    "symptom_analyzer": ["I feel awful", "my back hurts", "a rash on my leg"],
+    "disease_expert": ["what is asthma", "explain diabetes", "what causes gout"],
+    "treatment_advisor": ["how to treat acne", "which medication works", "what can I take"]
+}
+
+
+@pytest.fixture
+def model():
+    return FakeEmbeddingModel()
+
+
+@pytest.fixture
+def classifier(model):
+    return IntentClassifier(model, EXAMPLES, min_similarity=0.5, min_margin=0.1)
+
+
+class TestIntentClassifier:
+    
+    def test_examples_are_embedded_once(self, model, classifier):
+        classifier.classify(model.encode("explain migraine"))
+        classifier.classify(model.encode("my head hurts"))
+        
+        assert model.calls == 3
+        assert classifier.centroids.shape == (3, len(FakeEmbeddingModel.VOCAB))
+    
+    def test_nearest_centroid(self, model, classifier):
+        assert classifier.classify(model.encode("explain what causes migraine")).label == "disease_expert"
+        assert classifier.classify(model.encode("best medication to treat it")).label == "treatment_advisor"
+        assert classifier.classify(model.encode("my knee hurts")).label == "symptom_analyzer"
+    
+    def test_low_confidence_abstains(self, model, classifier):
+        assert classifier.classify(model.encode("hello there")) is None
+    
+    def test_ambiguous_query_abstains(self, model, classifier):
+        # Equally close to two centroids: margin is zero
+        prediction = classifier.predict(model.encode("hurts explain"))
+        
+        assert prediction.margin < classifier.min_margin
+        assert classifier.classify(model.encode("hurts explain")) is None
+    
+    def test_needs_two_labels(self, model):
+        with pytest.raises(ValueError):
+            IntentClassifier(model, {"symptom_analyzer": ["I feel ill"]})
+    
+    def test_default_examples_cover_every_route(self, model):
+        classifier = IntentClassifier.from_file(model, str(DEFAULT_EXAMPLES_PATH))
+        
+        assert set(classifier.labels) == {"symptom_analyzer", "disease_expert", "treatment_advisor", "emergency_triage"}
+
+
+class TestEmbeddingRouting:
+    
+    @pytest.fixture
+    def workflow(self, make_workflow, classifier):
+        return make_workflow(intent_classifier=classifier)
+    
+    def route(self, workflow, model, query):
+        return workflow._route_query({"query": query, "query_embedding": model.encode(query).tolist()})
+    
+    def test_classifier_routes_without_keywords(self, workflow, model):
+        assert self.route(workflow, model, "please explain gout to me") == "disease_expert"
+    
+    def test_falls_back_to_keywords_when_unsure(self, workflow, model):
+        assert self.route(workflow, model, "any remedy for gout") == "treatment_advisor"
+    
+    def test_emergency_keywords_override_classifier(self, workflow, model):
+        assert self.route(workflow, model, "explain why I have chest pain") == "emergency_triage"
+    
+    def test_no_embedding_uses_keywords(self, workflow):
+        assert workflow._route_query({"query": "what is asthma", "query_embedding": None}) == "disease_expert"
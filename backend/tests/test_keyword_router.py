@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from app.utils.keyword_router import DEFAULT_KEYWORDS_PATH, AhoCorasick, KeywordRouter
+
+
+@pytest.fixture
+def router():
+    return KeywordRouter.from_file(str(DEFAULT_KEYWORDS_PATH))
+
+
+@pytest.fixture
+def workflow(make_workflow, router):
+    # Routing only needs the router, not the agents behind each route
+    return make_workflow(keyword_router=router)
+
+
+class TestAhoCorasick:
+    
+    def test_overlapping_patterns(self):
+        automaton = AhoCorasick([("he", "he"), ("she", "she"), ("his", "his"), ("hers", "hers")])
+        
+        found = {(start, end, value) for start, end, value in automaton.iter_matches("ushers")}
+        
+        assert found == {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")}
+
+
+class TestKeywordRouter:
+    
+    def test_all_categories_in_one_pass(self, router):
+        matches = router.match("What is the best medication for chest pain?")
+        
+        assert matches == {
+            "disease": ["what is"],
+            "treatment": ["medication"],
+            "emergency": ["chest pain"]
+        }
+    
+    def test_word_boundaries(self):
+        router = KeywordRouter({"emergency": ["stroke", "severe"]})
+        
+        assert router.categories("I had a stroke") == {"emergency"}
+        assert router.categories("heatstroke risk in summer") == set()
+        assert router.categories("you must persevere") == set()
+        assert router.categories("severe, sudden pain") == {"emergency"}
+    
+    def test_normalizes_case_whitespace_and_apostrophes(self, router):
+        assert router.matches("I CAN’T   breathe", "emergency")
+    
+    @pytest.mark.parametrize("query", [
+        "I have chest pains",
+        "my son is having seizures",
+        "I think she overdosed",
+        "I think I was poisoned",
+        "I cant breathe",
+        "I can not breathe",
+    ])
+    def test_inflected_emergencies(self, router, query):
+        assert router.matches(query, "emergency")
+    
+    def test_only_listed_inflections_match(self, router):
+        # Inflected forms come from the keyword file, not a blanket suffix rule
+        assert not router.matches("I stroked my cat and got a rash", "emergency")
+        assert not router.matches("severely itchy", "emergency")
+    
+    def test_loads_custom_keyword_file(self, tmp_path):
+        path = tmp_path / "keywords.json"
+        path.write_text(json.dumps({"dermatology": ["rash", "eczema"]}))
+        
+        assert KeywordRouter.from_file(str(path)).categories("itchy Rash") == {"dermatology"}
+
+
+class TestRouting:
+    
+    @pytest.mark.parametrize("query, route", [
+        ("I have chest pain and sweating", "emergency_triage"),
+        ("What is a stroke?", "emergency_triage"),
+        ("What is diabetes?", "disease_expert"),
+        ("How to treat a cold", "treatment_advisor"),
+        ("I have a headache and fever", "symptom_analyzer"),
+        ("severely itchy skin after gardening", "symptom_analyzer"),
+        ("explain persevere in medicine", "disease_expert"),
+    ])
+    def test_route_query(self, workflow, query, route):
+        assert workflow._route_query({"query": query}) == route
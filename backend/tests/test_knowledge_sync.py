@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.rag import medical_rag
+from app.rag.numpy_store import NumpyVectorStore
+
+
+class CountingModel:
+    
+    model_name = "test-model"
+    
+    def __init__(self):
+        self.encoded = 0
+    
+    def get_dimension(self):
+        return 4
+    
+    def encode(self, text):
+        return self.encode_batch([text])[0]
+    
+    def encode_batch(self, texts):
+        self.encoded += len(texts)
+        vectors = np.array([[len(t), t.count("a"), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+SYMPTOMS = {
+    "fever": {"description": "Elevated body temperature", "possible_diseases": ["flu"]},
+    "cough": {"description": "Sudden expulsion of air", "possible_diseases": ["flu"]},
+}
+DISEASES = {
+    "flu": {"name": "Influenza", "description": "Viral infection", "common_symptoms": ["fever", "cough"]},
+    "migraine": {"name": "Migraine", "description": "Recurring headaches", "common_symptoms": ["headache"]},
+}
+
+
+def write_data(data_dir, symptoms, diseases):
+    (data_dir / "symptoms.json").write_text(json.dumps(symptoms))
+    (data_dir / "diseases.json").write_text(json.dumps(diseases))
+
+
+@pytest.fixture
+def rag(tmp_path, monkeypatch):
+    model = CountingModel()
+    store = NumpyVectorStore(persist_directory=str(tmp_path / "store"), embedding_model=model)
+    
+    monkeypatch.setattr(medical_rag, "get_vector_store", lambda: store)
+    monkeypatch.setattr(medical_rag, "get_embedding_model", lambda: model)
+    
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    write_data(data_dir, SYMPTOMS, DISEASES)
+    
+    return medical_rag.MedicalRAG(data_dir=str(data_dir))
+
+
+class TestKnowledgeSync:
+    
+    def test_initial_sync_embeds_everything(self, rag):
+        result = rag.load_knowledge(incremental=True)
+        
+        assert result["added"] == 4
+        assert result["total"] == 4
+        assert rag.embedding_model.encoded == 4
+    
+    def test_resync_without_changes_embeds_nothing(self, rag):
+        rag.load_knowledge(incremental=True)
+        rag.embedding_model.encoded = 0
+        
+        result = rag.load_knowledge(incremental=True)
+        
+        assert result["unchanged"] == 4
+        assert rag.embedding_model.encoded == 0
+    
+    def test_only_changed_and_removed_entries_are_touched(self, rag):
+        rag.load_knowledge(incremental=True)
+        rag.embedding_model.encoded = 0
+        
+        diseases = dict(DISEASES)
+        diseases["flu"] = {**DISEASES["flu"], "description": "Contagious viral infection"}
+        del diseases["migraine"]
+        diseases["asthma"] = {"name": "Asthma", "description": "Airway inflammation"}
+        write_data(Path(rag.data_dir), SYMPTOMS, diseases)
+        
+        result = rag.load_knowledge(incremental=True)
+        
+        assert result == {"added": 1, "updated": 1, "deleted": 1, "unchanged": 2, "total": 4}
+        assert rag.embedding_model.encoded == 2
+        assert "disease_migraine" not in rag.vector_store.get_all_metadatas()
+    
+    def test_documents_from_other_sources_are_kept(self, rag):
+        rag.vector_store.add_documents(
+            texts=["CALL 911 IMMEDIATELY."],
+            metadatas=[{"source": "emergency_protocol", "emergency": "Stroke"}],
+            ids=["emergency_0"]
+        )
+        
+        rag.load_knowledge(incremental=True)
+        
+        assert "emergency_0" in rag.vector_store.get_all_metadatas()
+
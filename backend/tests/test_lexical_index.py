@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from app.rag.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+IDS = ["symptom_chest_pain", "symptom_headache", "disease_migraine", "disease_flu"]
+TEXTS = [
+    "Symptom: chest_pain\nDescription: Pain or discomfort in the chest",
+    "Symptom: headache\nDescription: Pain in the head\nPossible diseases: migraine, flu",
+    "Disease: Migraine\nDescription: Recurring severe headache\nCommon symptoms: headache, nausea",
+    "Disease: Influenza\nDescription: Viral infection\nCommon symptoms: fever, cough, headache",
+]
+METADATAS = [
+    {"type": "symptom", "id": "chest_pain", "name": "Chest Pain"},
+    {"type": "symptom", "id": "headache", "name": "Headache"},
+    {"type": "disease", "id": "migraine", "name": "Migraine"},
+    {"type": "disease", "id": "flu", "name": "Influenza"},
+]
+
+
+@pytest.fixture
+def index():
+    return BM25Index().build(IDS, TEXTS, METADATAS)
+
+
+class TestBM25Index:
+    
+    def test_tokenize_splits_snake_case(self):
+        assert tokenize("Symptom: chest_pain") == ["symptom", "chest", "pain"]
+    
+    def test_exact_term_ranks_first(self, index):
+        assert index.search("chest pain", n_results=1)[0][0] == "symptom_chest_pain"
+        assert index.search("migraine nausea", n_results=1)[0][0] == "disease_migraine"
+    
+    def test_filter_type(self, index):
+        hits = index.search("headache", n_results=5, filter_type="disease")
+        
+        assert {doc_id for doc_id, _ in hits} == {"disease_migraine", "disease_flu"}
+    
+    def test_unknown_terms_return_nothing(self, index):
+        assert index.search("xylophone") == []
+    
+    def test_save_and_load_roundtrip(self, index, tmp_path):
+        path = str(tmp_path / "lexical_index.json")
+        index.save(path)
+        
+        loaded = BM25Index.load(path)
+        
+        assert loaded.search("headache nausea") == index.search("headache nausea")
+
+
+class TestReciprocalRankFusion:
+    
+    def test_documents_in_both_rankings_win(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]])
+        
+        assert fused[0][0] == "c"
+        assert [doc_id for doc_id, _ in fused] == ["c", "a", "b", "d"]
+
+
+class UnitQueryModel:
+    
+    model_name = "test-model"
+    
+    def get_dimension(self):
+        return 4
+    
+    def encode(self, text):
+        return np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+
+class TestHybridSearch:
+    
+    @pytest.fixture
+    def rag(self, tmp_path, monkeypatch):
+        from app.rag import medical_rag
+        from app.rag.numpy_store import NumpyVectorStore
+        
+        model = UnitQueryModel()
+        store = NumpyVectorStore(persist_directory=str(tmp_path), embedding_model=model)
+        monkeypatch.setattr(medical_rag, "get_vector_store", lambda: store)
+        monkeypatch.setattr(medical_rag, "get_embedding_model", lambda: model)
+        
+        # 24 near-query documents fill the vector candidate pool; the zebra one is orthogonal to it
+        ids = [f"symptom_item{i}" for i in range(24)] + ["disease_zebra"]
+        texts = [f"Symptom: item{i}" for i in range(24)] + ["Disease: zebra fever"]
+        metadatas = [{"type": "symptom", "id": f"item{i}", "name": f"Item {i}"} for i in range(24)]
+        metadatas.append({"type": "disease", "id": "zebra", "name": "Zebra Fever"})
+        embeddings = [[1.0, i * 0.1, 0.0, 0.0] for i in range(24)] + [[0.0, 0.0, 1.0, 0.0]]
+        embeddings = np.array(embeddings, dtype=np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        store.add_documents(texts, metadatas=metadatas, ids=ids, embeddings=embeddings)
+        
+        rag = medical_rag.MedicalRAG(data_dir=str(tmp_path))
+        rag._rebuild_lexical_index(texts, metadatas, ids)
+        return rag
+    
+    def test_documents_ranked_by_both_retrievers_come_first(self, rag):
+        results = rag.search("zebra item3", n_results=5, mode="hybrid")
+        
+        assert results[0]["metadata"]["id"] == "item3"
+        scores = [r["rrf_score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+    
+    def test_lexical_only_hit_is_hydrated(self, rag):
+        vector_ids = rag.search("zebra", n_results=20, mode="vector")
+        assert "zebra" not in [r["metadata"]["id"] for r in vector_ids]
+        
+        results = rag.search("zebra", n_results=5, mode="hybrid")
+        
+        zebra = next(r for r in results if r["metadata"]["id"] == "zebra")
+        assert zebra["text"] == "Disease: zebra fever"
+        assert zebra["metadata"]["name"] == "Zebra Fever"
+        assert zebra["similarity"] == pytest.approx(0.0)
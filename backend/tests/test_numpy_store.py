@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from app.rag.numpy_store import NumpyVectorStore
+
+
+class KeywordModel:
+    """Deterministic stand-in for EmbeddingModel: one axis per vocabulary word."""
+    
+    vocabulary = ["fever", "cough", "headache", "migraine", "flu", "nausea", "rash", "asthma"]
+    
+    def get_dimension(self):
+        return len(self.vocabulary)
+    
+    def encode(self, text):
+        vector = np.array([float(word in text.lower()) for word in self.vocabulary], dtype=np.float32)
+        vector += 0.01
+        return vector / np.linalg.norm(vector)
+    
+    def encode_batch(self, texts):
+        return np.stack([self.encode(t) for t in texts])
+
+
+DOCUMENTS = [
+    ("symptom_fever", "Symptom: fever", {"type": "symptom", "id": "fever", "name": "Fever"}),
+    ("symptom_cough", "Symptom: cough", {"type": "symptom", "id": "cough", "name": "Cough"}),
+    ("symptom_headache", "Symptom: headache", {"type": "symptom", "id": "headache", "name": "Headache"}),
+    ("disease_flu", "Disease: flu with fever and cough", {"type": "disease", "id": "flu", "name": "Flu"}),
+    ("disease_migraine", "Disease: migraine headache nausea", {"type": "disease", "id": "migraine", "name": "Migraine"}),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NumpyVectorStore(persist_directory=str(tmp_path), embedding_model=KeywordModel())
+    store.add_documents(
+        texts=[d[1] for d in DOCUMENTS],
+        metadatas=[d[2] for d in DOCUMENTS],
+        ids=[d[0] for d in DOCUMENTS]
+    )
+    return store
+
+
+class TestNumpyVectorStore:
+    
+    def test_matches_brute_force_ranking(self, store):
+        model = KeywordModel()
+        query = "flu with fever"
+        
+        expected = np.argsort(-(model.encode_batch([d[1] for d in DOCUMENTS]) @ model.encode(query)))
+        results = store.search(query, n_results=2)
+        
+        assert results["ids"][0] == [DOCUMENTS[i][0] for i in expected[:2]]
+        assert results["distances"][0] == sorted(results["distances"][0])
+    
+    def test_type_filter(self, store):
+        results = store.search("headache", n_results=5, filter_metadata={"type": "disease"})
+        
+        assert all(m["type"] == "disease" for m in results["metadatas"][0])
+        assert results["ids"][0][0] == "disease_migraine"
+        assert len(results["ids"][0]) == 2
+    
+    def test_unknown_filter_value_returns_nothing(self, store):
+        results = store.search("fever", filter_metadata={"type": "medication"})
+        
+        assert results["documents"] == [[]]
+    
+    def test_distance_matches_chroma_convention(self, store):
+        results = store.search("Symptom: cough", n_results=1)
+        similarity = 1 - results["distances"][0][0] / 2
+        
+        assert similarity == pytest.approx(1.0, abs=1e-5)
+    
+    def test_upsert_replaces_existing_rows(self, store):
+        store.add_documents(
+            texts=["Symptom: rash"],
+            metadatas=[{"type": "symptom", "id": "cough", "name": "Rash"}],
+            ids=["symptom_cough"]
+        )
+        
+        assert store.get_document_count() == len(DOCUMENTS)
+        assert store.search("rash", n_results=1)["ids"][0] == ["symptom_cough"]
+    
+    def test_persists_across_instances(self, store, tmp_path):
+        reopened = NumpyVectorStore(persist_directory=str(tmp_path), embedding_model=KeywordModel())
+        
+        assert reopened.get_document_count() == len(DOCUMENTS)
+        assert reopened.search("migraine", n_results=1)["ids"][0] == ["disease_migraine"]
+    
+    def test_reset(self, store):
+        store.reset()
+        
+        assert store.get_document_count() == 0
+        assert store.search("fever")["documents"] == [[]]
+    
+    def test_float16_storage(self, tmp_path):
+        store = NumpyVectorStore(persist_directory=str(tmp_path), dtype="float16", embedding_model=KeywordModel())
+        store.add_documents(texts=[d[1] for d in DOCUMENTS], metadatas=[d[2] for d in DOCUMENTS], ids=[d[0] for d in DOCUMENTS])
+        
+        assert store.search("migraine", n_results=1)["ids"][0] == ["disease_migraine"]
+    
+    def test_search_many_matches_single_queries(self, store):
+        queries = ["fever and cough", "headache", "nausea"]
+        
+        batched = store.search_many(queries, n_results=2, filter_metadata={"type": "disease"})
+        
+        for i, query in enumerate(queries):
+            single = store.search(query, n_results=2, filter_metadata={"type": "disease"})
+            assert batched["ids"][i] == single["ids"][0]
+            assert batched["distances"][i] == pytest.approx(single["distances"][0])
+    
+    def test_delete_documents(self, store):
+        store.delete_documents(["disease_flu", "missing_id"])
+        
+        assert store.get_document_count() == len(DOCUMENTS) - 1
+        assert "disease_flu" not in store.get_all_metadatas()
+        assert "disease_flu" not in store.search("flu fever cough", n_results=5)["ids"][0]
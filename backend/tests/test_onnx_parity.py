@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("sentence_transformers")
+
+from app.rag.embeddings import EmbeddingModel
+from app.rag.medical_rag import MedicalRAG
+from app.rag.onnx_backend import export_onnx_model
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "medical_knowledge")
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+def _load_corpus():
+    with open(os.path.join(DATA_DIR, "symptoms.json"), "r", encoding="utf-8") as f:
+        symptoms = json.load(f)
+    with open(os.path.join(DATA_DIR, "diseases.json"), "r", encoding="utf-8") as f:
+        diseases = json.load(f)
+    
+    texts = [MedicalRAG._format_symptom_text(k, v) for k, v in symptoms.items()]
+    texts += [MedicalRAG._format_disease_text(k, v) for k, v in diseases.items()]
+    return texts
+
+
+@pytest.fixture(scope="module")
+def onnx_dir(tmp_path_factory):
+    output_dir = str(tmp_path_factory.mktemp("onnx"))
+    export_onnx_model(MODEL_NAME, output_dir, quantize=True)
+    return output_dir
+
+
+@pytest.mark.slow
+class TestOnnxParity:
+    
+    def test_corpus_cosine_agreement(self, onnx_dir):
+        corpus = _load_corpus()
+        
+        torch_model = EmbeddingModel(model_name=MODEL_NAME, backend="torch")
+        onnx_model = EmbeddingModel(model_name=MODEL_NAME, backend="onnx", onnx_dir=onnx_dir)
+        
+        assert onnx_model.get_dimension() == torch_model.get_dimension()
+        
+        reference = torch_model.encode_batch(corpus)
+        quantized = onnx_model.encode_batch(corpus)
+        
+        cosines = np.sum(reference * quantized, axis=1)
+        
+        assert cosines.mean() >= 0.98
+        assert cosines.min() >= 0.95
+    
+    def test_query_ranking_agreement(self, onnx_dir):
+        corpus = _load_corpus()
+        queries = ["I have fever and cough", "headache and fever", "what is diabetes"]
+        
+        torch_model = EmbeddingModel(model_name=MODEL_NAME, backend="torch")
+        onnx_model = EmbeddingModel(model_name=MODEL_NAME, backend="onnx", onnx_dir=onnx_dir)
+        
+        torch_scores = torch_model.encode_batch(queries) @ torch_model.encode_batch(corpus).T
+        onnx_scores = onnx_model.encode_batch(queries) @ onnx_model.encode_batch(corpus).T
+        
+        for i in range(len(queries)):
+            assert np.argmax(torch_scores[i]) in np.argsort(-onnx_scores[i])[:3]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.llm.response_cache import SemanticResponseCache, is_emergency_query
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+DOCS = [("symptom", "headache"), ("disease", "migraine")]
+
+
+@pytest.fixture
+def cache():
+    return SemanticResponseCache(similarity_threshold=0.95, ttl_seconds=60, max_entries=10)
+
+
+class TestSemanticResponseCache:
+    
+    def test_near_duplicate_hits(self, cache):
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, False, "answer")
+        
+        assert cache.lookup(_unit(1, 0.1, 0), "symptoms", DOCS, False) == "answer"
+        assert cache.lookup(_unit(1, 1, 0), "symptoms", DOCS, False) is None
+        
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert sum(stats["similarity_histogram"].values()) == 2
+    
+    def test_context_must_match(self, cache):
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, False, "answer")
+        
+        assert cache.lookup(_unit(1, 0, 0), "disease", DOCS, False) is None
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS[::-1], False) is None
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS[:1], False) is None
+    
+    def test_never_crosses_emergency_boundary(self, cache):
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, False, "routine answer")
+        
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, True) is None
+        
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, True, "call 911")
+        
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, True) == "call 911"
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, False) == "routine answer"
+    
+    def test_ttl_expiry(self, cache, monkeypatch):
+        import app.llm.response_cache as response_cache
+        
+        now = [1000.0]
+        monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, False, "answer")
+        
+        now[0] += 61
+        
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, False) is None
+        assert cache.get_stats()["expirations"] == 1
+        assert cache.get_stats()["entries"] == 0
+    
+    def test_lru_eviction(self):
+        cache = SemanticResponseCache(max_entries=2)
+        cache.store(_unit(1, 0, 0), "symptoms", DOCS, False, "a")
+        cache.store(_unit(0, 1, 0), "symptoms", DOCS, False, "b")
+        cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, False)
+        cache.store(_unit(0, 0, 1), "symptoms", DOCS, False, "c")
+        
+        assert cache.lookup(_unit(1, 0, 0), "symptoms", DOCS, False) == "a"
+        assert cache.lookup(_unit(0, 1, 0), "symptoms", DOCS, False) is None
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_emergency_detection(self):
+        assert is_emergency_query("I have crushing CHEST PAIN")
+        assert not is_emergency_query("mild headache since morning")
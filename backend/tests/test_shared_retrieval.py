@@ -0,0 +1,117 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.agents.disease_expert import DiseaseExpertAgent
+from app.agents.emergency_triage import EmergencyTriageAgent
+from app.agents.symptom_analyzer import SymptomAnalyzerAgent
+from app.agents.treatment_advisor import TreatmentAdvisorAgent
+from app.utils.keyword_router import DEFAULT_KEYWORDS_PATH, KeywordRouter
+
+
+DOCUMENTS = [
+    {"text": f"{doc_type} {i}", "metadata": {"name": f"{doc_type} {i}", "type": doc_type, "id": f"{doc_type}_{i}"}, "similarity": 0.9 - i * 0.01}
+    for i, doc_type in enumerate(["symptom", "disease", "symptom", "symptom", "disease", "symptom", "symptom", "disease"])
+]
+
+
+class CountingRAG:
+    
+    def __init__(self, documents=DOCUMENTS):
+        self.documents = documents
+        self.encodes = 0
+        self.searches = []
+    
+    def encode_query(self, query):
+        self.encodes += 1
+        return np.ones(3, dtype=np.float32)
+    
+    async def aencode_query(self, query):
+        return self.encode_query(query)
+    
+    def search(self, query, n_results=5, filter_type=None, mode=None, query_embedding=None):
+        self.searches.append((n_results, filter_type, query_embedding is not None))
+        results = [d for d in self.documents if filter_type is None or d["metadata"]["type"] == filter_type]
+        return results[:n_results]
+
+
+class FakeLLM:
+    
+    def generate(self, prompt):
+        return "answer"
+    
+    async def agenerate(self, prompt):
+        return "answer"
+
+
+def make_agent(agent_class, rag, router):
+    # Skip __init__ so no model, Gemini client or web search tool is created
+    agent = agent_class.__new__(agent_class)
+    agent.name = agent_class.__name__
+    agent.rag = rag
+    agent.llm = FakeLLM()
+    agent.keyword_router = router
+    agent.prompt_template = "{context}\n{query}"
+    return agent
+
+
+@pytest.fixture
+def rag():
+    return CountingRAG()
+
+
+def make_agents(rag, router):
+    return {
+        "symptom_analyzer": make_agent(SymptomAnalyzerAgent, rag, router),
+        "disease_expert": make_agent(DiseaseExpertAgent, rag, router),
+        "treatment_advisor": make_agent(TreatmentAdvisorAgent, rag, router),
+        "emergency_triage": make_agent(EmergencyTriageAgent, rag, router)
+    }
+
+
+def make_rag_workflow(make_workflow, rag):
+    router = KeywordRouter.from_file(str(DEFAULT_KEYWORDS_PATH))
+    return make_workflow(make_agents(rag, router), rag=rag, keyword_router=router)
+
+
+@pytest.fixture
+def workflow(make_workflow, rag):
+    return make_rag_workflow(make_workflow, rag)
+
+
+class TestSharedRetrieval:
+    
+    def test_one_search_per_run(self, workflow, rag):
+        state = workflow.process("I have a headache and feel tired")
+        
+        assert rag.encodes == 1
+        assert rag.searches == [(20, None, True)]
+        assert len(state["retrieved_knowledge"]) == len(DOCUMENTS)
+        assert state["rag_results"] == DOCUMENTS[:5]
+        assert state["final_response"] == "answer"
+    
+    def test_agent_filters_its_slice_from_the_pool(self, workflow, rag):
+        state = asyncio.run(workflow.aprocess("What is asthma?"))
+        
+        assert rag.encodes == 1
+        assert rag.searches == [(20, None, True)]
+        assert [r["metadata"]["type"] for r in state["rag_results"]] == ["disease"] * 3
+        assert state["agent_outputs"]["disease_info"] == "answer"
+    
+    def test_filtered_agent_tops_up_a_short_pool(self, workflow, rag):
+        rag.documents = DOCUMENTS[:3]
+        
+        state = workflow.process("What is asthma?")
+        
+        # The pool holds one disease; the agent searches its own slice, reusing the embedding
+        assert rag.searches == [(20, None, True), (3, "disease", True)]
+        assert len(state["rag_results"]) == 1
+    
+    def test_agent_without_pool_searches_itself(self, rag):
+        agent = make_agent(DiseaseExpertAgent, rag, None)
+        
+        rag_results, _ = agent.prepare("What is asthma?")
+        
+        assert rag.searches == [(3, "disease", False)]
+        assert len(rag_results) == 3
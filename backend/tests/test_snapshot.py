@@ -0,0 +1,160 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.rag.numpy_store import NumpyVectorStore
+from app.rag.snapshot import compute_corpus_hash, export_snapshot, read_snapshot, write_snapshot
+
+
+class FixedModel:
+    
+    model_name = "test-model"
+    
+    def __init__(self):
+        self.encoded = 0
+    
+    def get_dimension(self):
+        return 3
+    
+    def encode(self, text):
+        return self.encode_batch([text])[0]
+    
+    def encode_batch(self, texts):
+        self.encoded += len(texts)
+        vectors = np.array([[len(t), t.count("e"), 1.0] for t in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+IDS = ["symptom_fever", "disease_flu", "disease_migraine"]
+TEXTS = ["Symptom: fever", "Disease: Influenza with fever", "Disease: Migraine"]
+METADATAS = [
+    {"type": "symptom", "id": "fever", "name": "Fever"},
+    {"type": "disease", "id": "flu", "name": "Influenza"},
+    {"type": "disease", "id": "migraine", "name": "Migraine"},
+]
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    store = NumpyVectorStore(persist_directory=str(tmp_path / "source"), embedding_model=FixedModel())
+    store.add_documents(texts=TEXTS, metadatas=METADATAS, ids=IDS)
+    export_snapshot(store, str(tmp_path / "snapshot"))
+    return str(tmp_path / "snapshot")
+
+
+class TestKnowledgeSnapshot:
+    
+    def test_roundtrip_is_memory_mapped(self, snapshot_dir):
+        snapshot = read_snapshot(snapshot_dir)
+        
+        assert snapshot.ids == IDS
+        assert snapshot.manifest["model_name"] == "test-model"
+        assert snapshot.manifest["corpus_hash"] == compute_corpus_hash(IDS, TEXTS, METADATAS)
+        assert isinstance(snapshot.embeddings, np.memmap)
+    
+    def test_corpus_hash_ignores_order(self):
+        reordered = compute_corpus_hash(IDS[::-1], TEXTS[::-1], METADATAS[::-1])
+        
+        assert reordered == compute_corpus_hash(IDS, TEXTS, METADATAS)
+    
+    def test_hydrate_without_embedding(self, snapshot_dir, tmp_path):
+        model = FixedModel()
+        store = NumpyVectorStore(persist_directory=str(tmp_path / "replica"), embedding_model=model)
+        
+        assert store.hydrate_from_snapshot(snapshot_dir) == len(IDS)
+        assert model.encoded == 0
+        assert store.search_by_embedding(model.encode("Disease: Migraine"), n_results=1)["ids"][0] == ["disease_migraine"]
+    
+    def test_model_mismatch_is_rejected(self, snapshot_dir, tmp_path):
+        model = FixedModel()
+        model.model_name = "other-model"
+        store = NumpyVectorStore(persist_directory=str(tmp_path / "replica"), embedding_model=model)
+        
+        with pytest.raises(ValueError):
+            store.hydrate_from_snapshot(snapshot_dir)
+    
+    def test_documents_changed_after_export_are_rejected(self, snapshot_dir):
+        documents_path = os.path.join(snapshot_dir, "documents.json")
+        with open(documents_path) as f:
+            documents = json.load(f)
+        documents["texts"][0] = "Symptom: high fever"
+        with open(documents_path, "w") as f:
+            json.dump(documents, f)
+        
+        with pytest.raises(ValueError, match="corpus hash"):
+            read_snapshot(snapshot_dir)
+    
+    def test_stale_embeddings_are_rejected_when_verifying(self, snapshot_dir):
+        embeddings_path = os.path.join(snapshot_dir, "embeddings.npy")
+        embeddings = np.load(embeddings_path)
+        np.save(embeddings_path, embeddings[::-1].copy())
+        
+        with pytest.raises(ValueError, match="embeddings"):
+            read_snapshot(snapshot_dir, verify=True)
+    
+    def test_embeddings_of_another_dtype_are_rejected(self, snapshot_dir):
+        embeddings_path = os.path.join(snapshot_dir, "embeddings.npy")
+        embeddings = np.load(embeddings_path)
+        np.save(embeddings_path, embeddings.astype(np.float64))
+        
+        with pytest.raises(ValueError, match="embeddings"):
+            read_snapshot(snapshot_dir)
+    
+    def test_load_does_not_hash_embeddings(self, snapshot_dir, monkeypatch):
+        import app.rag.snapshot as snapshot
+        
+        def full_read(embeddings):
+            raise AssertionError("embeddings were hashed on load")
+        
+        monkeypatch.setattr(snapshot, "compute_embeddings_hash", full_read)
+        
+        assert len(read_snapshot(snapshot_dir).ids) == len(IDS)
+    
+    def test_missing_manifest(self, tmp_path):
+        write_snapshot(str(tmp_path), "test-model", [], [], [], np.empty((0, 3), dtype=np.float32))
+        (tmp_path / "manifest.json").unlink()
+        
+        with pytest.raises(FileNotFoundError):
+            read_snapshot(str(tmp_path))
+
+
+class TestReadOnlySnapshotStore:
+    
+    def test_search_from_memory_map(self, snapshot_dir, tmp_path):
+        model = FixedModel()
+        store = NumpyVectorStore(
+            persist_directory=str(tmp_path / "worker"),
+            embedding_model=model,
+            read_only=True,
+            snapshot_path=snapshot_dir
+        )
+        
+        assert store.get_document_count() == len(IDS)
+        assert model.encoded == 0
+        assert not store._data.embeddings.flags.owndata
+        assert not store._data.embeddings.flags.writeable
+        assert store.search_by_embedding(model.encode("Disease: Migraine"), n_results=1)["ids"][0] == ["disease_migraine"]
+        assert not (tmp_path / "worker").exists()
+    
+    def test_writes_are_rejected(self, snapshot_dir, tmp_path):
+        store = NumpyVectorStore(
+            persist_directory=str(tmp_path / "worker"),
+            embedding_model=FixedModel(),
+            read_only=True,
+            snapshot_path=snapshot_dir
+        )
+        
+        with pytest.raises(RuntimeError):
+            store.add_documents(texts=["Symptom: cough"], ids=["symptom_cough"])
+        with pytest.raises(RuntimeError):
+            store.delete_documents(["symptom_fever"])
+        with pytest.raises(RuntimeError):
+            store.reset()
+        
+        assert store.get_document_count() == len(IDS)
+    
+    def test_requires_snapshot_path(self, tmp_path):
+        with pytest.raises(ValueError):
+            NumpyVectorStore(persist_directory=str(tmp_path), embedding_model=FixedModel(), read_only=True)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.utils.metrics import MetricsCollector
+from app.utils import tracing
+from app.utils.tracing import current_trace, span, start_trace, traced
+from tests.test_shared_retrieval import CountingRAG, make_rag_workflow
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = MetricsCollector()
+    monkeypatch.setattr(tracing, "get_metrics", lambda: metrics)
+    return metrics
+
+
+class TestSpans:
+    
+    def test_spans_outside_a_trace_still_feed_metrics(self, metrics):
+        with span("stage.a"):
+            pass
+        
+        assert current_trace() is None
+        assert metrics.get_stage_stats()["stage.a"]["count"] == 1
+    
+    def test_traced_sync_and_async(self, metrics):
+        
+        @traced("stage.sync")
+        def work():
+            time.sleep(0.01)
+            return "sync"
+        
+        @traced("stage.async")
+        async def awork():
+            await asyncio.sleep(0.01)
+            return "async"
+        
+        with start_trace("test") as trace:
+            assert work() == "sync"
+            assert asyncio.run(awork()) == "async"
+        
+        timings = trace.durations_ms()
+        assert set(timings) == {"stage.sync", "stage.async"}
+        assert all(ms >= 10 for ms in timings.values())
+    
+    def test_stage_histogram(self, metrics):
+        for duration in (3, 7, 40, 20000):
+            metrics.record_stage("llm.generate", duration)
+        
+        stats = metrics.get_stats()["stages"]["llm.generate"]
+        
+        assert stats["count"] == 4
+        assert stats["histogram"]["<=5ms"] == 1
+        assert stats["histogram"]["<=10ms"] == 1
+        assert stats["histogram"]["<=50ms"] == 1
+        assert stats["histogram"][">10000ms"] == 1
+    
+    def test_chrome_trace_export(self, metrics, tmp_path, monkeypatch):
+        monkeypatch.setenv("TRACE_EXPORT_DIR", str(tmp_path))
+        
+        with start_trace("workflow") as trace:
+            with span("node.retrieve"):
+                pass
+        
+        exported = json.loads((tmp_path / f"workflow-{trace.trace_id}.json").read_text())
+        event = exported["traceEvents"][0]
+        
+        assert event["name"] == "node.retrieve"
+        assert event["ph"] == "X"
+        assert event["cat"] == "node"
+        assert {"ts", "dur", "pid", "tid"} <= set(event)
+
+
+class TestWorkflowTimings:
+    
+    @pytest.mark.parametrize("run", ["sync", "async"])
+    def test_every_stage_is_timed(self, metrics, make_workflow, run):
+        workflow = make_rag_workflow(make_workflow, CountingRAG())
+        
+        query = "What is asthma?"
+        state = workflow.process(query) if run == "sync" else asyncio.run(workflow.aprocess(query))
+        
+        timings = state["metadata"]["timings_ms"]
+        assert {
+            "node.retrieve", "node.route", "node.disease_expert", "node.format_response",
+            "agent.format_prompt"
+        } <= set(timings)
+        assert state["metadata"]["trace_id"]
+        assert "node.disease_expert" in metrics.get_stage_stats()
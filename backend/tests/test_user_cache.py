@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.auth.user_cache import UserCache, UserSnapshot
+
+
+def _snapshot(name="Test User"):
+    return UserSnapshot(uuid.uuid4(), "test@example.com", name, datetime(2024, 1, 1))
+
+
+@pytest.fixture
+def cache():
+    return UserCache(ttl_seconds=30, max_entries=10)
+
+
+class TestUserCache:
+    
+    def test_hit_after_put(self, cache):
+        snapshot = _snapshot()
+        
+        assert cache.get(snapshot.id) is None
+        cache.put(snapshot)
+        
+        assert cache.get(snapshot.id) == snapshot
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+    
+    def test_ttl_expiry(self, cache, monkeypatch):
+        import app.auth.user_cache as user_cache
+        
+        now = [1000.0]
+        monkeypatch.setattr(user_cache.time, "monotonic", lambda: now[0])
+        snapshot = _snapshot()
+        cache.put(snapshot)
+        
+        now[0] += 31
+        
+        assert cache.get(snapshot.id) is None
+        assert cache.get_stats()["entries"] == 0
+    
+    def test_lru_eviction(self):
+        cache = UserCache(max_entries=2)
+        first, second, third = _snapshot(), _snapshot(), _snapshot()
+        cache.put(first)
+        cache.put(second)
+        cache.get(first.id)
+        cache.put(third)
+        
+        assert cache.get(first.id) == first
+        assert cache.get(second.id) is None
+        assert cache.get_stats()["evictions"] == 1
+    
+    def test_invalidate(self, cache):
+        snapshot = _snapshot()
+        cache.put(snapshot)
+        
+        cache.invalidate(snapshot.id)
+        
+        assert cache.get(snapshot.id) is None
+        assert cache.get_stats()["invalidations"] == 1
+    
+    def test_snapshot_round_trips_through_user(self):
+        snapshot = _snapshot()
+        
+        assert UserSnapshot.from_user(snapshot.to_user()) == snapshot
+    
+    def test_user_delete_invalidates_global_cache(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        
+        from app.auth.user_cache import get_user_cache
+        from app.models.database import Base, User
+        
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            user = User(email="gone@example.com", password_hash="x", name="Gone")
+            db.add(user)
+            db.commit()
+            get_user_cache().put(UserSnapshot.from_user(user))
+            
+            db.delete(user)
+            db.commit()
+            
+            assert get_user_cache().get(user.id) is None
+        finally:
+            db.close()
+            engine.dispose()